@@ -0,0 +1,93 @@
+"""Store embeddings as compact binary blobs instead of JSON
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import decode_embedding, encode_embedding
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['products', 'detected_items']
+BATCH_SIZE = 500
+
+
+def _convert_column(table_name: str, convert) -> None:
+    """Rewrite embedding values in place from embedding_old into embedding_new."""
+    connection = op.get_bind()
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.String),
+        sa.column('embedding_old'),
+        sa.column('embedding_new'),
+    )
+
+    rows = connection.execute(
+        sa.select(table.c.id, table.c.embedding_old).where(table.c.embedding_old.isnot(None))
+    ).fetchall()
+
+    update = (
+        sa.update(table)
+        .where(table.c.id == sa.bindparam('row_id'))
+        .values(embedding_new=sa.bindparam('value'))
+    )
+    for start in range(0, len(rows), BATCH_SIZE):
+        params = []
+        for row_id, value in rows[start:start + BATCH_SIZE]:
+            converted = convert(value)
+            if converted is not None:
+                params.append({'row_id': row_id, 'value': converted})
+        if params:
+            connection.execute(update, params)
+
+
+def _json_to_blob(value):
+    """JSON {"vector": [...]} -> binary embedding blob."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    vector = (value or {}).get('vector')
+    return encode_embedding(vector) if vector else None
+
+
+def _blob_to_json(value):
+    """Binary embedding blob -> JSON {"vector": [...]}."""
+    return json.dumps({'vector': decode_embedding(bytes(value), normalized=False).tolist()})
+
+
+def upgrade() -> None:
+    """Convert JSON embedding columns to binary blobs."""
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column('embedding', new_column_name='embedding_old')
+            batch_op.add_column(sa.Column('embedding_new', sa.LargeBinary(), nullable=True))
+
+        _convert_column(table_name, _json_to_blob)
+
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('embedding_old')
+            batch_op.alter_column('embedding_new', new_column_name='embedding')
+
+
+def downgrade() -> None:
+    """Convert binary embedding blobs back to JSON."""
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column('embedding', new_column_name='embedding_old')
+            batch_op.add_column(sa.Column('embedding_new', sa.JSON(), nullable=True))
+
+        _convert_column(table_name, _blob_to_json)
+
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('embedding_old')
+            batch_op.alter_column('embedding_new', new_column_name='embedding')
@@ -0,0 +1,45 @@
+"""Add scan_jobs table for background scan processing
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create scan_jobs table."""
+    op.create_table(
+        'scan_jobs',
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('scan_id', sa.String(36), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='queued'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('visible_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_by', sa.String(100), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['scan_id'], ['scans.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scan_jobs_scan_id'), 'scan_jobs', ['scan_id'], unique=False)
+    op.create_index(op.f('ix_scan_jobs_status'), 'scan_jobs', ['status'], unique=False)
+    op.create_index(op.f('ix_scan_jobs_visible_at'), 'scan_jobs', ['visible_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop scan_jobs table."""
+    op.drop_index(op.f('ix_scan_jobs_visible_at'), table_name='scan_jobs')
+    op.drop_index(op.f('ix_scan_jobs_status'), table_name='scan_jobs')
+    op.drop_index(op.f('ix_scan_jobs_scan_id'), table_name='scan_jobs')
+    op.drop_table('scan_jobs')
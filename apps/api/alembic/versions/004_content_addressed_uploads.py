@@ -0,0 +1,60 @@
+"""Content-addressed uploads, catalog version and scan result keys
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create image_blobs and catalog_state, add result key columns to scans."""
+    op.create_table(
+        'image_blobs',
+        sa.Column('hash', sa.String(64), nullable=False),
+        sa.Column('image_url', sa.Text(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.PrimaryKeyConstraint('hash')
+    )
+
+    catalog_state = op.create_table(
+        'catalog_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(catalog_state, [{'id': 1, 'version': 1, 'updated_at': datetime.utcnow()}])
+
+    with op.batch_alter_table('scans') as batch_op:
+        batch_op.add_column(sa.Column('image_hash', sa.String(64), nullable=True))
+        batch_op.add_column(sa.Column('vision_version', sa.String(50), nullable=True))
+        batch_op.add_column(sa.Column('catalog_version', sa.Integer(), nullable=True))
+        batch_op.create_index(
+            'ix_scans_result_key', ['image_hash', 'vision_version', 'catalog_version'], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Drop result key columns, catalog_state and image_blobs."""
+    with op.batch_alter_table('scans') as batch_op:
+        batch_op.drop_index('ix_scans_result_key')
+        batch_op.drop_column('catalog_version')
+        batch_op.drop_column('vision_version')
+        batch_op.drop_column('image_hash')
+
+    op.drop_table('catalog_state')
+    op.drop_table('image_blobs')
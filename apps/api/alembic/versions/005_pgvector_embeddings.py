@@ -0,0 +1,91 @@
+"""Store embeddings as pgvector vectors with an HNSW index (PostgreSQL only)
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import encode_embedding, unit_vector
+from app.settings import settings
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['products', 'detected_items']
+BATCH_SIZE = 500
+
+
+def _convert_column(table_name: str, select_old: str, update_new: str, convert) -> None:
+    """Rewrite embedding values from embedding_old into embedding_new."""
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text(f'SELECT id, {select_old} FROM {table_name} WHERE embedding_old IS NOT NULL')
+    ).fetchall()
+
+    update = sa.text(f'UPDATE {table_name} SET embedding_new = {update_new} WHERE id = :row_id')
+    for start in range(0, len(rows), BATCH_SIZE):
+        params = [
+            {'row_id': row_id, 'value': convert(value)}
+            for row_id, value in rows[start:start + BATCH_SIZE]
+        ]
+        if params:
+            connection.execute(update, params)
+
+
+def _blob_to_vector(value) -> str:
+    """Binary embedding blob -> pgvector text literal of the unit vector."""
+    return json.dumps(unit_vector(bytes(value)).tolist())
+
+
+def _vector_to_blob(value: str) -> bytes:
+    """pgvector text literal -> binary embedding blob."""
+    return encode_embedding(json.loads(value))
+
+
+def _rename_columns(table_name: str) -> None:
+    op.drop_column(table_name, 'embedding_old')
+    op.alter_column(table_name, 'embedding_new', new_column_name='embedding')
+
+
+def upgrade() -> None:
+    """Convert embedding blobs to vector columns and index products."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return  # SQLite keeps binary blobs and the in-memory index
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+    for table_name in TABLES:
+        op.alter_column(table_name, 'embedding', new_column_name='embedding_old')
+        op.execute(f'ALTER TABLE {table_name} ADD COLUMN embedding_new vector({settings.embedding_dimension})')
+        _convert_column(table_name, 'embedding_old', 'CAST(:value AS vector)', _blob_to_vector)
+        _rename_columns(table_name)
+
+    op.execute(
+        'CREATE INDEX ix_products_embedding_hnsw ON products '
+        'USING hnsw (embedding vector_cosine_ops) '
+        f'WITH (m = {settings.hnsw_m}, ef_construction = {settings.hnsw_ef_construction})'
+    )
+    # Category + stock pre-filter for small categories, where an exact scan beats the HNSW index
+    op.create_index('ix_products_category_in_stock', 'products', ['category', 'in_stock'])
+
+
+def downgrade() -> None:
+    """Convert vector columns back to binary blobs."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_products_category_in_stock', table_name='products')
+    op.drop_index('ix_products_embedding_hnsw', table_name='products')
+    for table_name in TABLES:
+        op.alter_column(table_name, 'embedding', new_column_name='embedding_old')
+        op.add_column(table_name, sa.Column('embedding_new', sa.LargeBinary(), nullable=True))
+        _convert_column(table_name, 'embedding_old::text', ':value', _vector_to_blob)
+        _rename_columns(table_name)
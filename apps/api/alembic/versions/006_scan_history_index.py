@@ -0,0 +1,31 @@
+"""Index scans for keyset pagination of scan history
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the (user_id, created_at DESC, id DESC) index."""
+    op.create_index(
+        'ix_scans_user_history',
+        'scans',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Drop the scan history index."""
+    op.drop_index('ix_scans_user_history', table_name='scans')
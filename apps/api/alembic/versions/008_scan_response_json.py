@@ -0,0 +1,29 @@
+"""Store serialized responses of completed scans
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add scans.response_json (scans completed earlier are serialized on read)."""
+    with op.batch_alter_table('scans') as batch_op:
+        batch_op.add_column(sa.Column('response_json', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop scans.response_json."""
+    with op.batch_alter_table('scans') as batch_op:
+        batch_op.drop_column('response_json')
@@ -0,0 +1,29 @@
+"""Track how far the catalog change log has been pruned
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add catalog_state.change_log_pruned_seq (nothing pruned yet)."""
+    with op.batch_alter_table('catalog_state') as batch_op:
+        batch_op.add_column(sa.Column('change_log_pruned_seq', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Drop catalog_state.change_log_pruned_seq."""
+    with op.batch_alter_table('catalog_state') as batch_op:
+        batch_op.drop_column('change_log_pruned_seq')
@@ -0,0 +1,29 @@
+"""Record which processing attempt owns a scan
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add scans.processing_claim."""
+    with op.batch_alter_table('scans') as batch_op:
+        batch_op.add_column(sa.Column('processing_claim', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop scans.processing_claim."""
+    with op.batch_alter_table('scans') as batch_op:
+        batch_op.drop_column('processing_claim')
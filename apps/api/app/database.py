@@ -1,20 +1,120 @@
 """Database configuration and session management."""
-from typing import Generator
-from sqlalchemy import create_engine
+from typing import Generator, List
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.settings import settings
 
-# Create database engine (SQLite configuration)
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False},  # Needed for SQLite
-    echo=settings.is_development,
-)
 
-# Create session factory
+def sqlite_pragmas(profile: str = settings.sqlite_profile, read_only: bool = False) -> List[str]:
+    """PRAGMA statements run on every new SQLite connection.
+
+    The "performance" profile switches to WAL (readers no longer block the
+    writer or each other), relaxes fsync to commit boundaries
+    (synchronous=NORMAL is durable in WAL mode except on power loss), and
+    enlarges the page cache and memory map.
+
+    Args:
+        profile: "performance" or "default" (SQLite defaults, busy timeout only)
+        read_only: Reject writes on the connection (PRAGMA query_only)
+
+    Returns:
+        PRAGMA statements
+    """
+    pragmas = []
+    if profile == "performance":
+        if not read_only:
+            # Persistent per database file; the writer pool sets it
+            pragmas.append(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        pragmas += [
+            f"PRAGMA synchronous={settings.sqlite_synchronous}",
+            f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+            f"PRAGMA cache_size={settings.sqlite_cache_size}",
+            f"PRAGMA temp_store={settings.sqlite_temp_store}",
+        ]
+    pragmas.append(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def create_db_engine(
+    url: str,
+    read_only: bool = False,
+    profile: str = settings.sqlite_profile,
+    pool_size: int = settings.database_pool_size,
+) -> Engine:
+    """Create an engine with pooling and, for SQLite, the connection profile.
+
+    Args:
+        url: Database URL
+        read_only: Engine for read-only sessions
+        profile: SQLite profile (see ``sqlite_pragmas``)
+        pool_size: Persistent connections kept in the pool
+
+    Returns:
+        SQLAlchemy engine
+    """
+    database_url = make_url(url)
+    if database_url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            pool_size=pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout_seconds,
+            pool_pre_ping=True,
+            echo=settings.database_echo,
+        )
+
+    pool_options = {}
+    if database_url.database not in (None, "", ":memory:"):
+        # File databases get a QueuePool; in-memory ones keep SQLAlchemy's default
+        pool_options = {
+            "pool_size": pool_size,
+            "max_overflow": settings.database_max_overflow,
+            "pool_timeout": settings.database_pool_timeout_seconds,
+        }
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        echo=settings.database_echo,
+        **pool_options,
+    )
+
+    pragmas = sqlite_pragmas(profile, read_only)
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+
+def _is_memory_database(url: str) -> bool:
+    database_url = make_url(url)
+    return database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:")
+
+
+# Create database engines: read-write, plus a separate read-only pool for
+# GET endpoints (a replica via DATABASE_READ_URL, or the same SQLite file
+# opened query-only; an in-memory database can only be shared)
+engine = create_db_engine(settings.database_url)
+if settings.database_read_url:
+    read_engine = create_db_engine(settings.database_read_url, read_only=True, pool_size=settings.database_read_pool_size)
+elif _is_memory_database(settings.database_url):
+    read_engine = engine
+else:
+    read_engine = create_db_engine(settings.database_url, read_only=True, pool_size=settings.database_read_pool_size)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Create declarative base for models
 Base = declarative_base()
@@ -39,6 +139,22 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Dependency that provides a read-only database session.
+
+    Use for endpoints that never write; writes raise an error.
+
+    Yields:
+        Session: SQLAlchemy database session bound to the read pool
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_db() -> None:
     """Initialize database tables. Only use in development."""
     Base.metadata.create_all(bind=engine)
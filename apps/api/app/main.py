@@ -1,8 +1,16 @@
 """FastAPI application entry point."""
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
+from app.database import SessionLocal, engine
+from app.responses import FastJSONResponse
+from app.services.catalog_cache import catalog_cache
+from app.services.embeddings import embedding_service
+from app.services.executor import ExecutorSaturatedError, blocking_executor, password_executor
+from app.services.vector_index import vector_index
+from app.services.worker import start_embedded_workers
 from app.settings import settings
 
 # Create FastAPI application
@@ -13,6 +21,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware configuration
@@ -25,6 +34,59 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def build_vector_index():
+    """Load product embeddings into the in-memory vector index."""
+    if engine.dialect.name == "postgresql":
+        return  # Matching runs in the database (pgvector)
+
+    db = SessionLocal()
+    try:
+        snapshot = vector_index.restore_snapshot(db)
+        if snapshot is None:
+            vector_index.build(db)
+            print(f"Vector index built: {len(vector_index)} products")
+        else:
+            print(f"Vector index restored from snapshot {snapshot.path.name}: {len(vector_index)} products")
+    except Exception as e:
+        # Index is rebuilt lazily on first match if the catalog isn't ready yet
+        print(f"Error building vector index: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def start_scan_workers():
+    """Run scan workers inside the API process unless external workers are used."""
+    if settings.scan_worker_mode == "embedded":
+        app.state.scan_workers_stop = start_embedded_workers(settings.scan_worker_threads)
+
+
+@app.on_event("shutdown")
+def stop_scan_workers():
+    """Signal embedded scan workers to stop."""
+    stop_event = getattr(app.state, "scan_workers_stop", None)
+    if stop_event is not None:
+        stop_event.set()
+
+
+@app.on_event("shutdown")
+def stop_executors():
+    """Wait for in-flight blocking work and shut the executors down."""
+    blocking_executor.shutdown()
+    password_executor.shutdown()
+
+
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    """Shed load when an executor queue is full."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -35,6 +97,30 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Runtime metrics in Prometheus text format."""
+    executors = (blocking_executor, password_executor)
+    samples = [executor.metrics() for executor in executors]
+    lines = []
+    for name in samples[0]:
+        metric = f"splay_executor_{name}"
+        metric_type = "counter" if name.endswith(("_total", "_sum")) else "gauge"
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for executor, sample in zip(executors, samples):
+            lines.append(f'{metric}{{executor="{executor.name}"}} {sample[name]}')
+    for name, value in embedding_service.metrics().items():
+        metric = f"splay_embedding_{name}"
+        metric_type = "counter" if name.endswith(("_total", "_sum")) else "gauge"
+        lines.append(f"# TYPE {metric} {metric_type}")
+        lines.append(f'{metric}{{version="{embedding_service.version}"}} {value}')
+    for name, value in catalog_cache.metrics().items():
+        metric = f"splay_catalog_cache_{name}"
+        lines.append(f"# TYPE {metric} {'counter' if name.endswith('_total') else 'gauge'}")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
+from app.services.principals import Principal, principal_cache, token_cache
 from app.settings import settings
 
 
@@ -14,12 +15,70 @@ from app.settings import settings
 security = HTTPBearer()
 
 
+def decode_access_token(token: str) -> Optional[dict]:
+    """Verify an access token, reusing the payload of a recently verified one.
+
+    Args:
+        token: Encoded JWT
+
+    Returns:
+        Token payload, or None if the token is invalid or not an access token
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    try:
+        payload = jwt.decode(
+            token,
+            settings.jwt_secret,
+            algorithms=[settings.jwt_algorithm]
+        )
+    except JWTError:
+        return None
+
+    if payload.get("sub") is None or payload.get("type") != "access":
+        return None
+
+    token_cache.set(token, payload)
+    return payload
+
+
+def load_principal(db: Session, user_id: str) -> Optional[Principal]:
+    """Get an active user's principal from the cache or the database.
+
+    Args:
+        db: Database session (only used on a cache miss)
+        user_id: User identifier
+
+    Returns:
+        Principal (inactive users are returned but not cached), or None if
+        the user does not exist
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+
+    principal = Principal.from_user(user)
+    if principal.is_active:
+        principal_cache.set(principal)
+    return principal
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """Get current authenticated user from JWT token.
 
+    Verified tokens and active users are cached (see
+    ``app.services.principals``), so repeated requests with the same token
+    skip both the signature check and the user query.
+
     Args:
         credentials: HTTP Bearer token credentials
         db: Database session
@@ -30,33 +89,17 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
-
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        # Decode JWT token
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret,
-            algorithms=[settings.jwt_algorithm]
-        )
-
-        user_id: Optional[str] = payload.get("sub")
-        token_type: Optional[str] = payload.get("type")
-
-        if user_id is None or token_type != "access":
-            raise credentials_exception
-
-    except JWTError:
+    payload = decode_access_token(credentials.credentials)
+    if payload is None:
         raise credentials_exception
 
-    # Get user from database
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = load_principal(db, payload["sub"])
 
     if user is None:
         raise credentials_exception
@@ -73,7 +116,7 @@ async def get_current_user(
 async def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[Principal]:
     """Get current user if authenticated, otherwise return None.
 
     Useful for endpoints that have different behavior for authenticated vs anonymous users.
@@ -2,5 +2,11 @@
 from app.models.user import User, Subscription
 from app.models.scan import Scan, DetectedItem, ItemMatch
 from app.models.product import Product
+from app.models.job import ScanJob
+from app.models.blob import ImageBlob
+from app.models.catalog import CatalogChange, CatalogState
 
-__all__ = ["User", "Subscription", "Scan", "DetectedItem", "ItemMatch", "Product"]
+__all__ = [
+    "User", "Subscription", "Scan", "DetectedItem", "ItemMatch", "Product", "ScanJob",
+    "ImageBlob", "CatalogState", "CatalogChange",
+]
@@ -0,0 +1,29 @@
+"""Content-addressed upload models."""
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ImageBlob(Base):
+    """Uploaded image stored once per unique content hash.
+
+    ``ref_count`` is the number of scans using the file; the file (and its
+    thumbnail) is deleted when the last of them is deleted.
+    """
+
+    __tablename__ = "image_blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # SHA-256 hex
+    image_url: Mapped[str] = mapped_column(Text, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of ImageBlob."""
+        return f"<ImageBlob(hash={self.hash[:12]}, refs={self.ref_count})>"
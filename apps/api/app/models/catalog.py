@@ -0,0 +1,180 @@
+"""Catalog version model.
+
+``CatalogState`` holds a single row whose ``version`` increases in the same
+transaction as any change to the product catalog. Anything derived from
+the catalog (cached scan results, caches of product data) can be keyed by
+this version instead of tracking individual product changes.
+
+``CatalogChange`` is the delta log of product writes: every transaction
+that writes products also appends the ids it wrote, so an in-memory
+vector index (built, or loaded from a snapshot, see
+``app.services.index_snapshots``) can catch up on the products other
+processes changed since. Writers bump the version before appending to the
+log; the version row stays locked until commit, so log sequence numbers
+are handed out in commit order and a reader never skips an entry that
+commits late. Pruning the log records the last deleted sequence number
+in ``CatalogState.change_log_pruned_seq``; readers behind it rebuild.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import DateTime, Integer, String, delete, event, func, insert, select, update
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from app.database import Base
+from app.models.product import Product
+from app.settings import settings
+
+CATALOG_STATE_ID = 1
+
+
+class CatalogState(Base):
+    """Monotonic version of the product catalog (single row)."""
+
+    __tablename__ = "catalog_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    change_log_pruned_seq: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of CatalogState."""
+        return f"<CatalogState(version={self.version})>"
+
+
+class CatalogChange(Base):
+    """Product written by a catalog transaction (append-only delta log)."""
+
+    __tablename__ = "catalog_changes"
+    # Never reuse sequence numbers of pruned entries (SQLite reuses rowids otherwise)
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    product_id: Mapped[str | None] = mapped_column(String(36), nullable=True)  # NULL: any product may have changed
+    changed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation of CatalogChange."""
+        return f"<CatalogChange(seq={self.seq}, product={self.product_id})>"
+
+
+def get_catalog_version(db: Session) -> int:
+    """Return the current catalog version (0 before the first product write)."""
+    version = db.execute(
+        select(CatalogState.version).where(CatalogState.id == CATALOG_STATE_ID)
+    ).scalar()
+    return version or 0
+
+
+def bump_catalog_version(connection) -> None:
+    """Increment the catalog version on ``connection`` (inside its transaction)."""
+    table = CatalogState.__table__
+    result = connection.execute(
+        update(table)
+        .where(table.c.id == CATALOG_STATE_ID)
+        .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        connection.execute(
+            insert(table).values(id=CATALOG_STATE_ID, version=1, updated_at=datetime.utcnow())
+        )
+
+
+def record_product_changes(connection, product_ids: Iterable[str | None]) -> None:
+    """Append product ids to the change log on ``connection`` (inside its transaction).
+
+    Call after ``bump_catalog_version`` in the same transaction. A ``None``
+    id records a change that cannot be attributed to products (bulk query
+    updates), which makes readers rebuild the index instead of replaying
+    the log.
+    """
+    now = datetime.utcnow()
+    rows = [{"product_id": product_id, "changed_at": now} for product_id in product_ids]
+    if rows:
+        connection.execute(insert(CatalogChange.__table__), rows)
+
+
+def get_latest_change_seq(db: Session) -> int:
+    """Return the sequence number of the last logged change (0 if none)."""
+    return db.execute(select(func.max(CatalogChange.seq))).scalar() or 0
+
+
+def get_change_log_pruned_seq(db: Session) -> int:
+    """Return the last pruned change log sequence number (0 if none)."""
+    pruned_seq = db.execute(
+        select(CatalogState.change_log_pruned_seq).where(CatalogState.id == CATALOG_STATE_ID)
+    ).scalar()
+    return pruned_seq or 0
+
+
+def prune_change_log(connection, up_to_seq: int) -> None:
+    """Delete change log entries up to and including ``up_to_seq``."""
+    if up_to_seq <= 0:
+        return
+    table = CatalogChange.__table__
+    connection.execute(delete(table).where(table.c.seq <= up_to_seq))
+    state = CatalogState.__table__
+    connection.execute(
+        update(state)
+        .where(state.c.id == CATALOG_STATE_ID, state.c.change_log_pruned_seq < up_to_seq)
+        .values(change_log_pruned_seq=up_to_seq)
+    )
+
+
+def expire_change_log(connection, retention_hours: float = settings.catalog_change_log_retention_hours) -> None:
+    """Delete change log entries older than ``retention_hours``.
+
+    Processes whose index is behind the pruned entries rebuild it (or load
+    the published snapshot) instead of replaying the log.
+    """
+    table = CatalogChange.__table__
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    up_to_seq = connection.execute(select(func.max(table.c.seq)).where(table.c.changed_at < cutoff)).scalar()
+    prune_change_log(connection, up_to_seq or 0)
+
+
+# --- Bump the version once per transaction that changes products ---
+
+_BUMPED_KEY = "catalog_version_bumped"
+
+
+def _bump_once(session: Session) -> None:
+    if not session.info.get(_BUMPED_KEY):
+        bump_catalog_version(session.connection())
+        session.info[_BUMPED_KEY] = True
+
+
+def _track_product_flush(session: Session, flush_context) -> None:
+    """Bump the version and log the products a flush wrote."""
+    changed = [
+        obj.id for obj in list(session.new) + list(session.deleted) if isinstance(obj, Product)
+    ]
+    changed.extend(
+        obj.id for obj in session.dirty
+        if isinstance(obj, Product) and session.is_modified(obj, include_collections=False)
+    )
+    if changed:
+        _bump_once(session)
+        record_product_changes(session.connection(), changed)
+
+
+def _track_product_bulk(update_context) -> None:
+    """Bump the version for bulk query updates/deletes of products."""
+    mapper = update_context.mapper
+    if mapper is not None and mapper.class_ is Product:
+        _bump_once(update_context.session)
+        record_product_changes(update_context.session.connection(), [None])
+
+
+def _reset(session: Session) -> None:
+    session.info.pop(_BUMPED_KEY, None)
+
+
+event.listen(Session, "after_flush", _track_product_flush)
+event.listen(Session, "after_bulk_update", _track_product_bulk)
+event.listen(Session, "after_bulk_delete", _track_product_bulk)
+event.listen(Session, "after_commit", _reset)
+event.listen(Session, "after_rollback", _reset)
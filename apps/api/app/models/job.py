@@ -0,0 +1,40 @@
+"""Background job models."""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ScanJob(Base):
+    """Queued scan processing job (database-backed job queue)."""
+
+    __tablename__ = "scan_jobs"
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    scan_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("scans.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    status: Mapped[str] = mapped_column(
+        String(20), default="queued", nullable=False, index=True
+    )  # queued, running, done, failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    visible_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+    locked_by: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of ScanJob."""
+        return f"<ScanJob(id={self.id}, scan={self.scan_id}, status={self.status}, attempts={self.attempts})>"
@@ -3,10 +3,12 @@ import uuid
 from datetime import datetime
 from typing import List
 
+import numpy as np
 from sqlalchemy import Boolean, DateTime, Float, String, Text, func, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.models.types import Embedding
 
 
 class Product(Base):
@@ -32,7 +34,7 @@ class Product(Base):
     affiliate_url: Mapped[str] = mapped_column(Text, nullable=False)
     retailer_url: Mapped[str] = mapped_column(Text, nullable=False)
     retailer_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    embedding: Mapped[dict | None] = mapped_column(JSON, nullable=True)  # Store vector as JSON
+    embedding: Mapped[np.ndarray | None] = mapped_column(Embedding, nullable=True)
     in_stock: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     last_updated: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), onupdate=func.now(), nullable=True
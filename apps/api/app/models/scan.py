@@ -3,16 +3,22 @@ import uuid
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, func, JSON
+import numpy as np
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.models.types import Embedding
 
 
 class Scan(Base):
     """Scan model representing a room photo analysis job."""
 
     __tablename__ = "scans"
+    __table_args__ = (
+        # Result cache lookup (see pipeline.find_cached_result)
+        Index("ix_scans_result_key", "image_hash", "vision_version", "catalog_version"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -28,9 +34,16 @@ class Scan(Base):
     )
     image_url: Mapped[str] = mapped_column(Text, nullable=False)
     thumbnail_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    image_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)  # ImageBlob.hash
+    vision_version: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    catalog_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
     share_token: Mapped[str | None] = mapped_column(String(64), unique=True, nullable=True)
     processing_time_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Processing attempt that owns the scan (see pipeline.start_scan)
+    processing_claim: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Serialized ScanResponse, stored when the scan completes
+    response_json: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
     )
@@ -49,6 +62,10 @@ class Scan(Base):
         return f"<Scan(id={self.id}, status={self.status})>"
 
 
+# Scan history keyset pagination (see scan_results.load_scan_history)
+Index("ix_scans_user_history", Scan.user_id, Scan.created_at.desc(), Scan.id.desc())
+
+
 class DetectedItem(Base):
     """Detected furniture item in a scanned room."""
 
@@ -70,7 +87,7 @@ class DetectedItem(Base):
     bbox_height: Mapped[float] = mapped_column(Float, nullable=False)
     confidence: Mapped[float] = mapped_column(Float, nullable=False)
     crop_url: Mapped[str | None] = mapped_column(Text, nullable=True)
-    embedding: Mapped[dict | None] = mapped_column(JSON, nullable=True)  # Store as JSON for SQLite
+    embedding: Mapped[np.ndarray | None] = mapped_column(Embedding, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -0,0 +1,139 @@
+"""Custom column types."""
+import struct
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.settings import settings
+
+try:
+    from pgvector.sqlalchemy import Vector
+except ImportError:  # Only needed with PostgreSQL
+    Vector = None
+
+
+# Embedding blob layout (little-endian):
+#   byte 0      format code (see _FORMATS)
+#   bytes 1-3   reserved
+#   bytes 4-7   float32 L2 norm of the original vector
+#   bytes 8-11  float32 dequantization scale (int8 only, 1.0 otherwise)
+#   bytes 12-   payload: the unit-length vector in the stored dtype
+_HEADER = struct.Struct("<B3xff")
+_FORMATS = {
+    "float32": (1, np.dtype("<f4")),
+    "float16": (2, np.dtype("<f2")),
+    "int8": (3, np.dtype("i1")),
+}
+_DTYPES = {code: (name, dtype) for name, (code, dtype) in _FORMATS.items()}
+
+
+def encode_embedding(vector: Sequence[float], storage_format: Optional[str] = None) -> bytes:
+    """Encode an embedding vector into the compact binary column format.
+
+    The vector is stored unit-normalized, with its original norm kept in
+    the header.
+
+    Args:
+        vector: Embedding vector
+        storage_format: "float32", "float16" or "int8" (defaults to settings)
+
+    Returns:
+        Encoded bytes
+    """
+    code, dtype = _FORMATS[storage_format or settings.embedding_storage_format]
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    unit = array / norm if norm > 0 else array
+
+    scale = 1.0
+    if dtype.kind == "i":
+        peak = float(np.max(np.abs(unit))) if unit.size else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        payload = np.round(unit / scale).astype(dtype)
+    else:
+        payload = unit.astype(dtype)
+
+    return _HEADER.pack(code, norm, scale) + payload.tobytes()
+
+
+def decode_embedding(data: bytes, normalized: bool = True) -> np.ndarray:
+    """Decode an embedding blob.
+
+    float32 and float16 payloads are returned as zero-copy read-only views
+    over ``data`` (via ``np.frombuffer``); int8 payloads are dequantized
+    into a new float32 array.
+
+    Args:
+        data: Encoded bytes
+        normalized: Return the unit-length vector (default) rather than
+            rescaling it to its original norm
+
+    Returns:
+        Embedding array
+    """
+    code, norm, scale = _HEADER.unpack_from(data)
+    _, dtype = _DTYPES[code]
+    vector = np.frombuffer(data, dtype=dtype, offset=_HEADER.size)
+
+    if dtype.kind == "i":
+        vector = vector.astype(np.float32) * np.float32(scale)
+    if not normalized:
+        vector = vector.astype(np.float32) * np.float32(norm)
+    return vector
+
+
+def embedding_norm(data: bytes) -> float:
+    """Read the stored original norm of an embedding blob without decoding it."""
+    return _HEADER.unpack_from(data)[1]
+
+
+def unit_vector(value) -> np.ndarray:
+    """Unit-length float32 copy of a vector (or of an encoded blob)."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.array(decode_embedding(bytes(value)), dtype=np.float32)
+    array = np.asarray(value, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else array
+
+
+class Embedding(TypeDecorator):
+    """Embedding vector stored as a compact binary blob.
+
+    Accepts any float sequence or ndarray on write and returns the
+    unit-length vector as an ndarray on read (see ``decode_embedding``).
+
+    On PostgreSQL the column is a pgvector ``vector(embedding_dimension)``
+    holding the unit-length float32 vector instead, so similarity search
+    can run in the database.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        """Use pgvector's vector type on PostgreSQL."""
+        if dialect.name == "postgresql":
+            if Vector is None:
+                raise RuntimeError("pgvector is not installed. Install it with: pip install pgvector")
+            return dialect.type_descriptor(Vector(settings.embedding_dimension))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        """Encode vectors on the way into the database."""
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return unit_vector(value)
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value)
+        return encode_embedding(value)
+
+    def process_result_value(self, value, dialect):
+        """Decode blobs on the way out of the database."""
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return np.asarray(value, dtype=np.float32)
+        return decode_embedding(value)
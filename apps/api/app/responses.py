@@ -0,0 +1,24 @@
+"""JSON response classes."""
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+class FastJSONResponse(ORJSONResponse):
+    """JSON response rendered by orjson, or by pydantic-core for models.
+
+    Used as the app's default response class, so plain dicts and lists are
+    encoded with orjson instead of the stdlib ``json`` module. Routes can
+    also return ``FastJSONResponse(model)`` directly: the Pydantic model is
+    then written straight to JSON bytes by pydantic-core (the engine behind
+    ``model_dump_json``), skipping FastAPI's response_model validation and
+    the intermediate dict.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Encode the response body."""
+        if isinstance(content, BaseModel):
+            return pydantic_core.to_json(content)
+        return super().render(content)
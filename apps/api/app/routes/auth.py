@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
+from app.responses import FastJSONResponse
 from app.schemas.auth import (
     RegisterRequest,
     LoginRequest,
@@ -41,7 +42,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     # Create new user
     user = User(
         email=request.email,
-        password_hash=auth_service.hash_password(request.password),
+        password_hash=await auth_service.hash_password_async(request.password),
         name=request.name,
         subscription_tier="free",
         scans_this_month=0,
@@ -55,13 +56,16 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     access_token = auth_service.create_access_token({"sub": user.id})
     refresh_token = auth_service.create_refresh_token({"sub": user.id})
 
-    return AuthResponse(
-        user=UserResponse.model_validate(user),
-        tokens=TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=15 * 60,  # 15 minutes
+    return FastJSONResponse(
+        AuthResponse(
+            user=UserResponse.model_validate(user),
+            tokens=TokenResponse(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                expires_in=15 * 60,  # 15 minutes
+            ),
         ),
+        status_code=status.HTTP_201_CREATED,
     )
 
 
@@ -87,24 +91,33 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
             detail={"code": "INVALID_CREDENTIALS", "message": "Invalid email or password"}
         )
 
-    # Verify password
-    if not auth_service.verify_password(request.password, user.password_hash):
+    # Verify password (off the event loop)
+    valid, new_hash = await auth_service.verify_and_update_password_async(request.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"code": "INVALID_CREDENTIALS", "message": "Invalid email or password"}
         )
 
+    # Upgrade hashes made with an outdated scheme or cost
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+        db.refresh(user)
+
     # Generate tokens
     access_token = auth_service.create_access_token({"sub": user.id})
     refresh_token = auth_service.create_refresh_token({"sub": user.id})
 
-    return AuthResponse(
-        user=UserResponse.model_validate(user),
-        tokens=TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=15 * 60,  # 15 minutes
-        ),
+    return FastJSONResponse(
+        AuthResponse(
+            user=UserResponse.model_validate(user),
+            tokens=TokenResponse(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                expires_in=15 * 60,  # 15 minutes
+            ),
+        )
     )
 
 
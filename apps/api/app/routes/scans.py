@@ -1,20 +1,37 @@
 """Scan management routes."""
+import json
 import uuid
-from typing import List
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from PIL import Image
-import io
+from pathlib import Path
+from PIL import Image, UnidentifiedImageError
 
-from app.database import get_db
+from app.database import ReadSessionLocal, get_db, get_read_db
 from app.middleware.auth import get_current_user
-from app.models.user import User
+from app.responses import FastJSONResponse
 from app.models.scan import Scan, DetectedItem, ItemMatch
 from app.models.product import Product
-from app.schemas.scan import ScanResponse, ScanListResponse, DetectedItemResponse
-from app.services.storage import storage_service
-from app.services.vision import vision_provider
-from app.services.matching import generate_stub_embedding, find_matching_products, rank_products
+from app.schemas.scan import ScanResponse, ScanListResponse
+from app.services.blobs import acquire_blob, delete_unreferenced_blob, release_blob
+from app.services.pipeline import reuse_cached_result
+from app.services.principals import Principal
+from app.services.scan_results import (
+    InvalidCursorError,
+    SerializedScan,
+    invalidate_scan_response,
+    load_scan_detail,
+    load_scan_history,
+    load_serialized_scan,
+)
+from app.services.storage import StoredUpload, storage_service
+from app.services.uploads import InvalidUploadError, ReceivedUpload, UploadTooLargeError, receive_upload
+from app.services.queue import job_queue
+from app.services.events import TERMINAL_STAGES, event_bus, publish_scan_event
+from app.services.executor import run_blocking
+from app.settings import settings
 
 
 router = APIRouter()
@@ -26,24 +43,52 @@ ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "webp"}
 MIN_IMAGE_SIZE = (400, 400)
 MAX_IMAGE_SIZE = (4000, 4000)
 
-
-def validate_image(file: UploadFile) -> None:
-    """Validate uploaded image file.
+# create_scan reads the body itself; describe the form for the OpenAPI docs
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+# Scan status implied by the latest progress event
+STAGE_STATUS = {
+    "uploaded": "pending",
+    "retrying": "pending",
+    "processing": "processing",
+    "detected": "processing",
+    "item_matched": "processing",
+    "completed": "completed",
+    "failed": "failed",
+}
+
+
+def validate_image(filename: str, content_type: str) -> None:
+    """Validate uploaded image file name and type (before reading its data).
 
     Args:
-        file: Uploaded file
+        filename: Uploaded filename
+        content_type: Uploaded content type
 
     Raises:
         HTTPException: If validation fails
     """
     # Check extension
-    if not file.filename:
+    if not filename:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Filename is required"
         )
 
-    ext = file.filename.rsplit(".", 1)[-1].lower()
+    ext = filename.rsplit(".", 1)[-1].lower()
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -51,176 +96,253 @@ def validate_image(file: UploadFile) -> None:
         )
 
     # Check content type
-    if not file.content_type or not file.content_type.startswith("image/"):
+    if not content_type or not content_type.startswith("image/"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File must be an image"
         )
 
 
-@router.post("", response_model=ScanResponse, status_code=status.HTTP_201_CREATED)
-async def create_scan(
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Upload and process room image.
+def validate_image_header(image_path: Path) -> None:
+    """Validate image format and dimensions from the file header only.
+
+    ``Image.open`` is lazy: it identifies the format and reads the size
+    without decoding any pixel data.
+
+    Args:
+        image_path: Path to the received file
+
+    Raises:
+        HTTPException: If validation fails
+    """
+    try:
+        with Image.open(image_path) as image:
+            width, height = image.size
+    except UnidentifiedImageError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid image file: unrecognized image format"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid image file: {str(e)}"
+        )
+
+    if width < MIN_IMAGE_SIZE[0] or height < MIN_IMAGE_SIZE[1]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Image too small. Minimum size: {MIN_IMAGE_SIZE[0]}x{MIN_IMAGE_SIZE[1]}"
+        )
+
+    if width > MAX_IMAGE_SIZE[0] or height > MAX_IMAGE_SIZE[1]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Image too large. Maximum size: {MAX_IMAGE_SIZE[0]}x{MAX_IMAGE_SIZE[1]}"
+        )
+
+
+def create_scan_record(db: Session, user_id: str, upload: StoredUpload, temp_path: Path) -> Scan:
+    """Create a pending scan, take a reference on its image and store the file.
+
+    Args:
+        db: Database session
+        user_id: Owner of the scan
+        upload: Content-addressed location of the upload
+        temp_path: Received temporary file (moved into place unless the
+            content is already stored)
+
+    Returns:
+        Committed scan
+    """
+    for attempt in range(2):
+        try:
+            scan = Scan(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                image_url=acquire_blob(db, upload, temp_path),
+                image_hash=upload.content_hash,
+                status="pending"
+            )
+            db.add(scan)
+            db.commit()
+            db.refresh(scan)
+            return scan
+        except IntegrityError:
+            # Same image uploaded concurrently for the first time; retry as a repeat
+            db.rollback()
+            if attempt:
+                raise
+
+
+def save_scan_upload(db: Session, user_id: str, received: ReceivedUpload) -> ScanResponse:
+    """Validate and store an upload, create the scan and queue it (blocking).
 
     Args:
-        file: Image file to scan
-        current_user: Authenticated user
         db: Database session
+        user_id: Owner of the scan
+        received: Upload streamed into a temporary file
 
     Returns:
-        Scan with detected items and product matches
+        Pending scan (completed right away if an identical upload's result
+        could be reused)
 
     Raises:
-        HTTPException: If validation fails or processing error
+        HTTPException: If validation, storage or queueing fails
     """
-    # Validate image
-    validate_image(file)
+    validate_image_header(received.temp_path)
 
-    # Read and validate image data
     try:
-        image_data = await file.read()
-
-        if len(image_data) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
-            )
+        # Store the original under its content hash; thumbnailing and
+        # detection happen in the worker
+        upload = storage_service.content_addressed(received.content_hash, received.size, received.filename)
+        scan = create_scan_record(db, user_id, upload, received.temp_path)
 
-        # Open with PIL to validate
-        image = Image.open(io.BytesIO(image_data))
-        width, height = image.size
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error saving scan: {str(e)}"
+        )
 
-        if width < MIN_IMAGE_SIZE[0] or height < MIN_IMAGE_SIZE[1]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Image too small. Minimum size: {MIN_IMAGE_SIZE[0]}x{MIN_IMAGE_SIZE[1]}"
-            )
+    publish_scan_event(scan.id, "uploaded")
 
-        if width > MAX_IMAGE_SIZE[0] or height > MAX_IMAGE_SIZE[1]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Image too large. Maximum size: {MAX_IMAGE_SIZE[0]}x{MAX_IMAGE_SIZE[1]}"
-            )
+    # Repeat upload of an already processed image - no need to queue
+    try:
+        if reuse_cached_result(db, scan):
+            return load_scan_detail(db, scan.id)
+    except Exception as e:
+        db.rollback()
+        print(f"Error reusing cached scan result: {e}")
 
-    except HTTPException:
-        raise
+    # Hand off to the scan workers
+    try:
+        job_queue.enqueue(scan.id)
     except Exception as e:
+        scan.status = "failed"
+        scan.error_message = f"Could not queue scan: {str(e)}"
+        db.commit()
+        publish_scan_event(scan.id, "failed", error=scan.error_message)
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid image file: {str(e)}"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scan processing is temporarily unavailable"
         )
 
-    # Reset file pointer for storage
-    await file.seek(0)
+    return load_scan_detail(db, scan.id)
 
-    try:
-        # Save image
-        image_url, thumbnail_url = storage_service.save_upload(file.file, file.filename)
-
-        # Create scan record
-        scan = Scan(
-            scan_id=str(uuid.uuid4()),
-            user_id=current_user.user_id,
-            image_url=image_url,
-            thumbnail_url=thumbnail_url,
-            status="processing"
+
+def check_scan_access(scan: Optional[SerializedScan], user_id: str) -> SerializedScan:
+    """Ensure a scan exists and belongs to the user.
+
+    Args:
+        scan: Serialized scan (None if not found)
+        user_id: Requesting user
+
+    Returns:
+        The scan
+
+    Raises:
+        HTTPException: If scan not found or unauthorized
+    """
+    if not scan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan not found"
         )
-        db.add(scan)
-        db.flush()  # Get scan.id
-
-        # Process image synchronously (no worker in no-Docker setup)
-        # Detect furniture
-        image_path = storage_service.get_file_path(image_url)
-        detections = vision_provider.detect_furniture(str(image_path))
-
-        # Process each detected item
-        for detection in detections:
-            # Create crop
-            crop_url = storage_service.save_crop(
-                image_url,
-                detection.bbox,
-                f"{scan.scan_id}_{detection.category}"
-            )
 
-            # Generate embedding
-            embedding_text = f"{detection.category} furniture"
-            embedding_vector = generate_stub_embedding(embedding_text)
+    # Check ownership
+    if scan.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this scan"
+        )
 
-            # Find matching products
-            matches = find_matching_products(
-                detection.category,
-                embedding_vector,
-                db,
-                limit=20
-            )
+    return scan
 
-            # Rank products
-            ranked_products = rank_products(matches, top_n=6)
-
-            # Create detected item
-            detected_item = DetectedItem(
-                item_id=str(uuid.uuid4()),
-                scan_id=scan.scan_id,
-                category=detection.category,
-                bbox_x=detection.bbox[0],
-                bbox_y=detection.bbox[1],
-                bbox_width=detection.bbox[2],
-                bbox_height=detection.bbox[3],
-                confidence=detection.confidence,
-                crop_url=crop_url,
-                embedding={"vector": embedding_vector}
-            )
-            db.add(detected_item)
-            db.flush()  # Get detected_item.id
-
-            # Create item matches
-            for product_data in ranked_products:
-                item_match = ItemMatch(
-                    match_id=str(uuid.uuid4()),
-                    item_id=detected_item.item_id,
-                    product_id=product_data["product_id"],
-                    similarity_score=product_data["similarity_score"],
-                    rank=product_data["rank"],
-                    is_budget_alternative=product_data["is_budget_alternative"]
-                )
-                db.add(item_match)
-
-        # Update scan status
-        scan.status = "completed"
-        scan.item_count = len(detections)
 
-        db.commit()
-        db.refresh(scan)
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@router.post(
+    "",
+    response_model=ScanResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra=UPLOAD_REQUEST_BODY,
+)
+async def create_scan(
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upload a room image and queue it for processing.
 
-        # Load relationships for response
-        scan_with_items = db.query(Scan).filter(Scan.scan_id == scan.scan_id).first()
+    The ``file`` form field is streamed to disk as it arrives; uploads over
+    the size limit are rejected as soon as the limit is crossed. The scan
+    is returned immediately with status "pending"; poll
+    ``GET /scans/{scan_id}`` for detected items and product matches.
 
-        return scan_with_items
+    Args:
+        request: Incoming multipart/form-data request
+        current_user: Authenticated user
+        db: Database session
 
-    except Exception as e:
-        db.rollback()
+    Returns:
+        Pending scan
+
+    Raises:
+        HTTPException: If validation fails or processing error
+    """
+    try:
+        received = await receive_upload(
+            request,
+            field_name="file",
+            max_size=MAX_FILE_SIZE,
+            directory=storage_service.uploads_path,
+            validate_part=validate_image,
+        )
+    except UploadTooLargeError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing scan: {str(e)}"
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
+        )
+    except InvalidUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
 
+    try:
+        # Header checks, the file move and DB calls run off the event loop
+        scan = await run_blocking(save_scan_upload, db, current_user.id, received)
+        return FastJSONResponse(scan, status_code=status.HTTP_202_ACCEPTED)
+    finally:
+        received.discard()
+
 
 @router.get("/{scan_id}", response_model=ScanResponse)
 async def get_scan(
     scan_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get scan by ID.
 
+    Completed scans are served from their stored JSON (usually from the
+    in-process cache, after a primary key check that the scan still exists). Responses carry a strong ``ETag``; send it
+    back as ``If-None-Match`` to get 304 Not Modified while unchanged.
+
     Args:
         scan_id: Scan identifier
+        if_none_match: ETag from a previous response
         current_user: Authenticated user
-        db: Database session
+        db: Read-only database session
 
     Returns:
         Scan with detected items and matches
@@ -228,80 +350,220 @@ async def get_scan(
     Raises:
         HTTPException: If scan not found or unauthorized
     """
-    scan = db.query(Scan).filter(Scan.scan_id == scan_id).first()
+    scan = await run_blocking(load_serialized_scan, db, scan_id)
+    scan = check_scan_access(scan, current_user.id)
 
-    if not scan:
+    headers = {"ETag": scan.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, scan.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=scan.body, media_type="application/json", headers=headers)
+
+
+def get_scan_status(db: Session, scan_id: str, user_id: str) -> str:
+    """Look up a scan's status, checking ownership.
+
+    Args:
+        db: Database session
+        scan_id: Scan identifier
+        user_id: Requesting user
+
+    Returns:
+        Scan status
+
+    Raises:
+        HTTPException: If scan not found or unauthorized
+    """
+    row = db.query(Scan.user_id, Scan.status).filter(Scan.id == scan_id).first()
+
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scan not found"
         )
 
-    # Check ownership
-    if scan.user_id != current_user.user_id:
+    if row.user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this scan"
         )
 
-    return scan
+    return row.status
 
 
-@router.get("", response_model=ScanListResponse)
-async def list_scans(
-    skip: int = 0,
-    limit: int = 20,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+def read_scan_status(scan_id: str) -> Optional[str]:
+    """Read a scan's status in a short-lived session.
+
+    Used while streaming, when the request session has already been
+    released. This also covers events lost by an in-process bus when the
+    workers run in other processes.
+    """
+    db = ReadSessionLocal()
+    try:
+        row = db.query(Scan.status).filter(Scan.id == scan_id).first()
+        return row.status if row else None
+    finally:
+        db.close()
+
+
+def format_sse(stage: str, data: dict, event_id: Optional[str] = None) -> str:
+    """Format one Server-Sent Events message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {stage}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_scan_events(scan_id: str, scan_status: str, last_event_id: Optional[str]) -> AsyncIterator[str]:
+    """Yield SSE messages for a scan until it completes or fails.
+
+    Starts with a ``status`` snapshot, replays events after
+    ``last_event_id`` (all known events when None), then waits for new
+    ones, sending keep-alive comments while idle.
+    """
+    yield format_sse("status", {"scan_id": scan_id, "status": scan_status})
+
+    version = last_event_id
+    for event in event_bus.events_since(scan_id, version):
+        yield format_sse(event.stage, event.to_dict(), event.version)
+        version = event.version
+        if event.stage in TERMINAL_STAGES:
+            return
+    if scan_status in TERMINAL_STAGES:
+        return
+
+    while True:
+        events = await event_bus.wait(scan_id, version, settings.scan_events_keepalive_seconds)
+        if not events:
+            current_status = await run_blocking(read_scan_status, scan_id)
+            if current_status is None or current_status in TERMINAL_STAGES:
+                yield format_sse("status", {"scan_id": scan_id, "status": current_status})
+                return
+            yield ": keep-alive\n\n"
+            continue
+
+        for event in events:
+            yield format_sse(event.stage, event.to_dict(), event.version)
+            version = event.version
+            if event.stage in TERMINAL_STAGES:
+                return
+
+
+@router.get("/{scan_id}/events")
+async def get_scan_events(
+    scan_id: str,
+    accept: Optional[str] = Header(None),
+    last_event_id: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    """List user's scans.
+    """Follow scan progress (uploaded, processing, detected, item_matched, completed).
+
+    With ``Accept: text/event-stream`` this streams Server-Sent Events
+    (``Last-Event-ID`` resumes a dropped stream). Otherwise it long-polls:
+    send the previous response's ``ETag`` as ``If-None-Match`` and the
+    request waits for newer events, answering 304 if none arrive in time.
 
     Args:
-        skip: Number of records to skip
-        limit: Maximum number of records to return
+        scan_id: Scan identifier
+        accept: Accept header
+        last_event_id: SSE resume token
+        if_none_match: Version token from a previous long-poll response
         current_user: Authenticated user
-        db: Database session
+        db: Read-only database session
 
     Returns:
-        List of scans with pagination
+        SSE stream, or events since the given version
+
+    Raises:
+        HTTPException: If scan not found or unauthorized
     """
-    # Get total count
-    total = db.query(Scan).filter(Scan.user_id == current_user.user_id).count()
-
-    # Get scans
-    scans = (
-        db.query(Scan)
-        .filter(Scan.user_id == current_user.user_id)
-        .order_by(Scan.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    scan_status = await run_blocking(get_scan_status, db, scan_id, current_user.id)
+    # Don't hold a pooled connection while waiting
+    db.close()
+
+    if accept and "text/event-stream" in accept:
+        return StreamingResponse(
+            stream_scan_events(scan_id, scan_status, last_event_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-    return ScanListResponse(
-        scans=scans,
-        total=total,
-        skip=skip,
-        limit=limit
+    version = if_none_match.strip().removeprefix("W/").strip('"') if if_none_match else None
+    if version is None or scan_status in TERMINAL_STAGES:
+        events = event_bus.events_since(scan_id, version)
+    else:
+        events = await event_bus.wait(scan_id, version, settings.scan_events_long_poll_timeout_seconds)
+        if not events:
+            scan_status = await run_blocking(read_scan_status, scan_id) or scan_status
+
+    current_version = events[-1].version if events else (version or event_bus.current_version(scan_id))
+    headers = {"ETag": f'"{current_version}"', "Cache-Control": "no-cache"}
+
+    if version is not None and not events and scan_status not in TERMINAL_STAGES:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FastJSONResponse(
+        {
+            "scan_id": scan_id,
+            "status": STAGE_STATUS.get(events[-1].stage, scan_status) if events else scan_status,
+            "version": current_version,
+            "events": [event.to_dict() for event in events],
+        },
+        headers=headers,
     )
 
 
-@router.delete("/{scan_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_scan(
-    scan_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("", response_model=ScanListResponse)
+async def list_scans(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    """Delete scan by ID.
+    """List user's scans, newest first.
+
+    Pages are cursor-based: pass the previous page's ``next_cursor`` as
+    ``cursor`` to continue.
 
     Args:
-        scan_id: Scan identifier
+        limit: Maximum number of records to return
+        cursor: Position after the previous page (omit for the first page)
+        include_total: Also return the total number of scans
         current_user: Authenticated user
+        db: Read-only database session
+
+    Returns:
+        Page of scans with the cursor for the next page
+
+    Raises:
+        HTTPException: If the cursor is invalid
+    """
+    try:
+        page = await run_blocking(load_scan_history, db, current_user.id, limit, cursor, include_total)
+        return FastJSONResponse(page)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def delete_scan_and_files(db: Session, scan_id: str, user_id: str) -> None:
+    """Delete a scan, then any stored files no other scan still uses (blocking).
+
+    Args:
         db: Database session
+        scan_id: Scan identifier
+        user_id: Requesting user
 
     Raises:
         HTTPException: If scan not found or unauthorized
     """
-    scan = db.query(Scan).filter(Scan.scan_id == scan_id).first()
+    scan = db.query(Scan).filter(Scan.id == scan_id).first()
 
     if not scan:
         raise HTTPException(
@@ -310,14 +572,62 @@ async def delete_scan(
         )
 
     # Check ownership
-    if scan.user_id != current_user.user_id:
+    if scan.user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this scan"
         )
 
+    crop_urls = {item.crop_url for item in scan.items if item.crop_url}
+    thumbnail_url = scan.thumbnail_url
+
     # Delete scan (cascade will delete detected items and matches)
     db.delete(scan)
+    db.flush()
+
+    # Crops may be shared with scans that reused this scan's result
+    shared_crops = {
+        url for (url,) in
+        db.query(DetectedItem.crop_url).filter(DetectedItem.crop_url.in_(crop_urls)).distinct()
+    } if crop_urls else set()
+
+    # Uploaded before content addressing, the files belong to this scan only
+    last_reference = scan.image_hash is None or release_blob(db, scan.image_hash)
     db.commit()
+    invalidate_scan_response(scan_id)
+
+    for url in crop_urls - shared_crops:
+        storage_service.delete_file(url)
+    if not last_reference:
+        return
+    derived_urls = [thumbnail_url] if thumbnail_url else []
+    if scan.image_hash is None:
+        for url in [scan.image_url, *derived_urls]:
+            storage_service.delete_file(url)
+    else:
+        # Re-checks the count under the row lock (a re-upload may hold it now)
+        delete_unreferenced_blob(db, scan.image_hash, derived_urls)
+
+
+@router.delete("/{scan_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_scan(
+    scan_id: str,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete scan by ID.
+
+    Stored images are shared by scans of identical uploads and are only
+    removed with the last scan that uses them.
+
+    Args:
+        scan_id: Scan identifier
+        current_user: Authenticated user
+        db: Database session
+
+    Raises:
+        HTTPException: If scan not found or unauthorized
+    """
+    await run_blocking(delete_scan_and_files, db, scan_id, current_user.id)
 
     return None
@@ -6,9 +6,9 @@ from pydantic import BaseModel, Field
 
 class ProductMatchResponse(BaseModel):
     """Product match information."""
-    product_id: int
+    product_id: str
     name: str
-    brand: str
+    brand: Optional[str] = None
     price: float
     currency: str
     image_url: Optional[str] = None
@@ -48,8 +48,11 @@ class ScanResponse(BaseModel):
     status: str
     item_count: int = 0
     detected_items: List[DetectedItemResponse] = []
+    processing_time_ms: Optional[int] = None
+    error_message: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    completed_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -68,8 +71,8 @@ class ScanListItemResponse(BaseModel):
 
 
 class ScanListResponse(BaseModel):
-    """Paginated list of scans."""
+    """Page of scans, newest first."""
     scans: List[ScanListItemResponse]
-    total: int
-    skip: int
+    next_cursor: Optional[str] = None  # Pass as ``cursor`` for the next page; None on the last page
+    total: Optional[int] = None  # Only when requested with ``include_total``
     limit: int
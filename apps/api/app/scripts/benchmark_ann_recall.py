@@ -0,0 +1,132 @@
+"""Recall-vs-exact harness for the approximate vector index backends.
+
+Builds a synthetic catalog from stub embedding vectors, computes
+exact top-k neighbours by brute force, then sweeps the recall/latency knobs
+(``nprobe`` for IVF, ``ef_search`` for HNSW) and reports recall@k and query
+latency for each setting.
+
+Usage:
+    python app/scripts/benchmark_ann_recall.py --n 1000000 --queries 200
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services import ann
+from app.services.ann import HNSWIndex, IVFIndex, top_k
+from app.services.embeddings import StubEmbeddingProvider
+
+
+def stub_matrix(prefix: str, count: int, dimension: int = 512) -> np.ndarray:
+    """Stack ``count`` stub embeddings into a float32 matrix."""
+    # Uncached: every vector is embedded once
+    provider = StubEmbeddingProvider(dimension)
+    matrix = np.empty((count, dimension), dtype=np.float32)
+    for i in range(count):
+        matrix[i] = provider.embed_text(f"{prefix} {i}")
+        if (i + 1) % 100_000 == 0:
+            print(f"  Generated {i + 1}/{count} {prefix} vectors...")
+    return matrix
+
+
+def exact_neighbours(vectors: np.ndarray, queries: np.ndarray, k: int) -> list:
+    """Brute-force top-k row indices for each query."""
+    results = []
+    for start in range(0, len(queries), 32):
+        scores = vectors @ queries[start:start + 32].T
+        for column in range(scores.shape[1]):
+            results.append(set(top_k(scores[:, column], k).tolist()))
+    return results
+
+
+def evaluate(name: str, search, queries: np.ndarray, truth: list, k: int) -> None:
+    """Run every query through ``search`` and print recall and latency."""
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len(expected.intersection(int(product_id) for product_id, _ in found))
+
+    latencies = np.array(latencies)
+    print(
+        f"  {name:<18} recall@{k}={hits / (k * len(queries)):.3f}  "
+        f"mean={latencies.mean():.2f}ms  p99={np.percentile(latencies, 99):.2f}ms"
+    )
+
+
+def main() -> None:
+    """Run the harness."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000, help="Catalog size")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=20, help="Neighbours per query")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default ~sqrt(n))")
+    parser.add_argument("--nprobe", default="1,4,16,64", help="Comma-separated IVF nprobe sweep")
+    parser.add_argument("--ef-search", default="32,64,128,256", help="Comma-separated HNSW ef_search sweep")
+    args = parser.parse_args()
+
+    print(f"Generating {args.n} catalog and {args.queries} query embeddings...")
+    vectors = stub_matrix("product", args.n)
+    queries = stub_matrix("query", args.queries)
+    ids = [str(i) for i in range(args.n)]
+
+    started = time.perf_counter()
+    truth = exact_neighbours(vectors, queries, args.k)
+    exact_ms = (time.perf_counter() - started) * 1000 / args.queries
+    print(f"\nExact search: {exact_ms:.2f}ms/query")
+
+    # IVF
+    print("\nIVF (pure NumPy):")
+    started = time.perf_counter()
+    ivf = IVFIndex.train(vectors, nlist=args.nlist)
+    trained = time.perf_counter()
+    ivf.add(ids, vectors)
+    print(
+        f"  nlist={ivf.nlist}  train={trained - started:.1f}s  "
+        f"add={time.perf_counter() - trained:.1f}s"
+    )
+    for nprobe in [int(value) for value in args.nprobe.split(",")]:
+        evaluate(f"nprobe={nprobe}", lambda q: ivf.search(q, args.k, nprobe=nprobe), queries, truth, args.k)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        ivf.save(Path(tmp))
+        saved = time.perf_counter()
+        IVFIndex.load(Path(tmp))
+        print(f"  save={saved - started:.1f}s  load={time.perf_counter() - saved:.1f}s")
+
+    # HNSW
+    print("\nHNSW (hnswlib):")
+    if ann.hnswlib is None:
+        print("  [!] hnswlib not installed, skipping.")
+        return
+
+    started = time.perf_counter()
+    hnsw = HNSWIndex(vectors.shape[1], capacity=args.n)
+    hnsw.add(ids, vectors)
+    print(f"  build={time.perf_counter() - started:.1f}s")
+    for ef_search in [int(value) for value in args.ef_search.split(",")]:
+        evaluate(
+            f"ef_search={ef_search}",
+            lambda q: hnsw.search(q, args.k, ef_search=ef_search),
+            queries, truth, args.k,
+        )
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print(" Splay ANN Recall Benchmark")
+    print("=" * 50)
+    print()
+    main()
+    print()
+    print("Done!")
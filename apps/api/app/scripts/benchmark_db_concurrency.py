@@ -0,0 +1,199 @@
+"""Concurrent scan writes and history reads under both SQLite profiles.
+
+Writer threads insert scans with their detected items and matches (one
+transaction per scan, like the pipeline); reader threads load scan details
+and the user's scan history. The "default" profile uses SQLite's rollback
+journal with one shared pool; the "performance" profile uses WAL and the
+pragmas from ``sqlite_pragmas`` with a separate query-only pool for reads.
+
+Usage:
+    python app/scripts/benchmark_db_concurrency.py --writers 4 --readers 16 --seconds 10
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.database import Base, create_db_engine
+from app.models import Product, Scan, User
+from app.services.scan_results import insert_scan_results, load_scan_detail
+
+DETECTIONS_PER_SCAN = 5
+MATCHES_PER_ITEM = 6
+SEED_SCANS = 200
+HISTORY_PAGE_SIZE = 20
+
+
+class Stats:
+    """Thread-safe latency samples and error counts for one operation."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+
+    def record(self, seconds: float) -> None:
+        with self.lock:
+            self.latencies.append(seconds * 1000)
+
+    def error(self) -> None:
+        with self.lock:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(self.latencies, q))
+
+
+def write_scan(SessionLocal, user_id: str, product_ids: list, rng: random.Random) -> str:
+    """Insert one completed scan with items and matches."""
+    db = SessionLocal()
+    try:
+        scan_id = str(uuid.uuid4())
+        db.add(Scan(id=scan_id, user_id=user_id, image_url="/storage/uploads/x.jpg", status="completed"))
+        db.flush()
+        items, matches = [], []
+        for _ in range(DETECTIONS_PER_SCAN):
+            item_id = str(uuid.uuid4())
+            items.append({
+                "id": item_id, "scan_id": scan_id, "category": "sofa",
+                "bbox_x": 0.1, "bbox_y": 0.2, "bbox_width": 0.3, "bbox_height": 0.4,
+                "confidence": 0.9, "crop_url": f"/storage/crops/{item_id}.jpg",
+            })
+            for rank in range(1, MATCHES_PER_ITEM + 1):
+                matches.append({
+                    "id": str(uuid.uuid4()), "item_id": item_id, "product_id": rng.choice(product_ids),
+                    "similarity_score": 0.8, "rank": rank, "is_budget_alternative": 0,
+                })
+        insert_scan_results(db, items, matches)
+        db.commit()
+        return scan_id
+    finally:
+        db.close()
+
+
+def read_history(ReadSession, user_id: str, scan_ids: list, rng: random.Random) -> None:
+    """Load one scan's detail and the user's latest scans."""
+    db = ReadSession()
+    try:
+        load_scan_detail(db, rng.choice(scan_ids))
+        db.execute(
+            select(Scan.id, Scan.status, Scan.created_at)
+            .where(Scan.user_id == user_id)
+            .order_by(Scan.created_at.desc())
+            .limit(HISTORY_PAGE_SIZE)
+        ).all()
+    finally:
+        db.close()
+
+
+def run_profile(profile: str, directory: str, args) -> dict:
+    """Run the mixed workload against a fresh database."""
+    url = f"sqlite:///{directory}/{profile}.db"
+    pool_size = args.writers + args.readers
+    engine = create_db_engine(url, profile=profile, pool_size=pool_size)
+    if profile == "performance":
+        read_engine = create_db_engine(url, read_only=True, profile=profile, pool_size=pool_size)
+    else:
+        read_engine = engine
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    ReadSession = sessionmaker(bind=read_engine)
+
+    db = SessionLocal()
+    user_id = str(uuid.uuid4())
+    db.add(User(id=user_id, email="bench@example.com", password_hash="x", name="Bench"))
+    product_ids = [str(uuid.uuid4()) for _ in range(200)]
+    db.add_all([
+        Product(
+            id=product_id, external_id=f"bench-{i}", name=f"Product {i}", category="sofa",
+            price=100.0, image_url="https://example.com/p.jpg", affiliate_url="https://example.com",
+            retailer_url="https://example.com", retailer_name="Example",
+        )
+        for i, product_id in enumerate(product_ids)
+    ])
+    db.commit()
+    db.close()
+
+    seed_rng = random.Random(0)
+    scan_ids = [write_scan(SessionLocal, user_id, product_ids, seed_rng) for _ in range(SEED_SCANS)]
+
+    writes, reads = Stats(), Stats()
+    deadline = time.perf_counter() + args.seconds
+
+    def writer(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                write_scan(SessionLocal, user_id, product_ids, rng)
+                writes.record(time.perf_counter() - start)
+            except OperationalError:
+                writes.error()  # database is locked
+
+    def reader(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                read_history(ReadSession, user_id, scan_ids, rng)
+                reads.record(time.perf_counter() - start)
+            except OperationalError:
+                reads.error()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(1000 + i,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    read_engine.dispose()
+    engine.dispose()
+    return {"writes": writes, "reads": reads}
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark concurrent scan writes and reads")
+    parser.add_argument("--writers", type=int, default=4, help="Writer threads (scan uploads)")
+    parser.add_argument("--readers", type=int, default=16, help="Reader threads (history reads)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration per profile")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Database Concurrency Benchmark")
+    print("=" * 50)
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:.0f}s per profile\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {profile: run_profile(profile, directory, args) for profile in ("default", "performance")}
+
+    print(f"{'profile':<12}{'op':<7}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for profile, result in results.items():
+        for name, stats in result.items():
+            print(
+                f"{profile:<12}{name:<7}{len(stats.latencies) / args.seconds:>9.1f}"
+                f"{statistics.median(stats.latencies) if stats.latencies else 0:>9.2f}"
+                f"{stats.percentile(95):>9.2f}{stats.percentile(99):>9.2f}{stats.errors:>8}"
+            )
+
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Per-scan CPU time of the image pipeline: legacy vs single-decode.
+
+Legacy: ``create_thumbnail`` plus one ``save_crop`` per detection, each of
+which opens and fully decodes the upload again (2 + N decodes).
+Single-decode: ``render_scan_images``, which draft-decodes the upload once
+and encodes the thumbnail and crops in parallel.
+
+Usage:
+    python app/scripts/benchmark_image_pipeline.py --width 4000 --height 3000 --detections 3
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.storage import StorageService
+
+
+def make_photo(path: Path, width: int, height: int) -> None:
+    """Write a synthetic photo-like JPEG (smooth gradients plus grain)."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        128 + 100 * np.sin(x / 180.0),
+        128 + 100 * np.cos(y / 150.0),
+        128 + 100 * np.sin((x + y) / 260.0),
+    ], axis=-1)
+    grain = rng.normal(0, 12, size=base.shape).astype(np.float32)
+    pixels = np.clip(base + grain, 0, 255).astype(np.uint8)
+    Image.fromarray(pixels, "RGB").save(path, "JPEG", quality=92)
+
+
+def make_bboxes(count: int) -> list:
+    """Spread ``count`` normalized bboxes over the image."""
+    rng = np.random.default_rng(1)
+    bboxes = []
+    for _ in range(count):
+        w, h = rng.uniform(0.1, 0.5, size=2)
+        x, y = rng.uniform(0, 1 - w), rng.uniform(0, 1 - h)
+        bboxes.append((float(x), float(y), float(w), float(h)))
+    return bboxes
+
+
+def legacy(storage: StorageService, image_url: str, bboxes: list) -> None:
+    """Decode once for the thumbnail and again for every crop."""
+    storage.create_thumbnail(image_url)
+    for index, bbox in enumerate(bboxes):
+        storage.save_crop(image_url, bbox, f"legacy_{index}")
+
+
+def single_decode(storage: StorageService, image_url: str, bboxes: list) -> None:
+    """Decode once and derive everything from that image."""
+    storage.render_scan_images(image_url, [(bbox, f"single_{i}") for i, bbox in enumerate(bboxes)])
+
+
+def measure(fn, runs: int) -> tuple:
+    """Return (median CPU ms, median wall ms) over ``runs`` calls."""
+    cpu, wall = [], []
+    for _ in range(runs):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        fn()
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+    return statistics.median(cpu), statistics.median(wall)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark scan image processing")
+    parser.add_argument("--width", type=int, default=4000, help="Image width (default 4000, 12MP)")
+    parser.add_argument("--height", type=int, default=3000, help="Image height")
+    parser.add_argument("--detections", type=int, default=3, help="Crops per scan")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per variant")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Image Pipeline Benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage = StorageService(Path(directory))
+        image_path = storage.uploads_path / "benchmark.jpg"
+        make_photo(image_path, args.width, args.height)
+        image_url = "/storage/uploads/benchmark.jpg"
+        bboxes = make_bboxes(args.detections)
+
+        print(f"Image: {args.width}x{args.height} JPEG ({image_path.stat().st_size / 1024:.0f} KB), "
+              f"{args.detections} detections, {args.runs} runs\n")
+
+        legacy_cpu, legacy_wall = measure(lambda: legacy(storage, image_url, bboxes), args.runs)
+        single_cpu, single_wall = measure(lambda: single_decode(storage, image_url, bboxes), args.runs)
+
+        print(f"{'variant':<15}{'decodes':>9}{'cpu ms':>10}{'wall ms':>10}")
+        print(f"{'legacy':<15}{2 + args.detections:>9}{legacy_cpu:>10.1f}{legacy_wall:>10.1f}")
+        print(f"{'single-decode':<15}{1:>9}{single_cpu:>10.1f}{single_wall:>10.1f}")
+        print(f"\nCPU time: {legacy_cpu / single_cpu:.1f}x less, wall time: {legacy_wall / single_wall:.1f}x less")
+
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
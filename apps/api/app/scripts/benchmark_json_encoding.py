@@ -0,0 +1,176 @@
+"""Compare JSON encoders on scan payloads and history pages.
+
+Builds synthetic ``ScanResponse`` and ``ScanListResponse`` models and times
+each way the API could turn them into response bytes:
+
+- jsonable_encoder: ``jsonable_encoder`` + ``json.dumps`` (FastAPI's
+  classic path)
+- fastapi default: response_model validation dump
+  (``TypeAdapter.dump_python(mode="json")``) + ``json.dumps``, as
+  ``JSONResponse`` does
+- dump + orjson: ``model_dump()`` + ``orjson.dumps`` (``ORJSONResponse``)
+- model_dump_json: ``pydantic_core.to_json`` straight from the model
+  (``FastJSONResponse``)
+
+Every encoder's output is parsed back and checked against the others.
+
+Usage:
+    python app/scripts/benchmark_json_encoding.py --repeat 200
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import orjson
+import pydantic_core
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.schemas.scan import (
+    DetectedItemResponse,
+    ProductMatchResponse,
+    ScanListItemResponse,
+    ScanListResponse,
+    ScanResponse,
+)
+
+MATCHES_PER_ITEM = 6
+
+
+def build_scan(items: int) -> ScanResponse:
+    """Build a completed scan with ``items`` detections of 6 matches each."""
+    now = datetime.now(timezone.utc)
+    detected_items = [
+        DetectedItemResponse(
+            item_id=str(uuid.uuid4()),
+            category="sofa",
+            bbox_x=0.1 * (i % 10),
+            bbox_y=0.05 * (i % 20),
+            bbox_width=0.25,
+            bbox_height=0.3333333,
+            confidence=0.87654321,
+            crop_url=f"/storage/crops/{uuid.uuid4()}.jpg",
+            matches=[
+                ProductMatchResponse(
+                    product_id=str(uuid.uuid4()),
+                    name=f"Mid-Century Modern Sofa {i}-{rank}",
+                    brand="Splay Home",
+                    price=899.99 - rank * 50,
+                    currency="USD",
+                    image_url=f"https://images.example.com/products/{i}/{rank}.jpg",
+                    retailer_name="Example Furniture Co.",
+                    retailer_url="https://shop.example.com/sofa",
+                    affiliate_url="https://shop.example.com/sofa?ref=splay",
+                    similarity_score=0.9 - rank * 0.01,
+                    rank=rank + 1,
+                    is_budget_alternative=rank == MATCHES_PER_ITEM - 1,
+                )
+                for rank in range(MATCHES_PER_ITEM)
+            ],
+        )
+        for i in range(items)
+    ]
+    return ScanResponse(
+        scan_id=str(uuid.uuid4()),
+        user_id=str(uuid.uuid4()),
+        image_url="/storage/scans/original.jpg",
+        thumbnail_url="/storage/scans/thumbnail.jpg",
+        status="completed",
+        item_count=items,
+        detected_items=detected_items,
+        processing_time_ms=1234,
+        created_at=now,
+        updated_at=now,
+        completed_at=now,
+    )
+
+
+def build_history(size: int) -> ScanListResponse:
+    """Build a history page of ``size`` scans."""
+    now = datetime.now(timezone.utc)
+    return ScanListResponse(
+        scans=[
+            ScanListItemResponse(
+                scan_id=str(uuid.uuid4()),
+                thumbnail_url=f"/storage/scans/{i}_thumb.jpg",
+                status="completed",
+                item_count=i % 8,
+                created_at=now - timedelta(minutes=i),
+            )
+            for i in range(size)
+        ],
+        next_cursor="eyJjIjoiMjAyNi0xMC0xN1QxMjowMDowMCIsImkiOiJhYmMifQ",
+        limit=size,
+    )
+
+
+def encoders(model) -> dict:
+    """Encoder name -> zero-argument function producing response bytes."""
+    adapter = TypeAdapter(type(model))
+    return {
+        "jsonable_encoder": lambda: json.dumps(jsonable_encoder(model)).encode("utf-8"),
+        "fastapi default": lambda: json.dumps(adapter.dump_python(model, mode="json")).encode("utf-8"),
+        "dump + orjson": lambda: orjson.dumps(model.model_dump()),
+        "model_dump_json": lambda: pydantic_core.to_json(model),
+    }
+
+
+def time_encoder(encode, repeat: int) -> float:
+    """Best-of-3 mean seconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            encode()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def run_case(label: str, model, repeat: int) -> None:
+    """Time every encoder on one payload and print a table."""
+    candidates = encoders(model)
+    reference = None
+    for name, encode in candidates.items():
+        # Encoders may format datetimes differently, so compare parsed models
+        parsed = type(model).model_validate_json(encode())
+        if reference is None:
+            reference = parsed
+        elif parsed != reference:
+            raise AssertionError(f"{name} produced a different payload for {label}")
+
+    size = len(candidates["model_dump_json"]())
+    print(f"\n{label} ({size / 1024:.1f} KiB)")
+    print(f"{'encoder':<18}{'us/call':>10}{'MB/s':>10}{'speedup':>10}")
+    baseline = None
+    for name, encode in candidates.items():
+        seconds = time_encoder(encode, repeat)
+        baseline = baseline or seconds
+        print(f"{name:<18}{seconds * 1e6:>10.1f}{size / seconds / 1e6:>10.1f}{baseline / seconds:>9.1f}x")
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="JSON encoder benchmark")
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per timing run")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("JSON Encoding Benchmark")
+    print("=" * 50)
+
+    run_case("Scan, 20 items x 6 matches", build_scan(20), args.repeat)
+    run_case("Scan, 100 items x 6 matches", build_scan(100), max(args.repeat // 5, 1))
+    run_case("History page, 100 scans", build_history(100), args.repeat)
+
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Scan result persistence: ORM unit of work vs bulk executemany INSERTs.
+
+ORM path: ``db.add`` per detected item, a flush, then ``db.add`` for each of
+its matches (the pre-bulk pipeline). Bulk path: ``insert_scan_results``,
+two executemany statements per scan. Both commit once per scan against a
+throwaway SQLite file database.
+
+Usage:
+    python app/scripts/benchmark_scan_persistence.py --scans 20
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.database import Base
+from app.models import DetectedItem, ItemMatch, Product, Scan, User
+from app.services.scan_results import insert_scan_results
+
+DETECTION_COUNTS = (3, 20, 100)
+MATCHES_PER_ITEM = 6
+
+
+def make_results(scan_id: str, product_ids: list, detections: int, rng) -> tuple:
+    """Item and match rows for one synthetic scan."""
+    items, matches = [], []
+    for _ in range(detections):
+        item_id = str(uuid.uuid4())
+        items.append({
+            "id": item_id, "scan_id": scan_id, "category": "sofa",
+            "bbox_x": 0.1, "bbox_y": 0.2, "bbox_width": 0.3, "bbox_height": 0.4,
+            "confidence": 0.9, "crop_url": f"/storage/crops/{item_id}.jpg",
+            "embedding": rng.standard_normal(512).astype(np.float32),
+        })
+        for rank in range(1, MATCHES_PER_ITEM + 1):
+            matches.append({
+                "id": str(uuid.uuid4()), "item_id": item_id,
+                "product_id": product_ids[int(rng.integers(len(product_ids)))],
+                "similarity_score": 0.8, "rank": rank, "is_budget_alternative": rank == MATCHES_PER_ITEM,
+            })
+    return items, matches
+
+
+def write_orm(db, items: list, matches: list) -> None:
+    """Unit-of-work path: add + flush per item, add per match."""
+    matches_by_item = {}
+    for match in matches:
+        matches_by_item.setdefault(match["item_id"], []).append(match)
+    for item in items:
+        db.add(DetectedItem(**item))
+        db.flush()
+        for match in matches_by_item[item["id"]]:
+            db.add(ItemMatch(**match))
+    db.commit()
+
+
+def write_bulk(db, items: list, matches: list) -> None:
+    """Bulk path: two executemany INSERTs."""
+    insert_scan_results(db, items, matches)
+    db.commit()
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark scan result persistence")
+    parser.add_argument("--scans", type=int, default=20, help="Scans written per variant and size")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Scan Persistence Benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/benchmark.db")
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(bind=engine)
+        rng = np.random.default_rng(0)
+
+        db = SessionLocal()
+        user_id = str(uuid.uuid4())
+        db.add(User(id=user_id, email="bench@example.com", password_hash="x", name="Bench"))
+        products = [
+            Product(
+                id=str(uuid.uuid4()), external_id=f"bench-{i}", name=f"Product {i}", category="sofa",
+                price=100.0, image_url="https://example.com/p.jpg", affiliate_url="https://example.com",
+                retailer_url="https://example.com", retailer_name="Example",
+            )
+            for i in range(200)
+        ]
+        db.add_all(products)
+        db.commit()
+        product_ids = [product.id for product in products]
+        db.close()
+
+        print(f"{args.scans} scans per run, {MATCHES_PER_ITEM} matches per item\n")
+        print(f"{'detections':>10}{'ORM ms':>10}{'bulk ms':>10}{'speedup':>9}")
+        for detections in DETECTION_COUNTS:
+            timings = {}
+            for name, write in (("orm", write_orm), ("bulk", write_bulk)):
+                samples = []
+                for _ in range(args.scans):
+                    db = SessionLocal()
+                    scan = Scan(id=str(uuid.uuid4()), user_id=user_id, image_url="x", status="processing")
+                    db.add(scan)
+                    db.commit()
+                    items, matches = make_results(scan.id, product_ids, detections, rng)
+
+                    start = time.perf_counter()
+                    write(db, items, matches)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    db.close()
+                timings[name] = statistics.median(samples)
+
+            print(f"{detections:>10}{timings['orm']:>10.2f}{timings['bulk']:>10.2f}"
+                  f"{timings['orm'] / timings['bulk']:>8.1f}x")
+
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Publish a vector index snapshot for workers to map at startup.
+
+Builds the index from the products table, writes it under
+``VECTOR_INDEX_SNAPSHOT_PATH`` and points ``CURRENT`` at it. API and
+worker processes started afterwards memory-map the snapshot instead of
+rebuilding the index, and replay products changed since from the change
+log. ``import_catalog.py`` publishes a snapshot after every import; run
+this after other catalog changes (seeding, bulk edits) or on a schedule.
+
+Usage:
+    python app/scripts/build_index_snapshot.py
+    python app/scripts/build_index_snapshot.py --keep 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.database import SessionLocal, engine
+from app.services.vector_index import VectorIndex
+from app.settings import settings
+
+
+def main():
+    """Publish the snapshot."""
+    parser = argparse.ArgumentParser(description="Publish a vector index snapshot")
+    parser.add_argument("--path", default=settings.vector_index_snapshot_path, help="Snapshot root directory")
+    parser.add_argument("--keep", type=int, default=settings.vector_index_snapshot_keep, help="Snapshots kept on disk")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Splay Vector Index Snapshot")
+    print("=" * 50)
+
+    if not args.path:
+        print("[ERROR] Set VECTOR_INDEX_SNAPSHOT_PATH or pass --path.")
+        sys.exit(1)
+    if engine.dialect.name == "postgresql":
+        print("[ERROR] PostgreSQL matches in the database (pgvector); there is no index to snapshot.")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        snapshot = VectorIndex().write_snapshot(db, args.path, keep=args.keep)
+    finally:
+        db.close()
+
+    print(f"[OK] Published {snapshot.path} in {time.perf_counter() - started:.1f}s")
+    print(f"     Catalog version {snapshot.catalog_version}, change log seq {snapshot.change_seq}, "
+          f"{snapshot.products:,} products")
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
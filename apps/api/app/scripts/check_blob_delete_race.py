@@ -0,0 +1,203 @@
+"""Race check for deleting a scan while the same image is uploaded again.
+
+Runs ``delete_scan_and_files`` and ``create_scan_record`` concurrently on
+one image in a throwaway SQLite database and storage directory:
+
+1. re-upload between the deleter's commit and its file cleanup
+2. re-upload while the cleanup holds the blob row (files being unlinked)
+3. free-running rounds of concurrent delete + re-upload
+
+After each case every scan's image file must exist and the blob's
+reference count must equal the number of scans using it. Exits non-zero
+otherwise.
+
+Usage:
+    python app/scripts/check_blob_delete_race.py --rounds 50
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+
+# Throwaway storage; must be set before the app settings are loaded
+os.environ["STORAGE_PATH"] = tempfile.mkdtemp(prefix="splay-blob-check-")
+
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import app.routes.scans as scan_routes
+from app.database import Base, create_db_engine
+from app.models import ImageBlob, Scan, User
+from app.routes.scans import create_scan_record, delete_scan_and_files
+from app.services.storage import storage_service
+
+IMAGE_BYTES = b"\xff\xd8\xff\xe0 not really a jpeg " + uuid.uuid4().bytes
+IMAGE_HASH = hashlib.sha256(IMAGE_BYTES).hexdigest()
+
+
+def upload(SessionLocal, user_id: str) -> str:
+    """Receive IMAGE_BYTES into a temporary file and create a scan for it."""
+    fd, temp_path = tempfile.mkstemp(dir=storage_service.uploads_path, suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(IMAGE_BYTES)
+    stored = storage_service.content_addressed(IMAGE_HASH, len(IMAGE_BYTES), "photo.jpg")
+    db = SessionLocal()
+    try:
+        return create_scan_record(db, user_id, stored, Path(temp_path)).id
+    finally:
+        db.close()
+        Path(temp_path).unlink(missing_ok=True)
+
+
+def delete(SessionLocal, scan_id: str, user_id: str) -> None:
+    """Delete a scan and, with its last reference, the image."""
+    db = SessionLocal()
+    try:
+        delete_scan_and_files(db, scan_id, user_id)
+    finally:
+        db.close()
+
+
+def image_scan_ids(SessionLocal) -> list:
+    """Ids of the scans using IMAGE_BYTES."""
+    db = SessionLocal()
+    try:
+        return [scan_id for (scan_id,) in db.query(Scan.id).filter(Scan.image_hash == IMAGE_HASH)]
+    finally:
+        db.close()
+
+
+def delete_all(SessionLocal, user_id: str) -> None:
+    """Delete every scan using IMAGE_BYTES, one after another."""
+    for scan_id in image_scan_ids(SessionLocal):
+        delete(SessionLocal, scan_id, user_id)
+
+
+def check_consistent(SessionLocal, label: str) -> bool:
+    """Every scan's image exists and the reference count matches."""
+    db = SessionLocal()
+    try:
+        image_urls = [url for (url,) in db.query(Scan.image_url).filter(Scan.image_hash == IMAGE_HASH)]
+        ref_count = db.query(ImageBlob.ref_count).filter(ImageBlob.hash == IMAGE_HASH).scalar() or 0
+    finally:
+        db.close()
+    missing = [url for url in image_urls if not storage_service.get_file_path(url).exists()]
+    ok = not missing and ref_count == len(image_urls)
+    status = "OK" if ok else "FAIL"
+    print(f"  [{status}] {label}: {len(image_urls)} scans, ref_count {ref_count}, {len(missing)} missing files")
+    return ok
+
+
+def reupload_before_cleanup(SessionLocal, user_id: str) -> bool:
+    """Case 1: the re-upload commits between the deleter's commit and its cleanup."""
+    delete_all(SessionLocal, user_id)
+    scan_id = upload(SessionLocal, user_id)
+    released, resume = threading.Event(), threading.Event()
+    cleanup = scan_routes.delete_unreferenced_blob
+
+    def paused_cleanup(*args, **kwargs):
+        released.set()
+        resume.wait()
+        return cleanup(*args, **kwargs)
+
+    scan_routes.delete_unreferenced_blob = paused_cleanup
+    try:
+        deleter = threading.Thread(target=delete, args=(SessionLocal, scan_id, user_id))
+        deleter.start()
+        released.wait()
+        upload(SessionLocal, user_id)
+        resume.set()
+        deleter.join()
+    finally:
+        scan_routes.delete_unreferenced_blob = cleanup
+    return check_consistent(SessionLocal, "re-upload before cleanup")
+
+
+def reupload_during_cleanup(SessionLocal, user_id: str) -> bool:
+    """Case 2: the re-upload starts while the cleanup is unlinking the files."""
+    delete_all(SessionLocal, user_id)
+    scan_id = upload(SessionLocal, user_id)
+    unlinking, resume = threading.Event(), threading.Event()
+    delete_file = storage_service.delete_file
+
+    def paused_delete_file(url):
+        unlinking.set()
+        resume.wait()
+        delete_file(url)
+
+    storage_service.delete_file = paused_delete_file
+    try:
+        deleter = threading.Thread(target=delete, args=(SessionLocal, scan_id, user_id))
+        deleter.start()
+        unlinking.wait()
+        uploader = threading.Thread(target=upload, args=(SessionLocal, user_id))
+        uploader.start()
+        uploader.join(timeout=0.3)
+        blocked = uploader.is_alive()
+        resume.set()
+        deleter.join()
+        uploader.join()
+    finally:
+        storage_service.delete_file = delete_file
+    print(f"  re-upload waited for the cleanup: {blocked}")
+    return check_consistent(SessionLocal, "re-upload during cleanup")
+
+
+def free_running(SessionLocal, user_id: str, rounds: int) -> bool:
+    """Case 3: unsynchronized delete + re-upload, ``rounds`` times."""
+    for _ in range(rounds):
+        threads = [
+            threading.Thread(target=delete, args=(SessionLocal, scan_id, user_id))
+            for scan_id in image_scan_ids(SessionLocal)
+        ]
+        threads.append(threading.Thread(target=upload, args=(SessionLocal, user_id)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return check_consistent(SessionLocal, f"{rounds} free-running rounds")
+
+
+def main():
+    """Run the check."""
+    parser = argparse.ArgumentParser(description="Blob delete / re-upload race check")
+    parser.add_argument("--rounds", type=int, default=50, help="Free-running rounds")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Blob Delete / Re-upload Race")
+    print("=" * 50)
+
+    database_path = Path(os.environ["STORAGE_PATH"]) / "check.db"
+    engine = create_db_engine(f"sqlite:///{database_path}")  # Same SQLite profile (WAL) as the app
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    db = SessionLocal()
+    user = User(id=str(uuid.uuid4()), email="check@example.com", password_hash="x", name="Check")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    results = [
+        reupload_before_cleanup(SessionLocal, user_id),
+        reupload_during_cleanup(SessionLocal, user_id),
+        free_running(SessionLocal, user_id, args.rounds),
+    ]
+    if not all(results):
+        print("\n[ERROR] A scan references a deleted image")
+        sys.exit(1)
+
+    print("\n[OK] Deleting and re-uploading the same image never loses a referenced file")
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Query-count check for the scan detail loader.
+
+Builds scans with 3, 20 and 100 detected items (6 matches each) in a
+throwaway in-memory database, then counts the SQL statements issued by
+``load_scan_detail`` (with a cold and a warm product catalog cache) and by
+lazy ORM traversal (scan.items -> matches -> product) for comparison.
+Exits non-zero if the loader's query count depends on the number of items.
+
+Usage:
+    python app/scripts/check_scan_query_count.py
+"""
+import sys
+import uuid
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.database import Base
+from app.models import DetectedItem, ItemMatch, Product, Scan, User
+from app.services.catalog_cache import catalog_cache
+from app.services.scan_results import SCAN_DETAIL_QUERY_COUNT, load_scan_detail
+
+ITEM_COUNTS = (3, 20, 100)
+MATCHES_PER_ITEM = 6
+
+
+class QueryCounter:
+    """Counts statements executed on an engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._increment)
+
+    def _increment(self, *args):
+        self.count += 1
+
+
+def create_scan(db, user_id: str, products: list, item_count: int) -> str:
+    """Insert a completed scan with ``item_count`` items."""
+    scan = Scan(id=str(uuid.uuid4()), user_id=user_id, image_url="/storage/uploads/x.jpg", status="completed")
+    db.add(scan)
+    for i in range(item_count):
+        item = DetectedItem(
+            id=str(uuid.uuid4()), scan_id=scan.id, category="sofa",
+            bbox_x=0.1, bbox_y=0.1, bbox_width=0.5, bbox_height=0.5, confidence=0.9,
+        )
+        db.add(item)
+        for rank in range(1, MATCHES_PER_ITEM + 1):
+            db.add(ItemMatch(
+                id=str(uuid.uuid4()), item_id=item.id, product_id=products[(i + rank) % len(products)].id,
+                similarity_score=0.9, rank=rank, is_budget_alternative=0,
+            ))
+    db.commit()
+    return scan.id
+
+
+def lazy_orm_query_count(SessionLocal, counter: QueryCounter, scan_id: str) -> int:
+    """Statements issued by walking the ORM relationships lazily."""
+    db = SessionLocal()
+    try:
+        start = counter.count
+        scan = db.query(Scan).filter(Scan.id == scan_id).first()
+        for item in scan.items:
+            for match in item.matches:
+                match.product.name
+        return counter.count - start
+    finally:
+        db.close()
+
+
+def main():
+    """Run the check."""
+    print("=" * 50)
+    print("Scan Detail Query Count")
+    print("=" * 50)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    counter = QueryCounter(engine)
+
+    db = SessionLocal()
+    user = User(id=str(uuid.uuid4()), email="check@example.com", password_hash="x", name="Check")
+    db.add(user)
+    products = [
+        Product(
+            external_id=f"check-{i}", name=f"Product {i}", category="sofa", price=100.0 + i,
+            image_url="https://example.com/p.jpg", affiliate_url="https://example.com",
+            retailer_url="https://example.com", retailer_name="Example",
+        )
+        for i in range(50)
+    ]
+    db.add_all(products)
+    db.commit()
+    scan_ids = {count: create_scan(db, user.id, products, count) for count in ITEM_COUNTS}
+    db.close()
+
+    failed = False
+    print(f"{'items':>6}{'cold':>7}{'warm':>7}{'lazy ORM':>10}")
+    for item_count, scan_id in scan_ids.items():
+        db = SessionLocal()
+        catalog_cache.clear()
+        start = counter.count
+        load_scan_detail(db, scan_id)
+        cold_queries = counter.count - start
+
+        start = counter.count
+        response = load_scan_detail(db, scan_id)
+        loader_queries = counter.count - start
+        db.close()
+
+        assert response.item_count == item_count
+        assert all(len(item.matches) == MATCHES_PER_ITEM for item in response.detected_items)
+
+        lazy_queries = lazy_orm_query_count(SessionLocal, counter, scan_id)
+        print(f"{item_count:>6}{cold_queries:>7}{loader_queries:>7}{lazy_queries:>10}")
+        if loader_queries != SCAN_DETAIL_QUERY_COUNT or cold_queries > SCAN_DETAIL_QUERY_COUNT + 2:
+            failed = True
+
+    if failed:
+        print(f"\n[ERROR] Loader should issue exactly {SCAN_DETAIL_QUERY_COUNT} queries")
+        sys.exit(1)
+
+    print(f"\n[OK] Loader issues {SCAN_DETAIL_QUERY_COUNT} queries regardless of item count")
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
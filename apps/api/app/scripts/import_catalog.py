@@ -0,0 +1,101 @@
+"""Import a retailer product feed (CSV or JSON Lines).
+
+Non-interactive: rows are streamed from disk and upserted on
+``external_id`` in chunked transactions, so re-running a feed updates
+prices and stock in place. Products of the feed's retailers that the feed
+no longer lists are marked out of stock (``--keep-missing`` disables
+this).
+
+When ``VECTOR_INDEX_SNAPSHOT_PATH`` is set, the current vector index
+snapshot is loaded first, the imported chunks are applied to it
+incrementally and the result is published for workers to map at startup
+(``--no-snapshot`` skips it). Only the first import, with no snapshot to
+start from, builds the index from the products table.
+
+Required columns: external_id, name, category, price, image_url,
+affiliate_url, retailer_url, retailer_name. Optional: brand, currency,
+description, in_stock, dimensions (JSON), colors / materials / images
+(JSON list or "a|b|c").
+
+Usage:
+    python app/scripts/import_catalog.py feed.csv
+    python app/scripts/import_catalog.py feed.jsonl --chunk-size 2000 --retailer IKEA
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.database import SessionLocal, engine
+from app.services.catalog_import import CatalogImporter, ImportStats, read_feed
+from app.services.vector_index import vector_index
+from app.settings import settings
+
+
+def print_progress(stats: ImportStats) -> None:
+    """One progress line per chunk."""
+    print(
+        f"  {stats.rows:>9,} rows  {stats.upserted:>9,} upserted  {stats.skipped:>6,} skipped"
+        f"  {stats.rows_per_second:>8,.0f} rows/s"
+    )
+
+
+def main():
+    """Run the import."""
+    parser = argparse.ArgumentParser(description="Import a product feed")
+    parser.add_argument("feed", type=Path, help="CSV or JSON Lines feed file")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="Feed format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=settings.catalog_import_chunk_size, help="Rows per transaction")
+    parser.add_argument("--retailer", action="append", help="Only import this retailer (repeatable)")
+    parser.add_argument("--keep-missing", action="store_true", help="Do not mark unlisted products out of stock")
+    parser.add_argument("--no-snapshot", action="store_true", help="Do not publish a vector index snapshot")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Splay Catalog Import")
+    print("=" * 50)
+    print(f"Feed: {args.feed} ({args.chunk_size} rows per chunk)\n")
+
+    publish = settings.vector_index_snapshot_path and not args.no_snapshot and engine.dialect.name != "postgresql"
+    if publish:
+        db = SessionLocal()
+        try:
+            vector_index.ensure_built(db)  # Restores the published snapshot when possible
+        finally:
+            db.close()
+        print(f"Vector index loaded: {len(vector_index):,} products\n")
+
+    importer = CatalogImporter(chunk_size=args.chunk_size)
+    try:
+        stats = importer.import_rows(
+            read_feed(args.feed, args.format),
+            mark_missing=not args.keep_missing,
+            retailers=set(args.retailer) if args.retailer else None,
+            progress=print_progress,
+        )
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Import failed: {e}")
+        sys.exit(1)
+
+    print(f"\n[OK] {stats.upserted:,} products upserted from {stats.rows:,} rows in {stats.seconds:.1f}s "
+          f"({stats.rows_per_second:,.0f} rows/s)")
+    print(f"[OK] {stats.changed:,} products new or changed")
+    if stats.skipped:
+        print(f"[!] {stats.skipped:,} rows skipped")
+    if stats.marked_out_of_stock:
+        print(f"[OK] {stats.marked_out_of_stock:,} unlisted products marked out of stock")
+
+    if publish:
+        db = SessionLocal()
+        try:
+            snapshot = vector_index.write_snapshot(db, rebuild=False)
+        finally:
+            db.close()
+        print(f"[OK] Published index snapshot {snapshot.path} ({snapshot.products:,} products)")
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Login load test: does password hashing slow down other endpoints?
+
+Runs the API in-process (httpx ASGI transport, one event loop) and probes
+``GET /health`` at a fixed rate in three phases:
+
+- idle: probes only
+- offloaded: concurrent ``POST /auth/login`` calls (hashing on the
+  password executor)
+- inline: the same login load, but each caller verifies the password
+  directly on the event loop, as the login route did before hashing was
+  moved off it
+
+Registers a throwaway user in the configured database.
+
+Usage:
+    python app/scripts/load_test_auth.py --concurrency 8 --seconds 5
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.main import app
+from app.services import auth as auth_service
+from app.services.executor import password_executor
+
+PROBE_INTERVAL_SECONDS = 0.01
+PASSWORD = "load-test-password"
+
+
+def summarize(latencies: list) -> str:
+    """p50 / p99 / max in milliseconds."""
+    if not latencies:
+        return f"{'-':>8}{'-':>8}{'-':>8}"
+    ms = np.asarray(latencies) * 1000
+    return f"{np.percentile(ms, 50):>8.1f}{np.percentile(ms, 99):>8.1f}{ms.max():>8.1f}"
+
+
+async def probe(client: httpx.AsyncClient, deadline: float, latencies: list) -> None:
+    """Request /health on a fixed schedule until the deadline.
+
+    Latency is measured from when each request was due, so time spent
+    waiting for a blocked event loop counts against it.
+    """
+    scheduled = time.perf_counter()
+    while scheduled < deadline:
+        response = await client.get("/health")
+        response.raise_for_status()
+        finished = time.perf_counter()
+        # Requests that fell due while the loop was blocked all see the stall
+        while scheduled <= finished and scheduled < deadline:
+            latencies.append(finished - scheduled)
+            scheduled += PROBE_INTERVAL_SECONDS
+        await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+
+
+async def login_offloaded(client: httpx.AsyncClient, email: str, deadline: float, stats: dict) -> None:
+    """Log in through the API until the deadline."""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        if response.status_code == 503:
+            stats["rejected"] += 1
+            await asyncio.sleep(0.05)
+            continue
+        response.raise_for_status()
+        stats["latencies"].append(time.perf_counter() - start)
+
+
+async def login_inline(password_hash: str, deadline: float, stats: dict) -> None:
+    """Verify the password on the event loop until the deadline (old behavior)."""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        auth_service.verify_password(PASSWORD, password_hash)
+        stats["latencies"].append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+
+
+async def run_phase(client, name: str, args, email: str, password_hash: str) -> None:
+    """Run one phase and print its latencies."""
+    deadline = time.perf_counter() + args.seconds
+    probe_latencies = []
+    stats = {"latencies": [], "rejected": 0}
+
+    tasks = [probe(client, deadline, probe_latencies)]
+    if name == "offloaded":
+        tasks += [login_offloaded(client, email, deadline, stats) for _ in range(args.concurrency)]
+    elif name == "inline":
+        tasks += [login_inline(password_hash, deadline, stats) for _ in range(args.concurrency)]
+    await asyncio.gather(*tasks)
+
+    logins = len(stats["latencies"])
+    print(
+        f"{name:<11}{summarize(probe_latencies)}   {logins / args.seconds:>7.1f}"
+        f"{summarize(stats['latencies'])}{stats['rejected']:>8}"
+    )
+
+
+async def main_async(args) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+        response = await client.post("/auth/register", json={"email": email, "password": PASSWORD, "name": "Load Test"})
+        response.raise_for_status()
+        password_hash = auth_service.hash_password(PASSWORD)
+
+        print(f"{'':<11}{'/health ms':^24}   {'':>7}{'login ms':^24}")
+        print(f"{'phase':<11}{'p50':>8}{'p99':>8}{'max':>8}   {'login/s':>7}{'p50':>8}{'p99':>8}{'max':>8}{'503s':>8}")
+        for phase in ("idle", "offloaded", "inline"):
+            await run_phase(client, phase, args, email, password_hash)
+
+
+def main():
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description="Login load test")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent login loops")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration per phase")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Login Load Test")
+    print("=" * 50)
+    print(
+        f"{args.concurrency} concurrent logins, {args.seconds:.0f}s per phase, "
+        f"{password_executor.max_workers} password workers\n"
+    )
+
+    asyncio.run(main_async(args))
+    password_executor.shutdown()
+
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
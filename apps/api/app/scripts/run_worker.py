@@ -0,0 +1,105 @@
+"""Run a pool of scan processing worker processes.
+
+Usage:
+    python app/scripts/run_worker.py [--processes N]
+
+Set SCAN_WORKER_MODE=external on the API so it only enqueues scans and
+leaves processing to these workers.
+"""
+import argparse
+import multiprocessing
+import signal
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.settings import settings
+
+
+def load_vector_index() -> None:
+    """Load the vector index before the first job (maps the published snapshot if any)."""
+    from app.database import SessionLocal, engine
+    from app.services.vector_index import vector_index
+
+    if engine.dialect.name == "postgresql":
+        return  # Matching runs in the database (pgvector)
+
+    db = SessionLocal()
+    try:
+        vector_index.ensure_built(db)
+    except Exception as e:
+        # Rebuilt lazily on the first match
+        print(f"Error loading vector index: {e}")
+    finally:
+        db.close()
+
+
+def worker_main(index: int) -> None:
+    """Entry point of one worker process."""
+    from app.services.worker import ScanWorker
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+
+    load_vector_index()
+    worker = ScanWorker()
+    print(f"  Worker {index} started ({worker.worker_id})")
+    worker.run(stop_event)
+    print(f"  Worker {index} stopped")
+
+
+def run_workers(processes: int) -> None:
+    """Start ``processes`` workers and wait for them to exit."""
+    # spawn: no inherited database connections, same behaviour on Windows
+    context = multiprocessing.get_context("spawn")
+    pool = [
+        context.Process(target=worker_main, args=(index,), name=f"scan-worker-{index}")
+        for index in range(processes)
+    ]
+    for process in pool:
+        process.start()
+
+    def shutdown(*_):
+        # Workers finish their current job on SIGTERM
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for process in pool:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for process in pool:
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scan processing workers")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.scan_worker_processes,
+        help="Number of worker processes",
+    )
+    args = parser.parse_args()
+
+    if settings.scan_queue_backend == "memory":
+        print("[ERROR] The in-memory queue is only visible to embedded workers.")
+        print("        Use SCAN_QUEUE_BACKEND=database or redis with external workers.")
+        sys.exit(1)
+
+    print("=" * 50)
+    print(" Splay Scan Workers")
+    print("=" * 50)
+    print()
+    print(f"Queue backend: {settings.scan_queue_backend}")
+    print(f"Processes: {args.processes}")
+    print()
+    print("Press CTRL+C to stop")
+    print()
+    run_workers(args.processes)
+    print()
+    print("Done!")
@@ -7,7 +7,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.database import SessionLocal
 from app.models.product import Product
-from app.services.matching import generate_stub_embedding
+from app.services.embeddings import embedding_service
 
 
 SAMPLE_PRODUCTS = [
@@ -110,7 +110,7 @@ def seed_products():
         for idx, data in enumerate(SAMPLE_PRODUCTS, start=1):
             # Generate embedding based on product name + category
             embedding_text = f"{data['category']} {data['name']} {data['brand']}"
-            embedding_vector = generate_stub_embedding(embedding_text)
+            embedding_vector = embedding_service.embed_text(embedding_text)
 
             product = Product(
                 external_id=f"prod_{idx:03d}",
@@ -128,7 +128,7 @@ def seed_products():
                 affiliate_url=f"https://{data['retailer'].lower().replace(' ', '')}.com/{data['name'].lower().replace(' ', '-')}?ref=splay",
                 retailer_url=f"https://{data['retailer'].lower().replace(' ', '')}.com/{data['name'].lower().replace(' ', '-')}",
                 retailer_name=data["retailer"],
-                embedding={"vector": embedding_vector},
+                embedding=embedding_vector,
                 in_stock=True
             )
 
@@ -0,0 +1,514 @@
+"""Approximate nearest-neighbour backends for the product vector index.
+
+Every backend stores unit-length float32 vectors keyed by product id and
+exposes the same small interface used by ``VectorIndex``:
+
+    add(ids, vectors), remove(ids), search(query, k),
+    search_batch(queries, k), product_ids(), len(), save(path) and a
+    ``load(path)`` classmethod.
+
+``IVFIndex`` is pure NumPy. ``HNSWIndex`` wraps the optional ``hnswlib``
+package.
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # Optional dependency
+    hnswlib = None
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return indices of the k highest scores, sorted descending.
+
+    Args:
+        scores: 1-D score array
+        k: Number of indices to return
+
+    Returns:
+        Index array of length min(k, len(scores))
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    n_clusters: int,
+    n_iter: int = 15,
+    sample_size: int = 64,
+    seed: int = 0,
+) -> np.ndarray:
+    """Train unit-length centroids for cosine similarity with Lloyd iterations.
+
+    Args:
+        vectors: Unit-length float32 training vectors (n, dim)
+        n_clusters: Number of centroids
+        n_iter: Number of assignment/update rounds
+        sample_size: Training points per centroid (caps training cost)
+        seed: Random seed for sampling and initialisation
+
+    Returns:
+        Centroid matrix (n_clusters, dim), float32, unit-length rows
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    n_clusters = max(1, min(n_clusters, n))
+
+    if n > n_clusters * sample_size:
+        sample = vectors[rng.choice(n, n_clusters * sample_size, replace=False)]
+    else:
+        sample = vectors
+
+    centroids = sample[rng.choice(len(sample), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        counts = np.bincount(assignment, minlength=n_clusters)
+
+        # Re-seed empty clusters from random training points
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    return np.ascontiguousarray(centroids)
+
+
+class IVFIndex:
+    """Inverted-file index with a k-means coarse quantizer.
+
+    Vectors are bucketed by their nearest centroid; a query scans only the
+    ``nprobe`` buckets whose centroids are closest to it. Raising
+    ``nprobe`` trades latency for recall (``nprobe == nlist`` is exact).
+    """
+
+    kind = "ivf"
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = 8):
+        """Initialize an empty index around trained centroids.
+
+        Args:
+            centroids: Unit-length coarse centroids (nlist, dim)
+            nprobe: Default number of lists scanned per query
+        """
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+        nlist = len(self.centroids)
+        # Each list is an (ids, vectors) tuple swapped atomically on change
+        self._lists: List[Tuple[np.ndarray, np.ndarray]] = [
+            (np.empty(0, dtype=object), np.empty((0, self.dim), dtype=np.float32))
+            for _ in range(nlist)
+        ]
+        self._assignment: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+    ) -> "IVFIndex":
+        """Train centroids on vectors and return an empty index.
+
+        Args:
+            vectors: Unit-length training vectors (n, dim)
+            nlist: Number of lists (defaults to ~sqrt(n))
+            nprobe: Default number of lists scanned per query
+
+        Returns:
+            Empty IVFIndex (call ``add`` to insert vectors)
+        """
+        if nlist is None:
+            nlist = int(np.clip(np.sqrt(len(vectors)), 1, 4096))
+        return cls(spherical_kmeans(vectors, nlist), nprobe=nprobe)
+
+    @property
+    def dim(self) -> int:
+        """Vector dimension."""
+        return self.centroids.shape[1]
+
+    @property
+    def nlist(self) -> int:
+        """Number of inverted lists."""
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        """Number of indexed vectors."""
+        return len(self._assignment)
+
+    def product_ids(self) -> List[str]:
+        """List the indexed product ids."""
+        return list(self._assignment)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert (or replace) vectors without retraining the quantizer.
+
+        Args:
+            ids: Product ids
+            vectors: Unit-length float32 vectors (len(ids), dim)
+        """
+        if len(ids) == 0:
+            return
+        ids = np.asarray(ids, dtype=object)
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        with self._lock:
+            self._remove_locked(ids)
+            assignment = self._assign(vectors)
+            order = np.argsort(assignment, kind="stable")
+            bounds = np.flatnonzero(np.diff(assignment[order])) + 1
+            for group in np.split(order, bounds):
+                list_no = int(assignment[group[0]])
+                list_ids, list_vectors = self._lists[list_no]
+                self._lists[list_no] = (
+                    np.concatenate([list_ids, ids[group]]),
+                    np.vstack([list_vectors, vectors[group]]),
+                )
+                for product_id in ids[group]:
+                    self._assignment[product_id] = list_no
+
+    def _assign(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Nearest-centroid list number for each vector, computed in chunks."""
+        return np.concatenate([
+            np.argmax(vectors[start:start + chunk_size] @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), chunk_size)
+        ])
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Remove vectors by id (unknown ids are ignored).
+
+        Args:
+            ids: Product ids
+        """
+        with self._lock:
+            self._remove_locked(ids)
+
+    def _remove_locked(self, ids: Sequence[str]) -> None:
+        """Remove ids; caller holds the lock."""
+        by_list: Dict[int, set] = {}
+        for product_id in ids:
+            list_no = self._assignment.pop(product_id, None)
+            if list_no is not None:
+                by_list.setdefault(list_no, set()).add(product_id)
+
+        for list_no, drop in by_list.items():
+            list_ids, list_vectors = self._lists[list_no]
+            keep = np.fromiter(
+                (pid not in drop for pid in list_ids), dtype=bool, count=len(list_ids)
+            )
+            self._lists[list_no] = (list_ids[keep], list_vectors[keep])
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """Approximate top-k search.
+
+        Args:
+            query: Unit-length float32 query vector
+            k: Number of results
+            nprobe: Lists to scan (defaults to ``self.nprobe``)
+
+        Returns:
+            List of (product_id, similarity) sorted descending
+        """
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        return self._search_lists(query, top_k(self.centroids @ query, nprobe), k)
+
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """Approximate top-k search for several queries at once.
+
+        The coarse quantizer is evaluated for all queries in a single
+        matrix-matrix product.
+
+        Args:
+            queries: Unit-length float32 query matrix (m, dim)
+            k: Number of results per query
+            nprobe: Lists to scan (defaults to ``self.nprobe``)
+
+        Returns:
+            One (product_id, similarity) list per query
+        """
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        centroid_scores = queries @ self.centroids.T
+        return [
+            self._search_lists(query, top_k(scores, nprobe), k)
+            for query, scores in zip(queries, centroid_scores)
+        ]
+
+    def _search_lists(
+        self,
+        query: np.ndarray,
+        probes: np.ndarray,
+        k: int,
+    ) -> List[Tuple[str, float]]:
+        """Score a query against the given inverted lists."""
+        lists = [self._lists[int(list_no)] for list_no in probes]
+        lists = [entry for entry in lists if len(entry[0])]
+        if not lists:
+            return []
+
+        ids = np.concatenate([list_ids for list_ids, _ in lists])
+        scores = np.concatenate([list_vectors @ query for _, list_vectors in lists])
+        return [(ids[i], float(scores[i])) for i in top_k(scores, k)]
+
+    def save(self, path: Path) -> None:
+        """Persist the index to a directory.
+
+        Args:
+            path: Target directory (created if missing)
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        lists = list(self._lists)
+        sizes = np.array([len(list_ids) for list_ids, _ in lists], dtype=np.int64)
+        ids = np.concatenate([list_ids for list_ids, _ in lists]).astype(str)
+        vectors = np.vstack([list_vectors for _, list_vectors in lists])
+
+        np.save(path / "centroids.npy", self.centroids)
+        np.save(path / "vectors.npy", vectors)
+        np.save(path / "ids.npy", ids)
+        np.save(path / "list_sizes.npy", sizes)
+        (path / "meta.json").write_text(json.dumps({
+            "kind": self.kind, "nlist": self.nlist, "nprobe": self.nprobe, "dim": self.dim,
+        }))
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: Optional[str] = None) -> "IVFIndex":
+        """Load an index saved with ``save``.
+
+        Args:
+            path: Index directory
+            mmap_mode: ``np.load`` mode for the vectors ("r" maps the file
+                read-only; lists touched by updates are copied)
+
+        Returns:
+            Loaded IVFIndex
+        """
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        index = cls(np.load(path / "centroids.npy"), nprobe=meta["nprobe"])
+        vectors = np.load(path / "vectors.npy", mmap_mode=mmap_mode)
+        ids = np.load(path / "ids.npy").astype(object)
+        offsets = np.concatenate([[0], np.cumsum(np.load(path / "list_sizes.npy"))])
+
+        for list_no in range(index.nlist):
+            start, end = offsets[list_no], offsets[list_no + 1]
+            index._lists[list_no] = (ids[start:end], vectors[start:end])
+            for product_id in ids[start:end]:
+                index._assignment[product_id] = list_no
+        return index
+
+
+class HNSWIndex:
+    """Hierarchical navigable small-world graph backed by ``hnswlib``.
+
+    ``ef_search`` is the query-time candidate list size: higher values
+    improve recall at the cost of latency. Removed products are tombstoned
+    with ``mark_deleted``.
+    """
+
+    kind = "hnsw"
+
+    def __init__(
+        self,
+        dim: int,
+        capacity: int = 1024,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+    ):
+        """Initialize an empty graph.
+
+        Args:
+            dim: Vector dimension
+            capacity: Initial element capacity (grows automatically)
+            m: Graph out-degree
+            ef_construction: Candidate list size while building
+            ef_search: Default candidate list size while searching
+        """
+        if hnswlib is None:
+            raise RuntimeError(
+                "HNSW vector index requires the optional 'hnswlib' package. "
+                "Install it or use the 'ivf'/'exact' backend."
+            )
+        self.dim = dim
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._graph = hnswlib.Index(space="ip", dim=dim)
+        self._graph.init_index(max_elements=max(capacity, 1), M=m, ef_construction=ef_construction)
+        self._graph.set_ef(ef_search)
+        self._labels: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of live (non-deleted) vectors."""
+        return len(self._labels)
+
+    def product_ids(self) -> List[str]:
+        """List the live product ids."""
+        return list(self._labels)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert (or replace) vectors incrementally.
+
+        Args:
+            ids: Product ids
+            vectors: Unit-length float32 vectors (len(ids), dim)
+        """
+        if len(ids) == 0:
+            return
+        with self._lock:
+            self._remove_locked(ids)
+            labels = np.arange(len(self._ids), len(self._ids) + len(ids))
+            needed = len(self._ids) + len(ids)
+            if needed > self._graph.get_max_elements():
+                self._graph.resize_index(max(needed, 2 * self._graph.get_max_elements()))
+            self._graph.add_items(np.asarray(vectors, dtype=np.float32), labels)
+            for product_id, label in zip(ids, labels):
+                self._ids.append(product_id)
+                self._labels[product_id] = int(label)
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Tombstone vectors by id (unknown ids are ignored).
+
+        Args:
+            ids: Product ids
+        """
+        with self._lock:
+            self._remove_locked(ids)
+
+    def _remove_locked(self, ids: Sequence[str]) -> None:
+        """Remove ids; caller holds the lock."""
+        for product_id in ids:
+            label = self._labels.pop(product_id, None)
+            if label is not None:
+                self._graph.mark_deleted(label)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """Approximate top-k search.
+
+        Args:
+            query: Unit-length float32 query vector
+            k: Number of results
+            ef_search: Candidate list size (defaults to ``self.ef_search``)
+
+        Returns:
+            List of (product_id, similarity) sorted descending
+        """
+        return self.search_batch(query[np.newaxis, :], k, ef_search=ef_search)[0]
+
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """Approximate top-k search for several queries in one hnswlib call.
+
+        Args:
+            queries: Unit-length float32 query matrix (m, dim)
+            k: Number of results per query
+            ef_search: Candidate list size (defaults to ``self.ef_search``)
+
+        Returns:
+            One (product_id, similarity) list per query
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+        if ef_search is not None:
+            self._graph.set_ef(max(ef_search, k))
+        labels, distances = self._graph.knn_query(queries, k=k)
+        if ef_search is not None:
+            self._graph.set_ef(self.ef_search)
+        # hnswlib "ip" distance is 1 - inner product
+        return [
+            [
+                (self._ids[label], float(1.0 - distance))
+                for label, distance in zip(row_labels, row_distances)
+            ]
+            for row_labels, row_distances in zip(labels, distances)
+        ]
+
+    def save(self, path: Path) -> None:
+        """Persist the graph to a directory.
+
+        Args:
+            path: Target directory (created if missing)
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self._graph.save_index(str(path / "graph.bin"))
+        np.save(path / "ids.npy", np.asarray(self._ids, dtype=str))
+        live = set(self._labels.values())
+        (path / "meta.json").write_text(json.dumps({
+            "kind": self.kind,
+            "dim": self.dim,
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "deleted": [label for label in range(len(self._ids)) if label not in live],
+        }))
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: Optional[str] = None) -> "HNSWIndex":
+        """Load a graph saved with ``save``.
+
+        Args:
+            path: Index directory
+            mmap_mode: Ignored; hnswlib always reads the graph into memory
+
+        Returns:
+            Loaded HNSWIndex
+        """
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        ids = np.load(path / "ids.npy").tolist()
+        index = cls(
+            meta["dim"],
+            capacity=len(ids),
+            m=meta["m"],
+            ef_construction=meta["ef_construction"],
+            ef_search=meta["ef_search"],
+        )
+        index._graph = hnswlib.Index(space="ip", dim=meta["dim"])
+        index._graph.load_index(str(path / "graph.bin"), max_elements=max(len(ids), 1))
+        index._graph.set_ef(index.ef_search)
+        deleted = set(meta["deleted"])
+        index._ids = ids
+        index._labels = {
+            product_id: label for label, product_id in enumerate(ids) if label not in deleted
+        }
+        return index
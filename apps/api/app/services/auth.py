@@ -1,13 +1,59 @@
-"""Authentication service for JWT and password management."""
+"""Authentication service for JWT and password management.
+
+Password hashing is deliberately slow (about 100-300 ms of CPU per call).
+Async routes must use the ``*_async`` variants, which run on the dedicated
+``password_executor`` pool instead of the event loop.
+"""
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.services.executor import password_executor
 from app.settings import settings
 
+try:
+    import argon2  # Backend for passlib's argon2 scheme
+except ImportError:  # Optional dependency
+    argon2 = None
+
+
+def create_crypt_context(scheme: str = settings.password_hash_scheme) -> CryptContext:
+    """Create the password hashing context.
+
+    New hashes use ``scheme`` with the configured cost parameters; hashes
+    made with another scheme or weaker parameters still verify but are
+    reported as needing an update, so they get rehashed on the next login.
+
+    Args:
+        scheme: "bcrypt" or "argon2"
+
+    Returns:
+        Configured CryptContext
+
+    Raises:
+        RuntimeError: If argon2 is requested but argon2-cffi is not installed
+    """
+    if scheme == "argon2" and argon2 is None:
+        raise RuntimeError(
+            "argon2 password hashing requires the optional 'argon2-cffi' package. "
+            "Install it or use PASSWORD_HASH_SCHEME=bcrypt."
+        )
+    schemes = [scheme] + [name for name in ("argon2", "bcrypt") if name != scheme and (name != "argon2" or argon2)]
+    return CryptContext(
+        schemes=schemes,
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=settings.password_bcrypt_rounds,
+        bcrypt__min_rounds=settings.password_bcrypt_rounds,
+        argon2__time_cost=settings.password_argon2_time_cost,
+        argon2__memory_cost=settings.password_argon2_memory_cost,
+        argon2__parallelism=settings.password_argon2_parallelism,
+    )
+
+
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = create_crypt_context()
 
 
 def hash_password(password: str) -> str:
@@ -35,6 +81,31 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and rehash it if its hash is outdated.
+
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password from database
+
+    Returns:
+        Tuple of (password matches, replacement hash or None)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password executor (see ``hash_password``)."""
+    return await password_executor.run(hash_password, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the password executor (see ``verify_and_update_password``)."""
+    return await password_executor.run(verify_and_update_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token.
 
@@ -0,0 +1,122 @@
+"""Reference counting for content-addressed uploads.
+
+A blob row and its file change together under the row's lock:
+
+- ``acquire_blob`` takes the reference (creating the row) *before* moving
+  the upload into place, and the caller commits after the move.
+- Deleting the last scan only drops the count to zero. The caller then
+  runs ``delete_unreferenced_blob``, which deletes the row only if the
+  count is still zero and unlinks the files before committing.
+
+Whichever runs first holds the row (or, on SQLite, the database write
+lock) until it commits, so a re-upload of the same bytes either keeps the
+blob alive or stores its file again after the old one was removed.
+"""
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.blob import ImageBlob
+from app.services.storage import StoredUpload, storage_service
+
+
+def acquire_blob(db: Session, upload: StoredUpload, temp_path: Path) -> str:
+    """Add a reference to an uploaded image and put its file in place (in the caller's transaction).
+
+    If the same content is already stored (possibly under another
+    extension), the existing file is used and ``temp_path`` is left for
+    the caller to discard.
+
+    Args:
+        db: Database session
+        upload: Content-addressed location of the upload
+        temp_path: Received temporary file
+
+    Returns:
+        Image URL to store on the scan
+    """
+    result = db.execute(
+        update(ImageBlob)
+        .where(ImageBlob.hash == upload.content_hash)
+        .values(ref_count=ImageBlob.ref_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.execute(
+            insert(ImageBlob).values(
+                hash=upload.content_hash,
+                image_url=upload.url,
+                size_bytes=upload.size,
+                ref_count=1,
+            )
+        )
+        image_url = upload.url
+    else:
+        image_url = db.query(ImageBlob.image_url).filter(ImageBlob.hash == upload.content_hash).scalar()
+
+    if storage_service.get_file_path(image_url).exists():
+        return image_url
+
+    # New content, or a cleanup that removed the files but never committed
+    if image_url != upload.url:
+        db.execute(
+            update(ImageBlob)
+            .where(ImageBlob.hash == upload.content_hash)
+            .values(image_url=upload.url, size_bytes=upload.size)
+            .execution_options(synchronize_session=False)
+        )
+    storage_service.store_received(temp_path, upload)
+    return upload.url
+
+
+def release_blob(db: Session, content_hash: str) -> bool:
+    """Drop a reference to an uploaded image (in the caller's transaction).
+
+    Args:
+        db: Database session
+        content_hash: ImageBlob hash
+
+    Returns:
+        True if this was the last reference (the caller runs
+        ``delete_unreferenced_blob`` after committing)
+    """
+    db.execute(
+        update(ImageBlob)
+        .where(ImageBlob.hash == content_hash)
+        .values(ref_count=ImageBlob.ref_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+    ref_count = db.query(ImageBlob.ref_count).filter(ImageBlob.hash == content_hash).scalar()
+    return ref_count is not None and ref_count <= 0
+
+
+def delete_unreferenced_blob(db: Session, content_hash: str, extra_urls: Iterable[str] = ()) -> bool:
+    """Delete a blob and its files if no scan references it any more (own transaction).
+
+    Args:
+        db: Database session (committed)
+        content_hash: ImageBlob hash
+        extra_urls: Derived files to delete with the image (thumbnail)
+
+    Returns:
+        True if the blob was deleted, False if it was referenced again
+    """
+    try:
+        image_url = db.execute(
+            delete(ImageBlob)
+            .where(ImageBlob.hash == content_hash, ImageBlob.ref_count <= 0)
+            .returning(ImageBlob.image_url)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if image_url is not None:
+            # Still holding the row lock: a concurrent acquire_blob waits
+            # and then stores its own copy
+            for url in (image_url, *extra_urls):
+                storage_service.delete_file(url)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return image_url is not None
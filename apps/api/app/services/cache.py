@@ -0,0 +1,60 @@
+"""In-process caches."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire.
+
+    Lookups and inserts are O(1): entries live in an ``OrderedDict`` in
+    recency order. Expired entries are dropped when read, and the least
+    recently used entry is evicted when the cache is full.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        """Initialize TTL cache.
+
+        Args:
+            max_entries: Entries kept (least recently used evicted first)
+            ttl: Default seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        """Cache a value for ``ttl`` seconds (default: the cache TTL)."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Drop one entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,220 @@
+"""In-process read-through cache of product catalog records.
+
+Scan responses and matching only need a product's display fields (name,
+brand, price, URLs), and the same few hundred popular products show up
+in almost every scan. ``catalog_cache`` keeps those fields as compact
+``__slots__`` records keyed by product id, loads missing ids lazily with
+one query, and evicts the least recently used records beyond its bound.
+
+Records are tied to the catalog version (see ``app.models.catalog``):
+when the version changes, every record is dropped. The version is read at
+most once per ``catalog_cache_version_check_seconds``, so hot reads make
+no database round trip; commits in this process that change products
+force a re-read immediately (see the session listeners below).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.models.catalog import get_catalog_version
+from app.models.product import Product
+from app.settings import settings
+
+
+class CatalogProduct:
+    """Display fields of a product (immutable by convention)."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "brand",
+        "category",
+        "price",
+        "currency",
+        "image_url",
+        "retailer_name",
+        "retailer_url",
+        "affiliate_url",
+        "in_stock",
+    )
+
+    def __init__(self, id, name, brand, category, price, currency, image_url,
+                 retailer_name, retailer_url, affiliate_url, in_stock):
+        self.id = id
+        self.name = name
+        self.brand = brand
+        self.category = category
+        self.price = price
+        self.currency = currency
+        self.image_url = image_url
+        self.retailer_name = retailer_name
+        self.retailer_url = retailer_url
+        self.affiliate_url = affiliate_url
+        self.in_stock = in_stock
+
+    def __repr__(self) -> str:
+        """String representation of CatalogProduct."""
+        return f"<CatalogProduct(id={self.id}, name={self.name}, price=${self.price:.2f})>"
+
+
+# Columns loaded for a CatalogProduct, in constructor order
+_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.brand,
+    Product.category,
+    Product.price,
+    Product.currency,
+    Product.image_url,
+    Product.retailer_name,
+    Product.retailer_url,
+    Product.affiliate_url,
+    Product.in_stock,
+)
+
+
+class ProductCatalogCache:
+    """Bounded LRU of CatalogProduct records, invalidated by catalog version."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.catalog_cache_max_entries,
+        version_check_interval: float = settings.catalog_cache_version_check_seconds,
+    ):
+        """Initialize product catalog cache.
+
+        Args:
+            max_entries: Products kept (least recently used evicted first)
+            version_check_interval: Seconds between catalog version reads
+        """
+        self.max_entries = max_entries
+        self.version_check_interval = version_check_interval
+        self._entries: "OrderedDict[str, CatalogProduct]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._version_checked_at = float("-inf")
+        self._hits = 0
+        self._misses = 0
+
+    def _sync_version(self, db: Session) -> None:
+        """Drop every record if the catalog version moved since the last check."""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        version = get_catalog_version(db)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._version_checked_at = now
+
+    def get_many(self, db: Session, product_ids: Iterable[str]) -> Dict[str, CatalogProduct]:
+        """Return catalog records for the given products.
+
+        Args:
+            db: Database session (used only for misses and version checks)
+            product_ids: Product identifiers
+
+        Returns:
+            Records by id (deleted products are missing)
+        """
+        self._sync_version(db)
+
+        found: Dict[str, CatalogProduct] = {}
+        missing = []
+        with self._lock:
+            for product_id in set(product_ids):
+                record = self._entries.get(product_id)
+                if record is None:
+                    missing.append(product_id)
+                else:
+                    self._entries.move_to_end(product_id)
+                    found[product_id] = record
+            self._hits += len(found)
+            self._misses += len(missing)
+        if not missing:
+            return found
+
+        rows = db.execute(select(*_COLUMNS).where(Product.id.in_(missing))).all()
+        loaded = {row[0]: CatalogProduct(*row) for row in rows}
+        with self._lock:
+            for product_id, record in loaded.items():
+                self._entries[product_id] = record
+                self._entries.move_to_end(product_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        found.update(loaded)
+        return found
+
+    def get(self, db: Session, product_id: str) -> Optional[CatalogProduct]:
+        """Return one product's catalog record, or None if it does not exist."""
+        return self.get_many(db, [product_id]).get(product_id)
+
+    def expire_version(self) -> None:
+        """Re-read the catalog version on the next lookup."""
+        self._version_checked_at = float("-inf")
+
+    def clear(self) -> None:
+        """Drop every record."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._version_checked_at = float("-inf")
+
+    def metrics(self) -> Dict[str, float]:
+        """Return a snapshot of cache metrics."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "limit": self.max_entries,
+                "hits_total": self._hits,
+                "misses_total": self._misses,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global catalog cache instance
+catalog_cache = ProductCatalogCache()
+
+
+# --- Re-check the catalog version after local product changes ---
+
+_CHANGED_KEY = "catalog_cache_changed"
+
+
+def _track_product_changes(session: Session, flush_context) -> None:
+    """Note that a flush wrote products."""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Product):
+            session.info[_CHANGED_KEY] = True
+            return
+
+
+def _track_bulk_change(update_context) -> None:
+    """Note bulk query updates/deletes of products."""
+    mapper = update_context.mapper
+    if mapper is not None and mapper.class_ is Product:
+        update_context.session.info[_CHANGED_KEY] = True
+
+
+def _expire_committed(session: Session) -> None:
+    """Force a version check once the product change is committed."""
+    if session.info.pop(_CHANGED_KEY, False):
+        catalog_cache.expire_version()
+
+
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+
+event.listen(Session, "after_flush", _track_product_changes)
+event.listen(Session, "after_bulk_update", _track_bulk_change)
+event.listen(Session, "after_bulk_delete", _track_bulk_change)
+event.listen(Session, "after_commit", _expire_committed)
+event.listen(Session, "after_rollback", _discard_changes)
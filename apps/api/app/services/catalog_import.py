@@ -0,0 +1,431 @@
+"""Bulk product catalog import from retailer feeds.
+
+Feeds are CSV or JSON Lines files with one product per row. They are
+streamed from disk and written in chunks, each in its own transaction:
+
+1. Parse and validate the chunk's rows (bad rows are skipped and reported).
+2. Embed all of the chunk's products with one batch call.
+3. Upsert them on ``external_id`` with one bulk ``INSERT ... ON CONFLICT DO
+   UPDATE``; rows identical to the stored product are left alone, so
+   ``RETURNING`` yields only new and changed products.
+4. If any product changed, bump the catalog version, log the changed
+   products (replayed by the vector indexes of other processes) and
+   commit, then apply them to the in-memory vector index incrementally.
+
+Re-importing an unchanged feed therefore writes nothing and leaves the
+catalog version, caches and snapshots as they are.
+
+Once the feed is exhausted, in-stock products of the feed's retailers
+that the feed no longer lists are marked out of stock, and change log
+entries older than ``catalog_change_log_retention_hours`` are pruned.
+
+Statements go through the Core tables, so the ORM session listeners
+(catalog version, change log, vector index, catalog cache) never see
+them; the importer does their work explicitly instead.
+"""
+import csv
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import JSON, cast, func, or_, select, update
+
+from app.database import SessionLocal
+from app.models.catalog import (
+    bump_catalog_version,
+    expire_change_log,
+    get_catalog_version,
+    get_latest_change_seq,
+    record_product_changes,
+)
+from app.models.product import Product
+from app.services.catalog_cache import catalog_cache
+from app.services.embeddings import embedding_service
+from app.services.vector_index import vector_index
+from app.settings import settings
+
+REQUIRED_FIELDS = (
+    "external_id", "name", "category", "price", "image_url",
+    "affiliate_url", "retailer_url", "retailer_name",
+)
+LIST_FIELDS = ("colors", "materials", "images")
+MAX_LENGTHS = {"external_id": 255, "name": 255, "brand": 100, "category": 50, "retailer_name": 100}
+
+# Columns overwritten when an existing external_id is imported again
+UPDATE_COLUMNS = (
+    "name", "brand", "category", "price", "currency", "description", "dimensions",
+    "colors", "materials", "image_url", "images", "affiliate_url", "retailer_url",
+    "retailer_name", "embedding", "in_stock",
+)
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+FALSE_VALUES = {"0", "false", "no", "n", "f"}
+
+
+class FeedError(ValueError):
+    """A feed row that cannot be imported."""
+
+
+@dataclass
+class ImportStats:
+    """Progress of a catalog import."""
+    rows: int = 0
+    upserted: int = 0
+    changed: int = 0  # Upserted products that were new or differed from the stored row
+    skipped: int = 0
+    marked_out_of_stock: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def seconds(self) -> float:
+        """Elapsed seconds."""
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        """Feed rows processed per second."""
+        seconds = self.seconds
+        return self.rows / seconds if seconds > 0 else 0.0
+
+
+def detect_feed_format(path: Path) -> str:
+    """Feed format from the file extension ("csv" or "jsonl")."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the feed format of {path}; use .csv or .jsonl")
+
+
+def read_feed(path: Path, feed_format: Optional[str] = None) -> Iterator[dict]:
+    """Stream raw rows from a feed file.
+
+    Args:
+        path: CSV (with a header row) or JSON Lines file
+        feed_format: "csv" or "jsonl" (defaults to the file extension)
+
+    Yields:
+        One dict per product row
+    """
+    feed_format = feed_format or detect_feed_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if feed_format == "csv":
+            yield from csv.DictReader(f)
+            return
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                # Surfaced as a bad row by parse_product
+                yield {"_error": f"line {line_number}: invalid JSON ({e.msg})"}
+
+
+def _parse_bool(value, default: bool = True) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise FeedError(f"invalid boolean {value!r}")
+
+
+def _parse_list(value) -> Optional[list]:
+    """JSON list, JSON-encoded list or "a|b|c" string."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, list):
+        return value
+    text = str(value).strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [part.strip() for part in text.split("|") if part.strip()]
+
+
+def _parse_dict(value) -> Optional[dict]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, dict):
+        return value
+    return json.loads(value)
+
+
+def parse_product(raw: dict) -> dict:
+    """Validate a raw feed row and convert it to product column values.
+
+    Args:
+        raw: Row from ``read_feed``
+
+    Returns:
+        Column values (without ``id`` and ``embedding``)
+
+    Raises:
+        FeedError: If the row is missing fields or has invalid values
+    """
+    if "_error" in raw:
+        raise FeedError(raw["_error"])
+
+    missing = [name for name in REQUIRED_FIELDS if raw.get(name) in (None, "")]
+    if missing:
+        raise FeedError(f"missing {', '.join(missing)}")
+
+    values = {name: str(raw[name]).strip() for name in REQUIRED_FIELDS if name != "price"}
+    values["brand"] = str(raw["brand"]).strip() if raw.get("brand") else None
+    for name, limit in MAX_LENGTHS.items():
+        if values[name] is not None and len(values[name]) > limit:
+            raise FeedError(f"{name} longer than {limit} characters")
+
+    try:
+        values["price"] = float(raw["price"])
+        values["dimensions"] = _parse_dict(raw.get("dimensions"))
+        for name in LIST_FIELDS:
+            values[name] = _parse_list(raw.get(name))
+    except (TypeError, ValueError) as e:
+        raise FeedError(str(e))
+    if not values["price"] >= 0:
+        raise FeedError(f"invalid price {raw['price']!r}")
+
+    currency = str(raw.get("currency") or "USD").strip().upper()
+    if len(currency) != 3:
+        raise FeedError(f"invalid currency {currency!r}")
+    values["currency"] = currency
+    values["description"] = raw.get("description") or None
+    values["in_stock"] = _parse_bool(raw.get("in_stock"))
+    return values
+
+
+def product_embedding_text(values: dict) -> str:
+    """Text a product is embedded from (category, name and brand, if set)."""
+    return " ".join(values[name] for name in ("category", "name", "brand") if values.get(name))
+
+
+def _upsert_statement(dialect_name: str):
+    """Bulk ``INSERT ... ON CONFLICT (external_id) DO UPDATE`` on products.
+
+    Existing rows are only updated when an imported column differs, so the
+    statement returns ids of inserted and changed products only.
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import JSONB, insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = Product.__table__
+    statement = insert(table)
+    values = {name: statement.excluded[name] for name in UPDATE_COLUMNS}
+    values["last_updated"] = func.now()
+
+    differences = []
+    for name in UPDATE_COLUMNS:
+        stored, imported = table.c[name], statement.excluded[name]
+        if dialect_name == "postgresql" and isinstance(stored.type, JSON):
+            # PostgreSQL's json type has no equality operator
+            stored, imported = cast(stored, JSONB), cast(imported, JSONB)
+        differences.append(stored.is_distinct_from(imported))
+
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.external_id], set_=values, where=or_(*differences)
+    ).returning(table.c.id, table.c.external_id)
+
+
+def _log_changes(connection, product_ids: List[str]) -> Tuple[int, int, int]:
+    """Bump the catalog version and log ``product_ids`` (inside the transaction).
+
+    Returns:
+        (first change log seq, last change log seq, new catalog version);
+        the entries are contiguous because the version row stays locked
+        until commit
+    """
+    bump_catalog_version(connection)
+    record_product_changes(connection, product_ids)
+    last_seq = get_latest_change_seq(connection)
+    return last_seq - len(product_ids) + 1, last_seq, get_catalog_version(connection)
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CatalogImporter:
+    """Streams feed rows into the products table in chunked transactions."""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        chunk_size: int = settings.catalog_import_chunk_size,
+        index=vector_index,
+        max_reported_errors: int = 20,
+    ):
+        """Initialize catalog importer.
+
+        Args:
+            session_factory: Creates database sessions
+            chunk_size: Rows per transaction (and per embedding batch)
+            index: Vector index to update incrementally (if built)
+            max_reported_errors: Bad rows printed before going quiet
+        """
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.index = index
+        self.max_reported_errors = max_reported_errors
+
+    def import_rows(
+        self,
+        rows: Iterable[dict],
+        mark_missing: bool = True,
+        retailers: Optional[Set[str]] = None,
+        progress: Optional[Callable[[ImportStats], None]] = None,
+    ) -> ImportStats:
+        """Import raw feed rows.
+
+        Args:
+            rows: Raw rows (see ``read_feed``)
+            mark_missing: Mark unlisted products of the feed's retailers out of stock
+            retailers: Only import rows of, and mark missing products of,
+                these retailers (default: every retailer in the feed)
+            progress: Called with the running stats after every chunk
+
+        Returns:
+            Final import stats
+        """
+        stats = ImportStats()
+        seen: Set[str] = set()
+        feed_retailers: Set[str] = set()
+
+        for chunk in _chunks(rows, self.chunk_size):
+            products: Dict[str, dict] = {}  # external_id -> values; last row wins
+            for raw in chunk:
+                stats.rows += 1
+                try:
+                    values = parse_product(raw)
+                except FeedError as e:
+                    stats.skipped += 1
+                    if stats.skipped <= self.max_reported_errors:
+                        print(f"[!] Skipping row {stats.rows}: {e}")
+                    continue
+                if retailers is not None and values["retailer_name"] not in retailers:
+                    stats.skipped += 1
+                    continue
+                products[values["external_id"]] = values
+
+            if products:
+                stats.changed += self._write_chunk(list(products.values()))
+                seen.update(products)
+                feed_retailers.update(values["retailer_name"] for values in products.values())
+                stats.upserted += len(products)
+            if progress is not None:
+                progress(stats)
+
+        if mark_missing and feed_retailers:
+            stats.marked_out_of_stock = self._mark_missing(seen, retailers or feed_retailers)
+        self._expire_change_log()
+        return stats
+
+    def _write_chunk(self, products: List[dict]) -> int:
+        """Embed and upsert one chunk in a single transaction.
+
+        Returns:
+            Number of products inserted or changed
+        """
+        embeddings = embedding_service.embed_text_batch(
+            [product_embedding_text(values) for values in products]
+        )
+        for values, embedding in zip(products, embeddings):
+            values["id"] = str(uuid.uuid4())  # Used only if the external_id is new
+            values["embedding"] = embedding
+
+        db = self.session_factory()
+        try:
+            connection = db.connection()
+            result = connection.execute(_upsert_statement(connection.dialect.name), products)
+            ids = {external_id: product_id for product_id, external_id in result}
+            if ids:
+                logged = _log_changes(connection, list(ids.values()))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if not ids:
+            return 0
+        catalog_cache.expire_version()
+        if self.index.is_built:
+            upserts = []
+            removals = []
+            for values in products:
+                product_id = ids.get(values["external_id"])
+                if product_id is None:
+                    continue  # Unchanged
+                if values["in_stock"]:
+                    upserts.append((product_id, values["category"], values["embedding"], values["price"]))
+                else:
+                    removals.append(product_id)
+            self.index.apply_logged(upserts, removals, *logged)
+        return len(ids)
+
+    def _expire_change_log(self) -> None:
+        """Prune change log entries past their retention."""
+        db = self.session_factory()
+        try:
+            expire_change_log(db.connection())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _mark_missing(self, seen: Set[str], retailers: Set[str]) -> int:
+        """Mark in-stock products of ``retailers`` not in ``seen`` out of stock.
+
+        Returns:
+            Number of products marked out of stock
+        """
+        table = Product.__table__
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(table.c.id, table.c.external_id).where(
+                    table.c.in_stock == True,  # noqa: E712
+                    table.c.retailer_name.in_(sorted(retailers)),
+                )
+            ).all()
+            missing = [product_id for product_id, external_id in rows if external_id not in seen]
+
+            for chunk in _chunks(missing, self.chunk_size):
+                connection = db.connection()
+                connection.execute(
+                    update(table)
+                    .where(table.c.id.in_(chunk))
+                    .values(in_stock=False, last_updated=func.now())
+                )
+                logged = _log_changes(connection, chunk)
+                db.commit()
+                if self.index.is_built:
+                    self.index.apply_logged([], chunk, *logged)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if missing:
+            catalog_cache.expire_version()
+        return len(missing)
@@ -0,0 +1,226 @@
+"""Embedding providers and the shared embedding cache.
+
+Products (seeder) and detected items (scan pipeline) are embedded through
+the global ``embedding_service`` so both sides of the match come from the
+same provider. Embeddings are unit-length float32 ndarrays and are never
+converted to Python lists.
+
+Scans embed the same few texts (``"sofa furniture"``, ...) over and over,
+so results are memoized in a bounded LRU keyed by (provider version, text)
+or (provider version, SHA-256 of the image crop).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Protocol, Sequence
+
+import numpy as np
+
+from app.settings import settings
+
+
+class EmbeddingProvider(Protocol):
+    """Interface of embedding backends."""
+
+    version: str  # Bump whenever embeddings for the same input may change
+    dimension: int
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """Unit-length float32 embedding of a text."""
+        ...
+
+    def embed_image(self, image_bytes: bytes) -> np.ndarray:
+        """Unit-length float32 embedding of an encoded image (crop)."""
+        ...
+
+    def embed_text_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Unit-length float32 embeddings of several texts, one row each."""
+        ...
+
+
+class StubEmbeddingProvider:
+    """Deterministic pseudo-random embeddings for the MVP.
+
+    Each input seeds this instance's own ``np.random.Generator``, so equal
+    inputs give equal vectors and concurrent scans never touch NumPy's
+    global random state.
+    """
+
+    version = "stub-2"
+
+    def __init__(self, dimension: int = settings.embedding_dimension):
+        """Initialize stub provider.
+
+        Args:
+            dimension: Embedding dimension
+        """
+        self.dimension = dimension
+        self._bit_generator = np.random.PCG64()
+        self._generator = np.random.Generator(self._bit_generator)
+        self._lock = threading.Lock()
+
+    def _embed(self, digest: bytes) -> np.ndarray:
+        """Unit vector drawn from a generator seeded with ``digest``."""
+        state = {
+            "bit_generator": "PCG64",
+            "state": {"state": int.from_bytes(digest[:16], "little"), "inc": 1},
+            "has_uint32": 0,
+            "uinteger": 0,
+        }
+        with self._lock:
+            # Setting the state reseeds without building a new generator
+            self._bit_generator.state = state
+            embedding = self._generator.standard_normal(self.dimension, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding /= norm
+        return embedding
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """Generate a deterministic embedding from text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Unit-length float32 vector
+        """
+        return self._embed(hashlib.blake2b(text.encode(), digest_size=16).digest())
+
+    def embed_image(self, image_bytes: bytes) -> np.ndarray:
+        """Generate a deterministic embedding from image bytes.
+
+        Args:
+            image_bytes: Encoded image
+
+        Returns:
+            Unit-length float32 vector
+        """
+        return self._embed(hashlib.blake2b(image_bytes, digest_size=16).digest())
+
+    def embed_text_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Generate embeddings for several texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Float32 matrix (len(texts), dimension) of unit vectors
+        """
+        matrix = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            matrix[row] = self.embed_text(text)
+        return matrix
+
+
+class EmbeddingService:
+    """Memoizing front end of an embedding provider, with metrics.
+
+    Cached vectors are shared between callers and marked read-only.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, max_entries: int = settings.embedding_cache_max_entries):
+        """Initialize embedding service.
+
+        Args:
+            provider: Embedding backend
+            max_entries: Embeddings kept (least recently used evicted first)
+        """
+        self.provider = provider
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._compute_seconds_sum = 0.0
+
+    @property
+    def version(self) -> str:
+        """Version of the underlying provider."""
+        return self.provider.version
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """Embedding of a text (cached).
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Read-only unit-length float32 vector
+        """
+        return self._get(("text", text), self.provider.embed_text, text)
+
+    def embed_image(self, image_bytes: bytes) -> np.ndarray:
+        """Embedding of an image crop (cached by content hash).
+
+        Args:
+            image_bytes: Encoded image
+
+        Returns:
+            Read-only unit-length float32 vector
+        """
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        return self._get(("image", digest), self.provider.embed_image, image_bytes)
+
+    def embed_text_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings of many distinct texts (bulk imports), bypassing the cache.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Float32 matrix (len(texts), dimension) of unit vectors
+        """
+        started = time.perf_counter()
+        matrix = self.provider.embed_text_batch(texts)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._compute_seconds_sum += elapsed
+        return matrix
+
+    def _get(self, key: tuple, compute, value) -> np.ndarray:
+        """Look ``key`` up, computing and caching the embedding on a miss."""
+        key = (self.provider.version,) + key
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return embedding
+
+        started = time.perf_counter()
+        embedding = compute(value)
+        elapsed = time.perf_counter() - started
+        embedding.flags.writeable = False
+
+        with self._lock:
+            self._misses += 1
+            self._compute_seconds_sum += elapsed
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return embedding
+
+    def clear(self) -> None:
+        """Drop every cached embedding."""
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, float]:
+        """Return a snapshot of cache metrics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "cache_entries": len(self._entries),
+                "cache_limit": self.max_entries,
+                "cache_hits_total": self._hits,
+                "cache_misses_total": self._misses,
+                "cache_hit_ratio": round(self._hits / lookups, 6) if lookups else 0.0,
+                "compute_seconds_sum": round(self._compute_seconds_sum, 6),
+            }
+
+
+# Global embedding service instance
+embedding_service = EmbeddingService(StubEmbeddingProvider())
@@ -0,0 +1,308 @@
+"""Scan progress events (pub/sub for SSE and long-poll clients).
+
+Workers publish stage transitions for a scan (processing, detected, item
+matched, completed, ...). API requests read events after an opaque
+version token, or wait for the next one.
+
+``InProcessEventBus`` works when workers run inside the API process
+(SCAN_WORKER_MODE=embedded). ``RedisEventBus`` shares events across
+processes and hosts.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from app.settings import settings
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Optional dependency
+    redis = None
+    redis_asyncio = None
+
+
+TERMINAL_STAGES = {"completed", "failed"}
+
+
+@dataclass
+class ScanEvent:
+    """A scan progress event."""
+    scan_id: str
+    version: str
+    stage: str
+    data: dict = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible dict."""
+        return asdict(self)
+
+
+class _Channel:
+    """Event history and waiters for one scan."""
+
+    __slots__ = ("events", "version", "waiters", "updated_at")
+
+    def __init__(self):
+        self.events: List[ScanEvent] = []
+        self.version = 0
+        self.waiters: List[tuple] = []  # (event loop, future)
+        self.updated_at = time.monotonic()
+
+
+class InProcessEventBus:
+    """Thread-safe in-process event bus.
+
+    Keeps a bounded history per scan so late subscribers can catch up,
+    and evicts idle scans after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_events: int = 100, max_scans: int = 10000, ttl: int = 600):
+        """Initialize in-process event bus.
+
+        Args:
+            max_events: Events kept per scan
+            max_scans: Scans tracked at once (least recently updated evicted first)
+            ttl: Seconds after the last event before a scan is forgotten
+        """
+        self.max_events = max_events
+        self.max_scans = max_scans
+        self.ttl = ttl
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def publish(self, scan_id: str, stage: str, data: Optional[dict] = None) -> ScanEvent:
+        """Publish an event (callable from any thread).
+
+        Args:
+            scan_id: Scan identifier
+            stage: Stage name
+            data: Extra event payload
+
+        Returns:
+            The published event
+        """
+        with self._lock:
+            channel = self._channels.get(scan_id)
+            if channel is None:
+                channel = self._channels[scan_id] = _Channel()
+            self._channels.move_to_end(scan_id)
+
+            channel.version += 1
+            channel.updated_at = time.monotonic()
+            event = ScanEvent(scan_id=scan_id, version=str(channel.version), stage=stage, data=data or {})
+            channel.events.append(event)
+            del channel.events[:-self.max_events]
+
+            waiters, channel.waiters = channel.waiters, []
+            self._evict_locked()
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        return event
+
+    def events_since(self, scan_id: str, version: Optional[str] = None) -> List[ScanEvent]:
+        """Return events newer than ``version`` (all events if None).
+
+        Args:
+            scan_id: Scan identifier
+            version: Version token of the last event seen
+
+        Returns:
+            Newer events, oldest first
+        """
+        seen = _parse_version(version)
+        with self._lock:
+            channel = self._channels.get(scan_id)
+            if channel is None:
+                return []
+            if seen > channel.version:
+                # Token from before a restart - replay everything we have
+                seen = 0
+            return [event for event in channel.events if int(event.version) > seen]
+
+    def current_version(self, scan_id: str) -> str:
+        """Return the latest version token for a scan ("0" if none)."""
+        with self._lock:
+            channel = self._channels.get(scan_id)
+            return str(channel.version) if channel else "0"
+
+    async def wait(self, scan_id: str, version: Optional[str], timeout: float) -> List[ScanEvent]:
+        """Wait until events newer than ``version`` exist, or the timeout passes.
+
+        Args:
+            scan_id: Scan identifier
+            version: Version token of the last event seen
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Newer events (empty on timeout)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            channel = self._channels.get(scan_id)
+            if channel is None:
+                channel = self._channels[scan_id] = _Channel()
+            channel.waiters.append((loop, future))
+
+        try:
+            events = self.events_since(scan_id, version)
+            if events:
+                return events
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return []
+            return self.events_since(scan_id, version)
+        finally:
+            with self._lock:
+                if (loop, future) in channel.waiters:
+                    channel.waiters.remove((loop, future))
+
+    def _evict_locked(self) -> None:
+        """Drop idle or excess scans; caller holds the lock."""
+        cutoff = time.monotonic() - self.ttl
+        while self._channels:
+            scan_id, channel = next(iter(self._channels.items()))
+            if len(self._channels) <= self.max_scans and channel.updated_at > cutoff:
+                break
+            if channel.waiters:
+                break
+            del self._channels[scan_id]
+
+
+class RedisEventBus:
+    """Event bus backed by one Redis stream per scan (cross-process)."""
+
+    def __init__(
+        self,
+        url: str = settings.redis_url,
+        prefix: str = "splay:scan_events",
+        max_events: int = 100,
+        ttl: int = 600,
+    ):
+        """Initialize Redis event bus.
+
+        Args:
+            url: Redis connection URL
+            prefix: Key prefix
+            max_events: Approximate events kept per scan
+            ttl: Seconds after the last event before a stream expires
+        """
+        if redis is None:
+            raise RuntimeError(
+                "Redis event bus requires the optional 'redis' package. "
+                "Install it or use SCAN_EVENTS_BACKEND=memory."
+            )
+        self.url = url
+        self.prefix = prefix
+        self.max_events = max_events
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._async_client = None
+
+    def _key(self, scan_id: str) -> str:
+        return f"{self.prefix}:{scan_id}"
+
+    def publish(self, scan_id: str, stage: str, data: Optional[dict] = None) -> ScanEvent:
+        """Publish an event."""
+        timestamp = time.time()
+        pipe = self.client.pipeline()
+        pipe.xadd(
+            self._key(scan_id),
+            {"stage": stage, "data": json.dumps(data or {}), "timestamp": timestamp},
+            maxlen=self.max_events,
+            approximate=True,
+        )
+        pipe.expire(self._key(scan_id), self.ttl)
+        entry_id, _ = pipe.execute()
+        return ScanEvent(scan_id=scan_id, version=entry_id, stage=stage, data=data or {}, timestamp=timestamp)
+
+    def events_since(self, scan_id: str, version: Optional[str] = None) -> List[ScanEvent]:
+        """Return events newer than ``version`` (all events if None)."""
+        start = f"({version}" if version and version != "0" else "-"
+        return [
+            self._to_event(scan_id, entry_id, fields)
+            for entry_id, fields in self.client.xrange(self._key(scan_id), min=start)
+        ]
+
+    def current_version(self, scan_id: str) -> str:
+        """Return the latest version token for a scan ("0" if none)."""
+        entries = self.client.xrevrange(self._key(scan_id), count=1)
+        return entries[0][0] if entries else "0"
+
+    async def wait(self, scan_id: str, version: Optional[str], timeout: float) -> List[ScanEvent]:
+        """Wait until events newer than ``version`` exist, or the timeout passes."""
+        if self._async_client is None:
+            self._async_client = redis_asyncio.Redis.from_url(self.url, decode_responses=True)
+        response = await self._async_client.xread(
+            {self._key(scan_id): version or "0"},
+            block=max(int(timeout * 1000), 1),
+        )
+        return [
+            self._to_event(scan_id, entry_id, fields)
+            for _, entries in response
+            for entry_id, fields in entries
+        ]
+
+    @staticmethod
+    def _to_event(scan_id: str, entry_id: str, fields: Dict[str, str]) -> ScanEvent:
+        return ScanEvent(
+            scan_id=scan_id,
+            version=entry_id,
+            stage=fields["stage"],
+            data=json.loads(fields["data"]),
+            timestamp=float(fields["timestamp"]),
+        )
+
+
+def _resolve(future: asyncio.Future) -> None:
+    """Wake a waiter (runs on the waiter's event loop)."""
+    if not future.done():
+        future.set_result(None)
+
+
+def _parse_version(version: Optional[str]) -> int:
+    """Parse an in-process version token (invalid tokens mean "from start")."""
+    try:
+        return max(int(version), 0) if version else 0
+    except ValueError:
+        return 0
+
+
+def publish_scan_event(scan_id: str, stage: str, **data) -> None:
+    """Publish a scan event without letting bus errors break processing.
+
+    Args:
+        scan_id: Scan identifier
+        stage: Stage name
+        **data: Event payload
+    """
+    try:
+        event_bus.publish(scan_id, stage, data)
+    except Exception as e:
+        print(f"Error publishing scan event: {e}")
+
+
+def create_event_bus(backend: str = settings.scan_events_backend):
+    """Create the event bus configured by ``SCAN_EVENTS_BACKEND``.
+
+    Args:
+        backend: "memory" or "redis"
+
+    Returns:
+        Event bus instance
+    """
+    if backend == "redis":
+        return RedisEventBus()
+    return InProcessEventBus()
+
+
+# Global event bus instance
+event_bus = create_event_bus()
@@ -0,0 +1,187 @@
+"""Bounded executor for blocking work called from async routes.
+
+PIL, file I/O and synchronous SQLAlchemy calls block the event loop when
+made directly inside ``async def`` handlers. ``BoundedExecutor.run``
+moves them to a fixed-size thread (or process) pool. At most
+``max_workers + max_queue`` calls may be in flight; beyond that new calls
+fail fast with ``ExecutorSaturatedError`` (served as 503) instead of
+piling up.
+
+A call keeps its slot until the pool has finished it, even if the awaiting
+request is cancelled (client disconnect): the cancelled coroutine waits for
+a call that already started, so the caller's session and temporary files
+are not torn down under a running thread.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal
+
+from app.settings import settings
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when the executor queue is full."""
+
+
+def _timed_call(submitted_at: float, fn: Callable, args: tuple, kwargs: dict) -> tuple:
+    """Run ``fn`` and report how long it waited for a worker.
+
+    Module-level so it can be pickled for process pools. ``time.monotonic``
+    is system-wide, so the wait is comparable across processes.
+
+    Returns:
+        Tuple of (seconds waited, raised exception or None, result)
+    """
+    waited = time.monotonic() - submitted_at
+    try:
+        return waited, None, fn(*args, **kwargs)
+    except Exception as e:
+        return waited, e, None
+
+
+class BoundedExecutor:
+    """Thread or process pool with a bounded queue and wait-time metrics."""
+
+    def __init__(
+        self,
+        max_workers: int = settings.blocking_executor_workers,
+        max_queue: int = settings.blocking_executor_max_queue,
+        kind: Literal["thread", "process"] = "thread",
+        name: str = "blocking",
+    ):
+        """Initialize bounded executor.
+
+        Args:
+            max_workers: Pool size
+            max_queue: Calls allowed to wait for a free worker
+            kind: "thread", or "process" for CPU-bound picklable callables
+            name: Name used for threads and metrics
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self.name = name
+        self._pool = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_sum = 0.0
+        self._wait_seconds_max = 0.0
+        self._run_seconds_sum = 0.0
+
+    def _get_pool(self):
+        """Create the pool on first use."""
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"{self.name}-executor",
+                )
+        return self._pool
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable in the pool and await its result.
+
+        Args:
+            fn: Callable to run
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            ExecutorSaturatedError: If the pool and its queue are full
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(f"{self.name} executor is saturated")
+            self._in_flight += 1
+            self._submitted += 1
+
+        submitted_at = time.monotonic()
+        try:
+            future = self._get_pool().submit(_timed_call, submitted_at, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(lambda done: self._release(done, submitted_at))
+
+        waiting = asyncio.wrap_future(future)
+        try:
+            _, error, result = await asyncio.shield(waiting)
+        except asyncio.CancelledError:
+            # Drop the call if it has not started; otherwise let it finish
+            # before the caller unwinds (it may use the caller's session/files)
+            if not future.cancel():
+                while not waiting.done():
+                    try:
+                        await asyncio.wait([waiting])
+                    except asyncio.CancelledError:
+                        continue
+            raise
+
+        if error is not None:
+            raise error
+        return result
+
+    def _release(self, future: Future, submitted_at: float) -> None:
+        """Free the slot of a finished (or cancelled) call and record its timings."""
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            waited = future.result()[0]
+            self._completed += 1
+            self._wait_seconds_sum += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+            self._run_seconds_sum += time.monotonic() - submitted_at - waited
+
+    def metrics(self) -> Dict[str, float]:
+        """Return a snapshot of executor metrics."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_limit": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(self._in_flight - self.max_workers, 0),
+                "submitted_total": self._submitted,
+                "completed_total": self._completed,
+                "rejected_total": self._rejected,
+                "wait_seconds_sum": round(self._wait_seconds_sum, 6),
+                "wait_seconds_max": round(self._wait_seconds_max, 6),
+                "run_seconds_sum": round(self._run_seconds_sum, 6),
+            }
+
+    def shutdown(self) -> None:
+        """Shut the pool down, waiting for running calls."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """Run blocking work on the global executor (see ``BoundedExecutor.run``)."""
+    return await blocking_executor.run(fn, *args, **kwargs)
+
+
+# Global executor instances
+blocking_executor = BoundedExecutor()
+# Password hashing gets its own small pool: a burst of logins saturates it
+# (and is shed with 503) without starving other blocking work
+password_executor = BoundedExecutor(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+    kind=settings.password_hash_executor_kind,
+    name="password",
+)
@@ -0,0 +1,178 @@
+"""Versioned on-disk snapshots of the vector index.
+
+The ingestion job (``import_catalog.py``, ``build_index_snapshot.py``)
+publishes the index under ``vector_index_snapshot_path``::
+
+    <root>/
+        CURRENT                     name of the published snapshot
+        v000123-s000456/            catalog version 123, change log seq 456
+            snapshot.json           manifest
+            <category>/...          backend files (see ``VectorIndex.save``)
+
+A snapshot is written to a temporary directory and renamed into place,
+then ``CURRENT`` is swapped atomically, so readers never see a partial
+snapshot. Published files are never modified: processes load the
+embedding matrices with ``np.load(..., mmap_mode="r")`` and every worker on
+a host shares one copy of them in the page cache. Products written after
+the snapshot are replayed from the ``catalog_changes`` log (see
+``VectorIndex.restore_snapshot``).
+"""
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+SNAPSHOT_FORMAT = 1
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "snapshot.json"
+
+
+@dataclass(frozen=True)
+class SnapshotManifest:
+    """Description of a published snapshot."""
+    path: Path
+    catalog_version: int
+    change_seq: int  # Last catalog_changes entry the snapshot includes
+    products: int
+    backend: str
+    created_at: str
+
+
+def snapshot_name(catalog_version: int, change_seq: int) -> str:
+    """Directory name of the snapshot of a catalog version and log position."""
+    return f"v{catalog_version:06d}-s{change_seq:06d}"
+
+
+def read_manifest(path: Path) -> SnapshotManifest:
+    """Read the manifest of a snapshot directory.
+
+    Args:
+        path: Snapshot directory
+
+    Returns:
+        Snapshot manifest
+
+    Raises:
+        ValueError: If the snapshot was written in another format
+    """
+    path = Path(path)
+    meta = json.loads((path / MANIFEST_FILE).read_text())
+    if meta.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {meta.get('format')!r} in {path}")
+    return SnapshotManifest(
+        path=path,
+        catalog_version=meta["catalog_version"],
+        change_seq=meta["change_seq"],
+        products=meta["products"],
+        backend=meta["backend"],
+        created_at=meta["created_at"],
+    )
+
+
+def current_snapshot(root: Path) -> Optional[SnapshotManifest]:
+    """Return the published snapshot under ``root``, or None if there is none usable."""
+    root = Path(root)
+    try:
+        name = (root / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+    try:
+        return read_manifest(root / name)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error reading index snapshot {name}: {e}")
+        return None
+
+
+def _write_current(root: Path, name: str) -> None:
+    """Point ``CURRENT`` at a snapshot (atomic rename)."""
+    temp_path = root / f".{CURRENT_FILE}-{uuid.uuid4().hex}"
+    temp_path.write_text(name + "\n")
+    os.replace(temp_path, root / CURRENT_FILE)
+
+
+def publish_snapshot(
+    root: Path,
+    save: Callable[[Path], None],
+    catalog_version: int,
+    change_seq: int,
+    products: int,
+    backend: str,
+) -> SnapshotManifest:
+    """Write a snapshot and make it the current one.
+
+    Args:
+        root: Snapshot root directory (created if missing)
+        save: Writes the index files into a directory
+        catalog_version: Catalog version the index was built at
+        change_seq: Last change log entry the index includes
+        products: Number of indexed products
+        backend: Configured index backend
+
+    Returns:
+        Manifest of the published snapshot
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    name = snapshot_name(catalog_version, change_seq)
+    path = root / name
+
+    if not (path / MANIFEST_FILE).exists():
+        temp_path = root / f".tmp-{name}-{uuid.uuid4().hex}"
+        try:
+            save(temp_path)
+            (temp_path / MANIFEST_FILE).write_text(json.dumps({
+                "format": SNAPSHOT_FORMAT,
+                "catalog_version": catalog_version,
+                "change_seq": change_seq,
+                "products": products,
+                "backend": backend,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }))
+            os.rename(temp_path, path)
+        except OSError:
+            # Another publisher already renamed the same snapshot into place
+            if not (path / MANIFEST_FILE).exists():
+                raise
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+    _write_current(root, name)
+    return read_manifest(path)
+
+
+def list_snapshots(root: Path) -> List[SnapshotManifest]:
+    """List readable snapshots under ``root``, newest first."""
+    manifests = []
+    for path in Path(root).glob("v*"):
+        try:
+            manifests.append(read_manifest(path))
+        except (OSError, ValueError, KeyError):
+            continue
+    return sorted(manifests, key=lambda m: (m.catalog_version, m.change_seq), reverse=True)
+
+
+def prune_snapshots(root: Path, keep: int) -> List[SnapshotManifest]:
+    """Delete all but the ``keep`` newest snapshots (never the current one).
+
+    Processes that still map files of a deleted snapshot keep reading them
+    until they exit.
+
+    Args:
+        root: Snapshot root directory
+        keep: Snapshots to keep
+
+    Returns:
+        Manifests of the kept snapshots
+    """
+    current = current_snapshot(root)
+    kept = []
+    for manifest in list_snapshots(root):
+        if len(kept) < keep or (current is not None and manifest.path == current.path):
+            kept.append(manifest)
+        else:
+            shutil.rmtree(manifest.path, ignore_errors=True)
+    return kept
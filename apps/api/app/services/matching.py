@@ -1,36 +1,18 @@
 """Product matching service."""
-from typing import List, Dict, Tuple
+from typing import List, Dict, NamedTuple, Optional, Tuple
 import numpy as np
-import hashlib
+from sqlalchemy import Float, text
 from sqlalchemy.orm import Session
 
 from app.models.product import Product
+from app.services.ann import top_k
+from app.services.catalog_cache import CatalogProduct, catalog_cache
+from app.services.vector_index import EMPTY_CANDIDATES, MatchCandidates, vector_index
+from app.settings import settings
 
-
-def generate_stub_embedding(text: str, dimension: int = 512) -> List[float]:
-    """Generate a deterministic embedding vector from text.
-
-    Args:
-        text: Text to generate embedding from
-        dimension: Embedding dimension
-
-    Returns:
-        List of floats representing the embedding
-    """
-    # Create deterministic embedding based on text hash
-    hash_obj = hashlib.md5(text.encode())
-    seed = int(hash_obj.hexdigest()[:8], 16)
-    np.random.seed(seed)
-
-    # Generate random vector
-    embedding = np.random.randn(dimension)
-
-    # Normalize to unit vector
-    norm = np.linalg.norm(embedding)
-    if norm > 0:
-        embedding = embedding / norm
-
-    return embedding.tolist()
+# Budget alternative: >= 20% cheaper than the top match, still similar
+BUDGET_PRICE_RATIO = 0.8
+BUDGET_MIN_SIMILARITY = 0.75
 
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
@@ -43,7 +25,7 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     Returns:
         Cosine similarity score (0-1)
     """
-    if not vec1 or not vec2:
+    if vec1 is None or vec2 is None or len(vec1) == 0 or len(vec2) == 0:
         return 0.0
 
     arr1 = np.array(vec1)
@@ -59,114 +41,215 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     return float(dot_product / (norm1 * norm2))
 
 
-def find_matching_products(
-    category: str,
-    embedding: List[float],
+def uses_database_vector_search(db: Session) -> bool:
+    """Whether matching runs in the database (pgvector) for this session."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+# Installed pgvector version, read once per process
+_pgvector_version: Tuple[int, ...] | None = None
+
+
+def pgvector_version(db: Session) -> Tuple[int, ...]:
+    """Version of the ``vector`` extension in the database, e.g. (0, 7, 4)."""
+    global _pgvector_version
+    if _pgvector_version is None:
+        version = db.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        ).scalar() or "0"
+        _pgvector_version = tuple(int(part) for part in version.split(".") if part.isdigit())
+    return _pgvector_version
+
+
+def search_products_in_database(
+    queries: List[Tuple[str, List[float]]],
     db: Session,
-    limit: int = 20
-) -> List[Tuple[Product, float]]:
-    """Find products matching the given category and embedding.
+    limit: int = settings.matching_candidate_pool_size
+) -> List[MatchCandidates]:
+    """Nearest in-stock products per query, searched by pgvector.
+
+    Category and stock filters and ``ORDER BY embedding <=> :q LIMIT k``
+    run in PostgreSQL against the HNSW index on ``products.embedding``.
+    Iterative index scans (``pgvector_iterative_scan``) keep filtered
+    queries from returning fewer than ``limit`` rows when a category is
+    small relative to ``ef_search``; older pgvector versions reject the
+    setting, so it is only sent to pgvector >= 0.8.
 
     Args:
-        category: Product category to search
-        embedding: Item embedding vector
-        db: Database session
-        limit: Maximum number of matches to return
+        queries: (category, embedding) pair for each detected item
+        db: Database session (PostgreSQL)
+        limit: Maximum number of candidates per query
 
     Returns:
-        List of (product, similarity_score) tuples
+        One MatchCandidates per query, in order
     """
-    # Query products by category
-    products = db.query(Product).filter(
-        Product.category == category,
-        Product.in_stock == True
-    ).all()
+    # SET takes no bind parameters; both values come from settings
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.pgvector_ef_search)}"))
+    if settings.pgvector_iterative_scan != "off" and pgvector_version(db) >= (0, 8):
+        db.execute(text(f"SET LOCAL hnsw.iterative_scan = {settings.pgvector_iterative_scan}"))
+
+    results = []
+    for category, embedding in queries:
+        if embedding is None or not np.any(embedding):
+            results.append(EMPTY_CANDIDATES)
+            continue
+        # Binds through the Embedding type, which sends a unit-length vector
+        distance = Product.embedding.op("<=>", return_type=Float)(embedding)
+        rows = (
+            db.query(Product.id, distance, Product.price)
+            .filter(
+                Product.category == category,
+                Product.in_stock == True,  # noqa: E712
+                Product.embedding.isnot(None),
+            )
+            .order_by(distance)
+            .limit(limit)
+            .all()
+        )
+        results.append(MatchCandidates(
+            np.array([product_id for product_id, _, _ in rows], dtype=object),
+            np.array([1.0 - float(value) for _, value, _ in rows], dtype=np.float32),
+            np.array([price for _, _, price in rows], dtype=np.float32),
+        ))
+    return results
 
-    if not products:
-        return []
 
-    # Calculate similarity for each product
-    matches = []
-    for product in products:
-        if product.embedding:
-            # Embedding stored as dict with 'vector' key
-            product_embedding = product.embedding.get('vector', [])
-            if product_embedding:
-                similarity = cosine_similarity(embedding, product_embedding)
-                matches.append((product, similarity))
+def search_candidates_batch(
+    queries: List[Tuple[str, List[float]]],
+    db: Session,
+    catalog_version: Optional[int] = None,
+) -> List[MatchCandidates]:
+    """Candidate products with similarities and prices for each query.
+
+    On PostgreSQL the search runs in the database (see
+    ``search_products_in_database``). Otherwise the in-memory vector index
+    scores queries sharing a category together; exact categories return
+    every in-stock product in the category.
+
+    Args:
+        queries: (category, embedding) pair for each detected item
+        db: Database session
+        catalog_version: Catalog version the results must reflect at least
+            (the in-memory index is refreshed first if it is older)
+
+    Returns:
+        One MatchCandidates per query, in order
+    """
+    if uses_database_vector_search(db):
+        return search_products_in_database(queries, db)
+    vector_index.ensure_built(db, min_version=catalog_version)
+    return vector_index.candidates_batch(queries)
 
-    # Sort by similarity score descending
-    matches.sort(key=lambda x: x[1], reverse=True)
 
-    return matches[:limit]
+class RankedMatch(NamedTuple):
+    """A ranked product for one detected item (not yet loaded)."""
+    product_id: str
+    similarity_score: float
+    rank: int
+    is_budget_alternative: bool
 
 
 def rank_products(
-    matches: List[Tuple[Product, float]],
-    top_n: int = 6
-) -> List[Dict]:
-    """Rank products and select budget alternative.
+    candidates: MatchCandidates,
+    top_n: int = 6,
+    budget_price_ratio: float = BUDGET_PRICE_RATIO,
+    budget_min_similarity: float = BUDGET_MIN_SIMILARITY,
+) -> List[RankedMatch]:
+    """Rank candidates and select a budget alternative.
+
+    The top ``top_n - 1`` products by similarity are ranked first. The
+    budget alternative is the most similar remaining candidate that is at
+    least 20% cheaper than the top match with similarity >= 0.75; it is
+    chosen with one masked ``argmax`` over all candidates, not just the
+    ones that made the top list.
 
     Args:
-        matches: List of (product, similarity_score) tuples
-        top_n: Number of top products to return (default 6: 5 regular + 1 budget)
+        candidates: Candidate arrays for one item
+        top_n: Number of products to return (default 6: 5 regular + 1 budget)
+        budget_price_ratio: Budget pick must cost less than this times the top price
+        budget_min_similarity: Minimum similarity of the budget pick
 
     Returns:
-        List of product dictionaries with ranking info
+        Ranked matches, best first, budget alternative last
     """
-    if not matches:
+    product_ids, similarities, prices = candidates
+    if not len(product_ids):
         return []
 
-    # Take top 5 matches
-    top_matches = matches[:5]
+    top = top_k(similarities, max(top_n - 1, 1))
 
-    # Find budget alternative
-    # Criteria: ≥20% cheaper than top match, similarity ≥ 0.75
-    budget_alternative = None
-    if top_matches:
-        top_price = top_matches[0][0].price
-        min_price = top_price * 0.8  # 20% cheaper
+    # Candidates outside the top list that are cheap and similar enough
+    eligible = (prices < prices[top[0]] * budget_price_ratio) & (similarities >= budget_min_similarity)
+    eligible[top] = False
 
-        for product, similarity in matches[5:]:  # Skip top 5
-            if product.price < min_price and similarity >= 0.75:
-                budget_alternative = (product, similarity)
-                break
+    results = [
+        RankedMatch(product_ids[i], round(float(similarities[i]), 3), rank, False)
+        for rank, i in enumerate(top, start=1)
+    ]
+    if eligible.any():
+        budget = int(np.argmax(np.where(eligible, similarities, -np.inf)))
+        results.append(RankedMatch(product_ids[budget], round(float(similarities[budget]), 3), len(results) + 1, True))
+    return results
 
-    # Build ranked results
-    results = []
 
-    for rank, (product, similarity) in enumerate(top_matches, start=1):
-        results.append({
-            "product_id": product.id,
-            "name": product.name,
-            "brand": product.brand,
-            "price": product.price,
-            "currency": product.currency,
-            "image_url": product.image_url,
-            "retailer_name": product.retailer_name,
-            "retailer_url": product.retailer_url,
-            "affiliate_url": product.affiliate_url,
-            "similarity_score": round(similarity, 3),
-            "is_budget_alternative": False,
-            "rank": rank
-        })
-
-    # Add budget alternative if found
-    if budget_alternative:
-        product, similarity = budget_alternative
-        results.append({
-            "product_id": product.id,
-            "name": product.name,
-            "brand": product.brand,
-            "price": product.price,
-            "currency": product.currency,
-            "image_url": product.image_url,
-            "retailer_name": product.retailer_name,
-            "retailer_url": product.retailer_url,
-            "affiliate_url": product.affiliate_url,
-            "similarity_score": round(similarity, 3),
-            "is_budget_alternative": True,
-            "rank": 6
-        })
+def find_matching_products_batch(
+    queries: List[Tuple[str, List[float]]],
+    db: Session,
+    top_n: int = 6,
+    catalog_version: Optional[int] = None,
+) -> List[List[RankedMatch]]:
+    """Find and rank matching products for several detected items.
 
-    return results
+    Works on candidate id/similarity/price arrays only; no products are
+    loaded (see ``load_matched_products``).
+
+    Args:
+        queries: (category, embedding) pair for each detected item
+        db: Database session
+        top_n: Matches per item, including the budget alternative
+        catalog_version: Catalog version the matches must reflect at least
+
+    Returns:
+        One list of ranked matches per query, in order
+    """
+    return [
+        rank_products(candidates, top_n=top_n)
+        for candidates in search_candidates_batch(queries, db, catalog_version)
+    ]
+
+
+def load_matched_products(db: Session, matches: List[List[RankedMatch]]) -> Dict[str, CatalogProduct]:
+    """Look up the products behind ranked matches in the catalog cache.
+
+    Args:
+        db: Database session (only touched on cache misses)
+        matches: Ranked matches per item
+
+    Returns:
+        Catalog records by product id
+    """
+    return catalog_cache.get_many(
+        db, (match.product_id for item_matches in matches for match in item_matches)
+    )
+
+
+def find_matching_products(
+    category: str,
+    embedding: List[float],
+    db: Session,
+    top_n: int = 6
+) -> List[Tuple[CatalogProduct, RankedMatch]]:
+    """Find matching products for one item and look them up.
+
+    Args:
+        category: Product category to search
+        embedding: Item embedding vector
+        db: Database session
+        top_n: Matches to return, including the budget alternative
+
+    Returns:
+        List of (catalog record, ranked match) tuples
+    """
+    matches = find_matching_products_batch([(category, embedding)], db, top_n=top_n)
+    products = load_matched_products(db, matches)
+    return [(products[match.product_id], match) for match in matches[0] if match.product_id in products]
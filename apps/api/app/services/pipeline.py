@@ -0,0 +1,427 @@
+"""Scan processing pipeline (runs in background workers).
+
+A job can be claimed again while a slow attempt is still running (its
+claim timed out), so scan writes are fenced: ``start_scan`` records the
+attempt's claim on the scan, and every transaction that completes a scan
+starts with ``complete_if_claimed``, a conditional UPDATE that matches only
+while the scan is still processing under that claim. It locks the scan
+row until commit, so of two attempts exactly one writes detected items
+and matches; the other rolls back.
+"""
+import time
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import LargeBinary, select, type_coerce, update
+from sqlalchemy.orm import Session
+
+from app.models.catalog import get_catalog_version
+from app.models.scan import Scan, DetectedItem, ItemMatch
+from app.services.embeddings import embedding_service
+from app.services.events import publish_scan_event
+from app.services.matching import find_matching_products_batch
+from app.services.scan_results import insert_scan_results, store_scan_response
+from app.services.storage import storage_service
+from app.services.vision import Detection, vision_provider
+from app.settings import settings
+
+
+def find_cached_result(db: Session, scan: Scan, catalog_version: int) -> Optional[Scan]:
+    """Find a completed scan of the same image with a still-valid result.
+
+    Results are keyed by (image hash, vision provider version, catalog
+    version): same bytes, same detector and an unchanged catalog give the
+    same detections and matches.
+
+    Args:
+        db: Database session
+        scan: Scan to find a result for
+        catalog_version: Current catalog version
+
+    Returns:
+        Earlier completed scan, or None
+    """
+    if not settings.scan_result_cache_enabled or scan.image_hash is None:
+        return None
+
+    return (
+        db.query(Scan)
+        .filter(
+            Scan.image_hash == scan.image_hash,
+            Scan.vision_version == vision_provider.version,
+            Scan.catalog_version == catalog_version,
+            Scan.status == "completed",
+            Scan.id != scan.id,
+        )
+        .order_by(Scan.completed_at.desc())
+        .first()
+    )
+
+
+def clone_scan_result(db: Session, source: Scan, target: Scan) -> int:
+    """Copy detected items and matches of ``source`` onto ``target``.
+
+    Crops are shared with the source scan (same image, same boxes).
+
+    Args:
+        db: Database session
+        source: Completed scan
+        target: Scan receiving the result
+
+    Returns:
+        Number of items copied
+    """
+    embedding = DetectedItem.embedding
+    if db.get_bind().dialect.name != "postgresql":
+        # Copy the stored blob as-is instead of decoding and re-encoding it
+        embedding = type_coerce(DetectedItem.embedding, LargeBinary).label("embedding")
+
+    items = db.execute(
+        select(
+            DetectedItem.id,
+            DetectedItem.category,
+            DetectedItem.bbox_x,
+            DetectedItem.bbox_y,
+            DetectedItem.bbox_width,
+            DetectedItem.bbox_height,
+            DetectedItem.confidence,
+            DetectedItem.crop_url,
+            embedding,
+        ).where(DetectedItem.scan_id == source.id)
+    ).all()
+    new_item_ids = {item.id: str(uuid.uuid4()) for item in items}
+
+    matches = db.execute(
+        select(
+            ItemMatch.item_id,
+            ItemMatch.product_id,
+            ItemMatch.similarity_score,
+            ItemMatch.rank,
+            ItemMatch.is_budget_alternative,
+        ).where(ItemMatch.item_id.in_(list(new_item_ids)))
+    ).all() if items else []
+
+    insert_scan_results(
+        db,
+        [
+            {
+                "id": new_item_ids[item.id],
+                "scan_id": target.id,
+                "category": item.category,
+                "bbox_x": item.bbox_x,
+                "bbox_y": item.bbox_y,
+                "bbox_width": item.bbox_width,
+                "bbox_height": item.bbox_height,
+                "confidence": item.confidence,
+                "crop_url": item.crop_url,
+                "embedding": item.embedding,
+            }
+            for item in items
+        ],
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "item_id": new_item_ids[match.item_id],
+                "product_id": match.product_id,
+                "similarity_score": match.similarity_score,
+                "rank": match.rank,
+                "is_budget_alternative": match.is_budget_alternative,
+            }
+            for match in matches
+        ],
+    )
+
+    target.thumbnail_url = source.thumbnail_url
+    target.vision_version = source.vision_version
+    target.catalog_version = source.catalog_version
+    return len(items)
+
+
+def complete_if_claimed(db: Session, scan_id: str, claim: Optional[str]) -> bool:
+    """Mark a scan completed if the caller still owns it.
+
+    Must be the first write of the transaction that stores the scan's
+    results; the UPDATE holds the scan row lock until commit.
+
+    Args:
+        db: Database session
+        scan_id: Scan identifier
+        claim: Claim passed to ``start_scan``, or None for a pending scan
+            no worker has started (result reuse at upload time)
+
+    Returns:
+        True if the scan is now completed by this transaction; False if it
+        was completed, deleted or claimed by another attempt (roll back)
+    """
+    if claim is None:
+        owned = (Scan.status == "pending", Scan.processing_claim.is_(None))
+    else:
+        owned = (Scan.status == "processing", Scan.processing_claim == claim)
+    result = db.execute(
+        update(Scan)
+        .where(Scan.id == scan_id, *owned)
+        .values(status="completed")
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def reuse_cached_result(db: Session, scan: Scan, claim: Optional[str] = None) -> bool:
+    """Complete a scan from a cached result if one exists.
+
+    Args:
+        db: Database session
+        scan: Pending scan, or processing scan claimed with ``claim``
+        claim: Claim of the processing attempt (None for a pending scan)
+
+    Returns:
+        True if the scan needs no further processing: it was completed
+        from the cache, or another attempt owns it now
+    """
+    started = time.perf_counter()
+    source = find_cached_result(db, scan, get_catalog_version(db))
+    if source is None:
+        return False
+
+    if not complete_if_claimed(db, scan.id, claim):
+        db.rollback()
+        return True
+
+    item_count = clone_scan_result(db, source, scan)
+    scan.status = "completed"
+    scan.error_message = None
+    scan.completed_at = datetime.utcnow()
+    scan.processing_time_ms = int((time.perf_counter() - started) * 1000)
+    store_scan_response(db, scan)
+    db.commit()
+    publish_scan_event(
+        scan.id,
+        "completed",
+        item_count=item_count,
+        processing_time_ms=scan.processing_time_ms,
+        cached=True,
+    )
+    return True
+
+
+def start_scan(db: Session, scan_id: str, claim: str) -> Optional[Scan]:
+    """Claim a scan for a processing attempt, unless it needs no detection.
+
+    Args:
+        db: Database session
+        scan_id: Scan identifier
+        claim: Identifies this attempt (unique per claim of the job);
+            pass the same value to ``finish_scan``
+
+    Returns:
+        The scan, now "processing" under ``claim``, or None if the scan no
+        longer exists, is already completed or was completed from the
+        result cache
+    """
+    claimed = db.execute(
+        update(Scan)
+        .where(Scan.id == scan_id, Scan.status != "completed")
+        .values(
+            status="processing",
+            processing_claim=claim,
+            error_message=None,
+            vision_version=vision_provider.version,
+            catalog_version=get_catalog_version(db),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return None
+
+    scan = db.query(Scan).filter(Scan.id == scan_id).first()
+    # An identical upload may have finished while this one was queued
+    if scan is None or reuse_cached_result(db, scan, claim):
+        return None
+
+    publish_scan_event(scan.id, "processing")
+    return scan
+
+
+def scan_image_path(scan: Scan) -> str:
+    """Local path of a scan's uploaded image (input to the vision provider)."""
+    return str(storage_service.get_file_path(scan.image_url))
+
+
+def finish_scan(
+    db: Session,
+    scan: Scan,
+    claim: str,
+    detections: List[Detection],
+    started: float,
+) -> Optional[Scan]:
+    """Crop, match and store the detections of a processing scan.
+
+    All detected items and matches are written in a single transaction, so
+    a failed attempt leaves nothing behind and can simply be retried.
+
+    Args:
+        db: Database session
+        scan: Scan returned by ``start_scan``
+        claim: Claim passed to ``start_scan``
+        detections: Vision provider output for the scan's image
+        started: ``time.perf_counter()`` when processing started
+
+    Returns:
+        The completed scan, or None if another attempt claimed the scan
+        in the meantime (nothing is written)
+
+    Raises:
+        Exception: Any processing error (the transaction is rolled back)
+    """
+    try:
+        publish_scan_event(
+            scan.id,
+            "detected",
+            item_count=len(detections),
+            categories=[detection.category for detection in detections],
+        )
+
+        # Decode once; thumbnail and crops all come from the same image
+        item_ids = [str(uuid.uuid4()) for _ in detections]
+        thumbnail_url, crop_urls = storage_service.render_scan_images(
+            scan.image_url,
+            [(detection.bbox, item_id) for detection, item_id in zip(detections, item_ids)],
+        )
+        embeddings = [embedding_service.embed_text(f"{detection.category} furniture") for detection in detections]
+
+        # Find and rank matching products for all items in one pass (ids only),
+        # against a catalog at least as new as the version the result is cached under
+        all_matches = find_matching_products_batch(
+            [(detection.category, embedding) for detection, embedding in zip(detections, embeddings)],
+            db,
+            top_n=6,
+            catalog_version=scan.catalog_version,
+        )
+
+        item_rows = []
+        match_rows = []
+        for index, (detection, item_id, crop_url, embedding_vector, ranked_products) in enumerate(zip(
+            detections, item_ids, crop_urls, embeddings, all_matches
+        )):
+            item_rows.append({
+                "id": item_id,
+                "scan_id": scan.id,
+                "category": detection.category,
+                "bbox_x": detection.bbox[0],
+                "bbox_y": detection.bbox[1],
+                "bbox_width": detection.bbox[2],
+                "bbox_height": detection.bbox[3],
+                "confidence": detection.confidence,
+                "crop_url": crop_url,
+                "embedding": embedding_vector,
+            })
+            match_rows.extend(
+                {
+                    "id": str(uuid.uuid4()),
+                    "item_id": item_id,
+                    "product_id": match.product_id,
+                    "similarity_score": match.similarity_score,
+                    "rank": match.rank,
+                    "is_budget_alternative": match.is_budget_alternative,
+                }
+                for match in ranked_products
+            )
+
+            publish_scan_event(
+                scan.id,
+                "item_matched",
+                item_index=index,
+                item_count=len(detections),
+                category=detection.category,
+                match_count=len(ranked_products),
+            )
+
+        if not complete_if_claimed(db, scan.id, claim):
+            db.rollback()
+            for crop_url in crop_urls:
+                if crop_url:
+                    storage_service.delete_file(crop_url)
+            return None
+
+        # Write all items and matches in two statements
+        insert_scan_results(db, item_rows, match_rows)
+
+        # Update scan status
+        scan.thumbnail_url = thumbnail_url
+        scan.status = "completed"
+        scan.completed_at = datetime.utcnow()
+        scan.processing_time_ms = int((time.perf_counter() - started) * 1000)
+        store_scan_response(db, scan)
+
+        db.commit()
+        publish_scan_event(
+            scan.id,
+            "completed",
+            item_count=len(detections),
+            processing_time_ms=scan.processing_time_ms,
+        )
+        return scan
+
+    except Exception:
+        db.rollback()
+        raise
+
+
+def process_scan(db: Session, scan_id: str) -> Optional[Scan]:
+    """Detect, crop and match furniture for a single pending scan.
+
+    Workers process claimed scans in batches (``start_scan``, one
+    ``detect_furniture_batch`` call, then ``finish_scan`` per scan); this
+    runs the same steps for one scan.
+
+    Args:
+        db: Database session
+        scan_id: Scan identifier
+
+    Returns:
+        The scan (completed unless another attempt owns it), or None if
+        the scan no longer exists
+
+    Raises:
+        Exception: Any processing error (the transaction is rolled back)
+    """
+    started = time.perf_counter()
+    claim = uuid.uuid4().hex
+    scan = start_scan(db, scan_id, claim)
+    if scan is not None:
+        detections = vision_provider.detect_furniture_batch([scan_image_path(scan)])[0]
+        scan = finish_scan(db, scan, claim, detections, started)
+    return scan or db.query(Scan).filter(Scan.id == scan_id).first()
+
+
+def mark_scan_failed(
+    db: Session,
+    scan_id: str,
+    error: str,
+    processing_time_ms: Optional[int] = None,
+    retrying: bool = False,
+) -> None:
+    """Record a failed processing attempt on the scan.
+
+    Args:
+        db: Database session
+        scan_id: Scan identifier
+        error: Error message
+        processing_time_ms: Duration of the failed attempt
+        retrying: Whether the job will be retried (scan goes back to pending)
+    """
+    scan = db.query(Scan).filter(Scan.id == scan_id).first()
+    if scan is None:
+        return
+
+    scan.error_message = error
+    scan.processing_time_ms = processing_time_ms
+    if retrying:
+        scan.status = "pending"
+    else:
+        scan.status = "failed"
+        scan.completed_at = datetime.utcnow()
+    db.commit()
+    publish_scan_event(scan_id, "retrying" if retrying else "failed", error=error)
@@ -0,0 +1,255 @@
+"""Caches for request authentication.
+
+``get_current_user`` verifies a JWT and loads the user on every protected
+request. Two caches take both steps off the hot path:
+
+- ``token_cache`` keeps decoded access-token payloads (keyed by the token
+  signature) until the token expires, so a polling client's repeated
+  requests skip signature verification.
+- ``principal_cache`` keeps a small immutable snapshot of each active user
+  for a short TTL, so those requests skip the user query.
+
+Principals are invalidated after a commit that deactivates, deletes or
+changes the subscription tier of a user (see the session listeners below).
+The in-process backend only sees commits made in its own process, and the
+TTL bounds staleness across processes. The Redis backend shares entries
+and invalidations between processes.
+"""
+import hmac
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.services.cache import TTLCache
+from app.settings import settings
+
+try:
+    import redis
+except ImportError:  # Optional dependency
+    redis = None
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user, as seen by request handlers."""
+    id: str
+    email: str
+    name: str
+    subscription_tier: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Snapshot a User row."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            subscription_tier=user.subscription_tier,
+            is_active=user.is_active,
+        )
+
+
+class InProcessPrincipalCache:
+    """Principal cache in this process's memory (TTL + LRU)."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.auth_principal_cache_max_entries,
+        ttl: float = settings.auth_principal_cache_ttl_seconds,
+    ):
+        """Initialize in-process principal cache.
+
+        Args:
+            max_entries: Users kept at once
+            ttl: Seconds a principal is trusted without re-reading the user
+        """
+        self._cache = TTLCache(max_entries, ttl)
+
+    def get(self, user_id: str) -> Optional[Principal]:
+        """Return the cached principal for a user, if any."""
+        return self._cache.get(user_id)
+
+    def set(self, principal: Principal) -> None:
+        """Cache a principal."""
+        self._cache.set(principal.id, principal)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget one user."""
+        self._cache.delete(user_id)
+
+    def clear(self) -> None:
+        """Forget every user."""
+        self._cache.clear()
+
+
+class RedisPrincipalCache:
+    """Principal cache shared through Redis (cross-process invalidation)."""
+
+    def __init__(
+        self,
+        url: str = settings.redis_url,
+        prefix: str = "splay:principal",
+        ttl: int = settings.auth_principal_cache_ttl_seconds,
+    ):
+        """Initialize Redis principal cache.
+
+        Args:
+            url: Redis connection URL
+            prefix: Key prefix
+            ttl: Seconds a principal is trusted without re-reading the user
+        """
+        if redis is None:
+            raise RuntimeError(
+                "Redis principal cache requires the optional 'redis' package. "
+                "Install it or use AUTH_CACHE_BACKEND=memory."
+            )
+        self.prefix = prefix
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def get(self, user_id: str) -> Optional[Principal]:
+        """Return the cached principal for a user, if any."""
+        data = self.client.get(self._key(user_id))
+        return Principal(**json.loads(data)) if data else None
+
+    def set(self, principal: Principal) -> None:
+        """Cache a principal."""
+        self.client.set(self._key(principal.id), json.dumps(asdict(principal)), ex=self.ttl)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget one user."""
+        self.client.delete(self._key(user_id))
+
+    def clear(self) -> None:
+        """Forget every user."""
+        keys = list(self.client.scan_iter(f"{self.prefix}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class TokenCache:
+    """Decoded access-token payloads keyed by the token's signature segment.
+
+    Entries never outlive the token's ``exp`` claim. The full token is kept
+    alongside the payload and compared on lookup, so only the exact token
+    that was verified gets a hit.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.auth_token_cache_max_entries,
+        ttl: float = settings.auth_token_cache_ttl_seconds,
+    ):
+        """Initialize token cache.
+
+        Args:
+            max_entries: Tokens kept at once
+            ttl: Maximum seconds a decoded token is kept
+        """
+        self._cache = TTLCache(max_entries, ttl)
+
+    @staticmethod
+    def _signature(token: str) -> str:
+        return token.rpartition(".")[2]
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return the payload of a previously verified token, if cached."""
+        entry = self._cache.get(self._signature(token))
+        if entry is None or not hmac.compare_digest(entry[0], token):
+            return None
+        return entry[1]
+
+    def set(self, token: str, payload: dict) -> None:
+        """Cache a verified token's payload until it expires."""
+        ttl = self._cache.ttl
+        expires = payload.get("exp")
+        if isinstance(expires, (int, float)):
+            ttl = min(ttl, expires - time.time())
+        if ttl > 0:
+            self._cache.set(self._signature(token), (token, payload), ttl=ttl)
+
+    def clear(self) -> None:
+        """Forget every token."""
+        self._cache.clear()
+
+
+def create_principal_cache(backend: str = settings.auth_cache_backend):
+    """Create the principal cache configured by ``AUTH_CACHE_BACKEND``.
+
+    Args:
+        backend: "memory" or "redis"
+
+    Returns:
+        Principal cache instance
+    """
+    if backend == "redis":
+        return RedisPrincipalCache()
+    return InProcessPrincipalCache()
+
+
+# Global cache instances
+principal_cache = create_principal_cache()
+token_cache = TokenCache()
+
+
+# --- Invalidate principals when users change ---
+
+_CHANGED_USERS_KEY = "principal_cache_changed_users"
+_STALE_KEY = "principal_cache_stale"
+_PRINCIPAL_ATTRIBUTES = ("is_active", "subscription_tier", "email", "name")
+
+
+def _track_user_changes(session: Session, flush_context) -> None:
+    """Record users whose cached principal a flush made stale."""
+    changed = None
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        attributes = inspect(obj).attrs
+        if any(attributes[name].history.has_changes() for name in _PRINCIPAL_ATTRIBUTES):
+            if changed is None:
+                changed = session.info.setdefault(_CHANGED_USERS_KEY, set())
+            changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            if changed is None:
+                changed = session.info.setdefault(_CHANGED_USERS_KEY, set())
+            changed.add(obj.id)
+
+
+def _track_user_bulk(update_context) -> None:
+    """Bulk query updates/deletes of users bypass the unit of work; clear all."""
+    mapper = update_context.mapper
+    if mapper is not None and mapper.class_ is User:
+        update_context.session.info[_STALE_KEY] = True
+
+
+def _invalidate_committed(session: Session) -> None:
+    """Drop stale principals once the change is committed."""
+    changed = session.info.pop(_CHANGED_USERS_KEY, None)
+    if session.info.pop(_STALE_KEY, False):
+        principal_cache.clear()
+        return
+    for user_id in changed or ():
+        principal_cache.invalidate(user_id)
+
+
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS_KEY, None)
+    session.info.pop(_STALE_KEY, None)
+
+
+event.listen(Session, "after_flush", _track_user_changes)
+event.listen(Session, "after_bulk_update", _track_user_bulk)
+event.listen(Session, "after_bulk_delete", _track_user_bulk)
+event.listen(Session, "after_commit", _invalidate_committed)
+event.listen(Session, "after_rollback", _discard_changes)
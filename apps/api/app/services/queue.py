@@ -0,0 +1,389 @@
+"""Job queue for background scan processing.
+
+All backends share one small interface:
+
+    enqueue(scan_id) -> job id
+    claim(worker_id) -> Job | None    (hides the job for the visibility timeout)
+    complete(job) -> bool              (False if the claim was lost)
+    fail(job, error) -> bool | None    (True if the job will be retried,
+                                        None if the claim was lost)
+
+A claimed job that is neither completed nor failed before its visibility
+timeout expires (e.g. the worker crashed) becomes claimable again. Every
+claim increments the job's attempt count, and ``complete``/``fail`` only
+apply while the count still matches the caller's claim, so a worker whose
+claim expired cannot finish or requeue a job another worker reclaimed.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.job import ScanJob
+from app.settings import settings
+
+try:
+    import redis
+except ImportError:  # Optional dependency
+    redis = None
+
+
+@dataclass
+class Job:
+    """A claimed scan processing job."""
+    id: str
+    scan_id: str
+    attempts: int  # Including the current attempt
+
+
+class DatabaseJobQueue:
+    """Job queue stored in the ``scan_jobs`` table of the application database.
+
+    Claims use an optimistic ``UPDATE ... WHERE visible_at = :seen`` so that
+    concurrent workers (threads or processes) never claim the same job.
+    """
+
+    def __init__(
+        self,
+        visibility_timeout: int = settings.scan_job_visibility_timeout_seconds,
+        max_attempts: int = settings.scan_job_max_attempts,
+        retry_delay: int = settings.scan_job_retry_delay_seconds,
+    ):
+        """Initialize database job queue.
+
+        Args:
+            visibility_timeout: Seconds a claimed job stays hidden
+            max_attempts: Attempts before a job is marked failed
+            retry_delay: Base delay in seconds before a failed job is retried
+        """
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def enqueue(self, scan_id: str) -> str:
+        """Queue a scan for processing.
+
+        Args:
+            scan_id: Scan identifier
+
+        Returns:
+            Job identifier
+        """
+        db = SessionLocal()
+        try:
+            job = ScanJob(id=str(uuid.uuid4()), scan_id=scan_id, visible_at=datetime.utcnow())
+            db.add(job)
+            db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """Claim the next visible job.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+
+        Returns:
+            Claimed job, or None if no job is available
+        """
+        db = SessionLocal()
+        try:
+            for _ in range(5):  # Retry when another worker wins the race
+                now = datetime.utcnow()
+                candidate = (
+                    db.query(ScanJob.id, ScanJob.scan_id, ScanJob.attempts, ScanJob.visible_at)
+                    .filter(
+                        ScanJob.status.in_(("queued", "running")),
+                        ScanJob.visible_at <= now,
+                    )
+                    .order_by(ScanJob.visible_at)
+                    .first()
+                )
+                if candidate is None:
+                    return None
+
+                job_id, scan_id, attempts, seen_visible_at = candidate
+                result = db.execute(
+                    update(ScanJob)
+                    .where(ScanJob.id == job_id, ScanJob.visible_at == seen_visible_at)
+                    .values(
+                        status="running",
+                        attempts=attempts + 1,
+                        locked_by=worker_id,
+                        visible_at=now + timedelta(seconds=self.visibility_timeout),
+                    )
+                )
+                db.commit()
+                if result.rowcount == 1:
+                    return Job(id=job_id, scan_id=scan_id, attempts=attempts + 1)
+            return None
+        finally:
+            db.close()
+
+    def complete(self, job: Job) -> bool:
+        """Mark a job as done.
+
+        Args:
+            job: Claimed job
+
+        Returns:
+            False if the claim expired and the job was claimed again
+        """
+        return self._finish(job, status="done")
+
+    def fail(self, job: Job, error: str) -> Optional[bool]:
+        """Record a failed attempt, scheduling a retry if attempts remain.
+
+        Args:
+            job: Claimed job
+            error: Error message
+
+        Returns:
+            True if the job will be retried, None if the claim expired and
+            the job was claimed again
+        """
+        if job.attempts < self.max_attempts:
+            finished = self._finish(
+                job,
+                status="queued",
+                last_error=error,
+                visible_at=datetime.utcnow() + timedelta(seconds=self.retry_delay * job.attempts),
+            )
+            return True if finished else None
+        return False if self._finish(job, status="failed", last_error=error) else None
+
+    def _finish(self, job: Job, **values) -> bool:
+        """Update a job if ``job`` is still its latest claim."""
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(ScanJob)
+                .where(
+                    ScanJob.id == job.id,
+                    ScanJob.status == "running",
+                    ScanJob.attempts == job.attempts,
+                )
+                .values(locked_by=None, **values)
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+
+class InMemoryJobQueue:
+    """Process-local job queue (tests and single-process development).
+
+    Only workers running inside the same process (embedded mode) can see
+    the jobs.
+    """
+
+    def __init__(
+        self,
+        visibility_timeout: int = settings.scan_job_visibility_timeout_seconds,
+        max_attempts: int = settings.scan_job_max_attempts,
+        retry_delay: int = settings.scan_job_retry_delay_seconds,
+    ):
+        """Initialize in-memory job queue."""
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._ready: deque = deque()
+        self._delayed: Dict[str, tuple] = {}  # job id -> (visible_at, job)
+        self._lock = threading.Lock()
+
+    def enqueue(self, scan_id: str) -> str:
+        """Queue a scan for processing."""
+        job = Job(id=str(uuid.uuid4()), scan_id=scan_id, attempts=0)
+        with self._lock:
+            self._ready.append(job)
+        return job.id
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """Claim the next visible job."""
+        now = time.monotonic()
+        with self._lock:
+            for job_id, (visible_at, job) in list(self._delayed.items()):
+                if visible_at <= now:
+                    del self._delayed[job_id]
+                    self._ready.append(job)
+            if not self._ready:
+                return None
+            job = self._ready.popleft()
+            job = Job(id=job.id, scan_id=job.scan_id, attempts=job.attempts + 1)
+            self._delayed[job.id] = (now + self.visibility_timeout, job)
+            return job
+
+    def complete(self, job: Job) -> bool:
+        """Mark a job as done (False if the claim was lost)."""
+        with self._lock:
+            return self._release_locked(job)
+
+    def fail(self, job: Job, error: str) -> Optional[bool]:
+        """Record a failed attempt, scheduling a retry if attempts remain."""
+        with self._lock:
+            if not self._release_locked(job):
+                return None
+            if job.attempts < self.max_attempts:
+                self._delayed[job.id] = (time.monotonic() + self.retry_delay * job.attempts, job)
+                return True
+            return False
+
+    def _release_locked(self, job: Job) -> bool:
+        """Drop ``job`` if it is still this claim; caller holds the lock."""
+        entry = self._delayed.get(job.id)
+        if entry is not None and entry[1].attempts == job.attempts:
+            del self._delayed[job.id]
+            return True
+        # Claim expired but the job was not claimed again yet
+        for queued in self._ready:
+            if queued.id == job.id and queued.attempts == job.attempts:
+                self._ready.remove(queued)
+                return True
+        return False
+
+
+class RedisJobQueue:
+    """Job queue in Redis (shared by API and worker processes across hosts).
+
+    Ready jobs live in a list; claimed and delayed jobs live in a sorted set
+    scored by the time they become visible again.
+    """
+
+    # Move due jobs back to the ready list, then pop one and hide it
+    _CLAIM_SCRIPT = """
+    local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+    for _, job_id in ipairs(due) do
+        redis.call('ZREM', KEYS[2], job_id)
+        redis.call('RPUSH', KEYS[1], job_id)
+    end
+    local job_id = redis.call('LPOP', KEYS[1])
+    if not job_id then
+        return nil
+    end
+    redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+    local attempts = redis.call('HINCRBY', KEYS[3] .. job_id, 'attempts', 1)
+    return {job_id, redis.call('HGET', KEYS[3] .. job_id, 'scan_id'), attempts}
+    """
+
+    # Finish a job only if its attempt count still matches the caller's claim
+    _COMPLETE_SCRIPT = """
+    if redis.call('HGET', KEYS[3] .. ARGV[1], 'attempts') ~= ARGV[2] then
+        return 0
+    end
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    redis.call('LREM', KEYS[1], 0, ARGV[1])
+    redis.call('DEL', KEYS[3] .. ARGV[1])
+    return 1
+    """
+
+    _RETRY_SCRIPT = """
+    if redis.call('HGET', KEYS[3] .. ARGV[1], 'attempts') ~= ARGV[2] then
+        return 0
+    end
+    redis.call('HSET', KEYS[3] .. ARGV[1], 'last_error', ARGV[4])
+    redis.call('LREM', KEYS[1], 0, ARGV[1])
+    redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+    return 1
+    """
+
+    def __init__(
+        self,
+        url: str = settings.redis_url,
+        prefix: str = "splay:scan_jobs",
+        visibility_timeout: int = settings.scan_job_visibility_timeout_seconds,
+        max_attempts: int = settings.scan_job_max_attempts,
+        retry_delay: int = settings.scan_job_retry_delay_seconds,
+        client=None,
+    ):
+        """Initialize Redis job queue.
+
+        Args:
+            url: Redis connection URL
+            prefix: Key prefix
+            visibility_timeout: Seconds a claimed job stays hidden
+            max_attempts: Attempts before a job is dropped as failed
+            retry_delay: Base delay in seconds before a failed job is retried
+            client: Existing Redis client (overrides ``url``)
+        """
+        if client is None:
+            if redis is None:
+                raise RuntimeError(
+                    "Redis job queue requires the optional 'redis' package. "
+                    "Install it or use SCAN_QUEUE_BACKEND=database."
+                )
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+        self.ready_key = f"{prefix}:ready"
+        self.delayed_key = f"{prefix}:delayed"
+        self.job_key_prefix = f"{prefix}:job:"
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._claim = self.client.register_script(self._CLAIM_SCRIPT)
+        self._complete = self.client.register_script(self._COMPLETE_SCRIPT)
+        self._retry = self.client.register_script(self._RETRY_SCRIPT)
+
+    def enqueue(self, scan_id: str) -> str:
+        """Queue a scan for processing."""
+        job_id = str(uuid.uuid4())
+        pipe = self.client.pipeline()
+        pipe.hset(self.job_key_prefix + job_id, mapping={"scan_id": scan_id, "attempts": 0})
+        pipe.rpush(self.ready_key, job_id)
+        pipe.execute()
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """Claim the next visible job."""
+        now = time.time()
+        result = self._claim(
+            keys=self._keys(),
+            args=[now, now + self.visibility_timeout],
+        )
+        if not result:
+            return None
+        job_id, scan_id, attempts = result
+        return Job(id=job_id, scan_id=scan_id, attempts=int(attempts))
+
+    def _keys(self) -> list:
+        return [self.ready_key, self.delayed_key, self.job_key_prefix]
+
+    def complete(self, job: Job) -> bool:
+        """Mark a job as done (False if the claim was lost)."""
+        return bool(self._complete(keys=self._keys(), args=[job.id, job.attempts]))
+
+    def fail(self, job: Job, error: str) -> Optional[bool]:
+        """Record a failed attempt, scheduling a retry if attempts remain."""
+        if job.attempts < self.max_attempts:
+            retry_at = time.time() + self.retry_delay * job.attempts
+            if not self._retry(keys=self._keys(), args=[job.id, job.attempts, retry_at, error]):
+                return None
+            return True
+        return False if self.complete(job) else None
+
+
+def create_job_queue(backend: str = settings.scan_queue_backend):
+    """Create the job queue configured by ``SCAN_QUEUE_BACKEND``.
+
+    Args:
+        backend: "database", "redis" or "memory"
+
+    Returns:
+        Job queue instance
+    """
+    if backend == "redis":
+        return RedisJobQueue()
+    if backend == "memory":
+        return InMemoryJobQueue()
+    return DatabaseJobQueue()
+
+
+# Global job queue instance
+job_queue = create_job_queue()
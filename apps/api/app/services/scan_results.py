@@ -0,0 +1,379 @@
+"""Reading and writing scan results.
+
+``load_scan_detail`` builds the full scan response (scan, detected items,
+ranked product matches) in a fixed number of queries regardless of how
+many items or matches the scan has, selecting only the columns the
+response needs (no product embeddings or JSON blobs). Product fields come
+from the in-process catalog cache.
+
+``load_scan_history`` pages through a user's scans with keyset pagination
+on ``(created_at, id)``, so every page is one index range scan no matter
+how deep it is.
+
+``insert_scan_results`` writes all items and matches of a scan with two
+executemany INSERTs, bypassing the ORM unit of work.
+
+Completed scans never change, so their response is serialized to JSON
+bytes once when the scan completes (``store_scan_response``, kept in
+``scans.response_json``). ``load_serialized_scan`` serves those bytes with
+a strong ETag, from a bounded in-process LRU cache when possible (the
+cache skips reading and hashing the body, not the query).
+"""
+import base64
+import binascii
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import orjson
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.scan import DetectedItem, ItemMatch, Scan
+from app.schemas.scan import (
+    DetectedItemResponse,
+    ProductMatchResponse,
+    ScanListItemResponse,
+    ScanListResponse,
+    ScanResponse,
+)
+from app.services.cache import TTLCache
+from app.services.catalog_cache import catalog_cache
+from app.settings import settings
+
+# Queries issued by load_scan_detail for an existing scan (scan, items, matches)
+# when the catalog cache holds its products; a cold cache adds at most two
+# (catalog version, missing products)
+SCAN_DETAIL_QUERY_COUNT = 3
+
+
+def load_scan_detail(db: Session, scan_id: str) -> Optional[ScanResponse]:
+    """Load a scan with its items and matches as a response DTO.
+
+    Args:
+        db: Database session
+        scan_id: Scan identifier
+
+    Returns:
+        ScanResponse, or None if the scan does not exist
+    """
+    scan = db.execute(
+        select(
+            Scan.id,
+            Scan.user_id,
+            Scan.image_url,
+            Scan.thumbnail_url,
+            Scan.status,
+            Scan.processing_time_ms,
+            Scan.error_message,
+            Scan.created_at,
+            Scan.completed_at,
+        ).where(Scan.id == scan_id)
+    ).first()
+    if scan is None:
+        return None
+
+    items = db.execute(
+        select(
+            DetectedItem.id,
+            DetectedItem.category,
+            DetectedItem.bbox_x,
+            DetectedItem.bbox_y,
+            DetectedItem.bbox_width,
+            DetectedItem.bbox_height,
+            DetectedItem.confidence,
+            DetectedItem.crop_url,
+        ).where(DetectedItem.scan_id == scan_id)
+    ).all()
+
+    matches_by_item = defaultdict(list)
+    if items:
+        rows = db.execute(
+            select(
+                ItemMatch.item_id,
+                ItemMatch.product_id,
+                ItemMatch.similarity_score,
+                ItemMatch.rank,
+                ItemMatch.is_budget_alternative,
+            )
+            .where(ItemMatch.item_id.in_([item.id for item in items]))
+            .order_by(ItemMatch.item_id, ItemMatch.rank)
+        ).all()
+        products = catalog_cache.get_many(db, (row.product_id for row in rows))
+
+        for row in rows:
+            product = products.get(row.product_id)
+            if product is None:
+                continue  # Product deleted since the scan completed
+            matches_by_item[row.item_id].append(ProductMatchResponse(
+                product_id=product.id,
+                name=product.name,
+                brand=product.brand,
+                price=product.price,
+                currency=product.currency,
+                image_url=product.image_url,
+                retailer_name=product.retailer_name,
+                retailer_url=product.retailer_url,
+                affiliate_url=product.affiliate_url,
+                similarity_score=row.similarity_score,
+                rank=row.rank,
+                is_budget_alternative=bool(row.is_budget_alternative),
+            ))
+
+    detected_items = [
+        DetectedItemResponse(
+            item_id=item.id,
+            category=item.category,
+            bbox_x=item.bbox_x,
+            bbox_y=item.bbox_y,
+            bbox_width=item.bbox_width,
+            bbox_height=item.bbox_height,
+            confidence=item.confidence,
+            crop_url=item.crop_url,
+            matches=matches_by_item[item.id],
+        )
+        for item in items
+    ]
+
+    return ScanResponse(
+        scan_id=scan.id,
+        user_id=scan.user_id,
+        image_url=scan.image_url,
+        thumbnail_url=scan.thumbnail_url,
+        status=scan.status,
+        item_count=len(detected_items),
+        detected_items=detected_items,
+        processing_time_ms=scan.processing_time_ms,
+        error_message=scan.error_message,
+        created_at=scan.created_at,
+        updated_at=scan.completed_at or scan.created_at,
+        completed_at=scan.completed_at,
+    )
+
+
+@dataclass(frozen=True)
+class SerializedScan:
+    """A scan detail response ready to send."""
+    user_id: str
+    status: str
+    body: bytes  # JSON
+    etag: str  # Strong ETag (quoted)
+
+
+def serialize_scan_response(response: ScanResponse) -> bytes:
+    """Serialize a scan response to JSON bytes."""
+    return orjson.dumps(response.model_dump())
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def store_scan_response(db: Session, scan: Scan) -> None:
+    """Serialize a completed scan's response onto the scan (in the caller's transaction).
+
+    Call after the scan's items, matches and final fields have been set.
+
+    Args:
+        db: Database session
+        scan: Completed scan
+    """
+    db.flush()
+    scan.response_json = serialize_scan_response(load_scan_detail(db, scan.id))
+
+
+def load_serialized_scan(db: Session, scan_id: str) -> Optional[SerializedScan]:
+    """Load a scan's serialized response, caching completed scans.
+
+    Completed scans are served from ``scans.response_json`` (one query);
+    scans still in progress, and scans completed before responses were
+    stored, are built with ``load_scan_detail``.
+
+    A cache hit still checks by primary key that the scan exists: deletes
+    only invalidate the cache of the process that handled them, so another
+    process may hold the response of a deleted scan.
+
+    Args:
+        db: Database session
+        scan_id: Scan identifier
+
+    Returns:
+        Serialized response, or None if the scan does not exist
+    """
+    cached = scan_response_cache.get(scan_id)
+    if cached is not None:
+        if db.execute(select(Scan.id).where(Scan.id == scan_id)).first() is not None:
+            return cached
+        scan_response_cache.delete(scan_id)
+        return None
+
+    row = db.execute(
+        select(Scan.user_id, Scan.status, Scan.response_json).where(Scan.id == scan_id)
+    ).first()
+    if row is None:
+        return None
+
+    body = row.response_json
+    if body is None:
+        response = load_scan_detail(db, scan_id)
+        if response is None:
+            return None
+        body = serialize_scan_response(response)
+
+    serialized = SerializedScan(
+        user_id=row.user_id,
+        status=row.status,
+        body=bytes(body),
+        etag=compute_etag(body),
+    )
+    if serialized.status == "completed":
+        scan_response_cache.set(scan_id, serialized)
+    return serialized
+
+
+def invalidate_scan_response(scan_id: str) -> None:
+    """Drop a scan's cached response in this process (after it is deleted)."""
+    scan_response_cache.delete(scan_id)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, scan_id: str) -> str:
+    """Encode the position after a scan as an opaque cursor.
+
+    Args:
+        created_at: Scan creation time
+        scan_id: Scan identifier
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([created_at.isoformat(), scan_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor made by ``encode_cursor``.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        (created_at, scan_id) of the last scan on the previous page
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, scan_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), str(scan_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def load_scan_history(
+    db: Session,
+    user_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+) -> ScanListResponse:
+    """Load one page of a user's scans, newest first.
+
+    Uses the ``(user_id, created_at DESC, id DESC)`` index: the page is read
+    by seeking to the cursor position instead of skipping rows, so deep
+    pages cost the same as the first one.
+
+    Args:
+        db: Database session
+        user_id: Scan owner
+        limit: Page size
+        cursor: ``next_cursor`` of the previous page (None for the first page)
+        include_total: Also count all of the user's scans (one extra query
+            that grows with the history size)
+
+    Returns:
+        Page of scans with the cursor for the next page
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    item_count = (
+        select(func.count(DetectedItem.id))
+        .where(DetectedItem.scan_id == Scan.id)
+        .correlate(Scan)
+        .scalar_subquery()
+    )
+    query = (
+        select(Scan.id, Scan.thumbnail_url, Scan.status, Scan.created_at, item_count.label("item_count"))
+        .where(Scan.user_id == user_id)
+        .order_by(Scan.created_at.desc(), Scan.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, scan_id = decode_cursor(cursor)
+        # Seek from the stored timestamp of the cursor's scan: SQLite keeps
+        # timestamps as text, and a bound datetime need not match the stored
+        # format. The decoded value only covers a scan deleted since.
+        anchor = func.coalesce(
+            select(Scan.created_at).where(Scan.id == scan_id).scalar_subquery(),
+            created_at,
+        )
+        query = query.where(tuple_(Scan.created_at, Scan.id) < tuple_(anchor, scan_id))
+
+    rows = db.execute(query).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+
+    total = None
+    if include_total:
+        total = db.execute(select(func.count(Scan.id)).where(Scan.user_id == user_id)).scalar_one()
+
+    return ScanListResponse(
+        scans=[
+            ScanListItemResponse(
+                scan_id=row.id,
+                thumbnail_url=row.thumbnail_url,
+                status=row.status,
+                item_count=row.item_count,
+                created_at=row.created_at,
+            )
+            for row in page
+        ],
+        next_cursor=next_cursor,
+        total=total,
+        limit=limit,
+    )
+
+
+def insert_scan_results(db: Session, items: List[dict], matches: List[dict]) -> None:
+    """Insert detected items and their matches in two statements.
+
+    Runs in the caller's transaction. Rows must carry client-generated
+    ids (so matches can reference their items without a flush), and all
+    rows of a list must have the same keys.
+
+    Args:
+        db: Database session
+        items: ``detected_items`` rows (column name -> value)
+        matches: ``item_matches`` rows (column name -> value)
+    """
+    if items:
+        db.execute(insert(DetectedItem.__table__), items)
+    if matches:
+        db.execute(insert(ItemMatch.__table__), matches)
+
+
+# Global cache of completed scan responses (scan id -> SerializedScan); the
+# TTL bounds how long another process may serve a scan deleted elsewhere
+scan_response_cache = TTLCache(
+    settings.scan_response_cache_max_entries,
+    settings.scan_response_cache_ttl_seconds,
+)
@@ -1,20 +1,35 @@
 """Storage service for file uploads."""
-import uuid
+import math
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import BinaryIO
+from typing import List, Optional
 
 from PIL import Image
 
 from app.settings import settings
 
 
+@dataclass
+class StoredUpload:
+    """A content-addressed upload."""
+    url: str
+    content_hash: str  # SHA-256 hex digest
+    size: int
+
+
 class StorageService:
     """Local file storage service."""
 
-    def __init__(self):
-        """Initialize storage service."""
-        self.storage_path = settings.storage_dir
+    def __init__(self, storage_path: Optional[Path] = None):
+        """Initialize storage service.
+
+        Args:
+            storage_path: Storage root (defaults to settings)
+        """
+        self.storage_path = Path(storage_path) if storage_path else settings.storage_dir
         self.uploads_path = self.storage_path / "uploads"
         self.thumbnails_path = self.storage_path / "thumbnails"
         self.crops_path = self.storage_path / "crops"
@@ -24,35 +39,55 @@ class StorageService:
         self.thumbnails_path.mkdir(parents=True, exist_ok=True)
         self.crops_path.mkdir(parents=True, exist_ok=True)
 
-    def save_upload(self, file: BinaryIO, filename: str) -> tuple[str, str]:
-        """Save uploaded image and create thumbnail.
+        self._encode_pool: Optional[ThreadPoolExecutor] = None
+
+    def content_addressed(self, content_hash: str, size: int, filename: str) -> StoredUpload:
+        """Content-addressed location of an upload (nothing is written).
 
         Args:
-            file: File object to save
-            filename: Original filename
+            content_hash: SHA-256 hex digest of the file
+            size: File size in bytes
+            filename: Original filename (for the extension)
 
         Returns:
-            Tuple of (image_url, thumbnail_url)
+            StoredUpload with URL, content hash and size
         """
-        # Generate unique filename
-        file_id = str(uuid.uuid4())
-        ext = Path(filename).suffix or ".jpg"
-        new_filename = f"{file_id}{ext}"
-
-        # Save original image
-        image_path = self.uploads_path / new_filename
-        with open(image_path, "wb") as f:
-            shutil.copyfileobj(file, f)
-
-        # Create thumbnail
-        thumbnail_path = self.thumbnails_path / new_filename
-        self._create_thumbnail(image_path, thumbnail_path)
+        ext = Path(filename).suffix.lower() or ".jpg"
+        return StoredUpload(url=f"/storage/uploads/{content_hash}{ext}", content_hash=content_hash, size=size)
+
+    def store_received(self, temp_path: Path, upload: StoredUpload) -> None:
+        """Atomically move an already hashed temporary file to its content-addressed location.
+
+        Args:
+            temp_path: Temporary file inside ``uploads_path``
+            upload: Location from ``content_addressed``
+        """
+        os.replace(temp_path, self.get_file_path(upload.url))
+
+    def delete_file(self, url: str) -> None:
+        """Delete a stored file if it exists.
+
+        Args:
+            url: Storage URL
+        """
+        try:
+            self.get_file_path(url).unlink(missing_ok=True)
+        except Exception as e:
+            print(f"Error deleting file {url}: {e}")
 
-        # Return relative URLs
-        image_url = f"/storage/uploads/{new_filename}"
-        thumbnail_url = f"/storage/thumbnails/{new_filename}"
+    def create_thumbnail(self, image_url: str) -> str:
+        """Create the thumbnail for a saved upload.
 
-        return image_url, thumbnail_url
+        Args:
+            image_url: URL of a stored upload
+
+        Returns:
+            URL of the thumbnail
+        """
+        image_path = self.get_file_path(image_url)
+        thumbnail_path = self.thumbnails_path / image_path.name
+        self._create_thumbnail(image_path, thumbnail_path)
+        return f"/storage/thumbnails/{image_path.name}"
 
     def _create_thumbnail(self, image_path: Path, thumbnail_path: Path, size: tuple = (400, 400)):
         """Create thumbnail from image.
@@ -122,6 +157,117 @@ class StorageService:
             print(f"Error creating crop: {e}")
             return ""
 
+    def load_image(self, image_url: str, max_side: Optional[int] = settings.scan_image_max_side) -> Image.Image:
+        """Decode a stored image into memory once.
+
+        JPEGs larger than ``max_side`` are decoded in draft mode at the
+        smallest DCT scale (1/2, 1/4 or 1/8) that still covers ``max_side``,
+        which is much cheaper than a full decode.
+
+        Args:
+            image_url: Storage URL of the image
+            max_side: Longest side needed downstream (None for full size)
+
+        Returns:
+            Decoded image
+        """
+        with Image.open(self.get_file_path(image_url)) as img:
+            width, height = img.size
+            if max_side and max(width, height) > max_side:
+                scale = max_side / max(width, height)
+                img.draft("RGB", (math.ceil(width * scale), math.ceil(height * scale)))
+            img.load()
+
+            if img.mode in ("RGBA", "P"):
+                return img.convert("RGB")
+            return img
+
+    def render_scan_images(
+        self,
+        image_url: str,
+        crops: List[tuple],
+        thumbnail_size: tuple = (400, 400),
+    ) -> tuple[str, List[str]]:
+        """Create the thumbnail and all item crops from a single decode.
+
+        The image is decoded once (see ``load_image``); the thumbnail and
+        every crop are cut from that in-memory image and JPEG-encoded in
+        parallel (Pillow releases the GIL while encoding).
+
+        Args:
+            image_url: Storage URL of the uploaded image
+            crops: List of (bbox, item_id), bbox normalized (x, y, width, height)
+            thumbnail_size: Thumbnail bounding size
+
+        Returns:
+            Tuple of (thumbnail_url, crop URLs in ``crops`` order; "" for failed crops)
+        """
+        image_path = self.get_file_path(image_url)
+        thumbnail_path = self.thumbnails_path / image_path.name
+        thumbnail_url = f"/storage/thumbnails/{image_path.name}"
+
+        try:
+            image = self.load_image(image_url)
+        except Exception as e:
+            print(f"Error decoding image: {e}")
+            shutil.copy(image_path, thumbnail_path)
+            return thumbnail_url, ["" for _ in crops]
+
+        pool = self._get_encode_pool()
+        thumbnail_future = pool.submit(self._write_thumbnail, image, thumbnail_path, thumbnail_size)
+        crop_futures = [
+            pool.submit(self._write_crop, image, bbox, item_id)
+            for bbox, item_id in crops
+        ]
+
+        try:
+            thumbnail_future.result()
+        except Exception as e:
+            print(f"Error creating thumbnail: {e}")
+            # Copy original as fallback
+            shutil.copy(image_path, thumbnail_path)
+
+        crop_urls = []
+        for future in crop_futures:
+            try:
+                crop_urls.append(future.result())
+            except Exception as e:
+                print(f"Error creating crop: {e}")
+                crop_urls.append("")
+
+        return thumbnail_url, crop_urls
+
+    def _write_thumbnail(self, image: Image.Image, thumbnail_path: Path, size: tuple) -> None:
+        """Resize a decoded image into a JPEG thumbnail."""
+        thumbnail = image.copy()
+        thumbnail.thumbnail(size, Image.Resampling.LANCZOS)
+        thumbnail.save(thumbnail_path, "JPEG", quality=85)
+
+    def _write_crop(self, image: Image.Image, bbox: tuple, item_id: str) -> str:
+        """Cut a normalized bbox out of a decoded image and save it as JPEG."""
+        x, y, w, h = bbox
+        width, height = image.size
+
+        cropped = image.crop((
+            int(x * width),
+            int(y * height),
+            int((x + w) * width),
+            int((y + h) * height),
+        ))
+
+        crop_filename = f"{item_id}.jpg"
+        cropped.save(self.crops_path / crop_filename, "JPEG", quality=90)
+        return f"/storage/crops/{crop_filename}"
+
+    def _get_encode_pool(self) -> ThreadPoolExecutor:
+        """Create the JPEG encode pool on first use."""
+        if self._encode_pool is None:
+            self._encode_pool = ThreadPoolExecutor(
+                max_workers=settings.image_encode_threads,
+                thread_name_prefix="image-encode",
+            )
+        return self._encode_pool
+
     def get_file_path(self, url: str) -> Path:
         """Convert storage URL to filesystem path.
 
@@ -0,0 +1,191 @@
+"""Streaming multipart upload receiver.
+
+Reads ``multipart/form-data`` bodies chunk by chunk from
+``request.stream()`` with python-multipart's push parser, writing the file
+part straight to a temporary file while hashing it and counting bytes.
+Memory use per upload is bounded by the chunk size, and an oversized
+upload is rejected as soon as the limit is crossed rather than after it
+has been read in full.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+# Allowance for multipart boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class InvalidUploadError(ValueError):
+    """Raised when the request body is not a usable upload."""
+
+
+class UploadTooLargeError(InvalidUploadError):
+    """Raised when the uploaded file exceeds the size limit."""
+
+
+@dataclass
+class ReceivedUpload:
+    """A file part received into a temporary file."""
+    filename: str
+    content_type: str
+    temp_path: Path
+    content_hash: str  # SHA-256 hex digest
+    size: int
+
+    def discard(self) -> None:
+        """Remove the temporary file if it was not moved into place."""
+        self.temp_path.unlink(missing_ok=True)
+
+
+class _FilePartReceiver:
+    """python-multipart callbacks that stream one file field to disk."""
+
+    def __init__(
+        self,
+        field_name: str,
+        max_size: int,
+        directory: Path,
+        validate_part: Optional[Callable[[str, str], None]],
+    ):
+        self.field_name = field_name
+        self.max_size = max_size
+        self.directory = directory
+        self.validate_part = validate_part
+
+        self.upload: Optional[ReceivedUpload] = None
+        self._file = None
+        self._digest = None
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._receiving = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        if name != self.field_name or b"filename" not in options or self.upload is not None:
+            return  # Other form fields are ignored
+
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1")
+        if self.validate_part is not None:
+            self.validate_part(filename, content_type)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self._digest = hashlib.sha256()
+        self.upload = ReceivedUpload(
+            filename=filename,
+            content_type=content_type,
+            temp_path=Path(temp_path),
+            content_hash="",
+            size=0,
+        )
+        self._receiving = True
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._receiving:
+            return
+        self.upload.size += end - start
+        if self.upload.size > self.max_size:
+            raise UploadTooLargeError(f"File exceeds {self.max_size} bytes")
+        chunk = data[start:end]
+        self._digest.update(chunk)
+        # Single-chunk writes land in the page cache; not worth a thread hop
+        self._file.write(chunk)
+
+    def on_part_end(self) -> None:
+        if self._receiving:
+            self._receiving = False
+            self._file.close()
+            self._file = None
+            self.upload.content_hash = self._digest.hexdigest()
+
+    def abort(self) -> None:
+        """Close and remove a partially received file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.upload is not None:
+            self.upload.discard()
+
+
+async def receive_upload(
+    request: Request,
+    field_name: str,
+    max_size: int,
+    directory: Path,
+    validate_part: Optional[Callable[[str, str], None]] = None,
+) -> ReceivedUpload:
+    """Stream a file field of a multipart request into a temporary file.
+
+    Args:
+        request: Incoming request
+        field_name: Form field holding the file
+        max_size: Maximum file size in bytes
+        directory: Directory for the temporary file (same filesystem as its
+            final location, so it can be moved into place atomically)
+        validate_part: Called with (filename, content type) before any file
+            data is read; may raise to reject the upload early
+
+    Returns:
+        The received upload (the caller moves or discards the temp file)
+
+    Raises:
+        UploadTooLargeError: If the file exceeds ``max_size``
+        InvalidUploadError: If the body is not multipart or has no file
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise InvalidUploadError("Expected a multipart/form-data body")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise UploadTooLargeError(f"File exceeds {max_size} bytes")
+
+    receiver = _FilePartReceiver(field_name, max_size, directory, validate_part)
+    parser = MultipartParser(boundary, receiver.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except BaseException:
+        receiver.abort()
+        raise
+
+    if receiver.upload is None or receiver._receiving:
+        receiver.abort()
+        raise InvalidUploadError(f"Form field '{field_name}' with a file is required")
+    return receiver.upload
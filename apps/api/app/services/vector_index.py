@@ -0,0 +1,852 @@
+"""In-memory vector index for product matching."""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.models.catalog import (
+    CatalogChange,
+    get_catalog_version,
+    get_change_log_pruned_seq,
+    get_latest_change_seq,
+    prune_change_log,
+)
+from app.models.product import Product
+from app.services.ann import HNSWIndex, IVFIndex, top_k
+from app.services.index_snapshots import (
+    SnapshotManifest,
+    current_snapshot,
+    prune_snapshots,
+    publish_snapshot,
+)
+from app.settings import settings
+
+# Changed products re-read per query when replaying the change log
+REPLAY_CHUNK_SIZE = 500
+# Rebuild instead of replaying when more of the snapshot than this changed
+REPLAY_MAX_CHANGED_RATIO = 0.5
+
+
+class MatchCandidates(NamedTuple):
+    """Candidate products for one query, as parallel arrays."""
+    product_ids: np.ndarray  # object array of product ids
+    similarities: np.ndarray  # float32 cosine similarities
+    prices: np.ndarray  # float32 prices (NaN if unknown)
+
+
+EMPTY_CANDIDATES = MatchCandidates(
+    np.empty(0, dtype=object), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+)
+
+
+def _embedding_to_array(embedding) -> Optional[np.ndarray]:
+    """Convert a product embedding to a float32 array.
+
+    Args:
+        embedding: Stored embedding (ndarray from the Embedding column, or a
+            float sequence on objects not yet reloaded)
+
+    Returns:
+        Float32 vector, or None if the product has no embedding
+    """
+    if embedding is None or len(embedding) == 0:
+        return None
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length (zero rows are left as zeros)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class ExactIndex:
+    """Brute-force backend: one contiguous embedding matrix per category.
+
+    Rows of the matrix are unit-length float32 embeddings, ``ids[i]`` is
+    the product id for row ``i`` and ``prices[i]`` its price (used by
+    ranking). The (ids, matrix, prices) triple is replaced wholesale on
+    update, so searches never see a half-applied change.
+    """
+
+    kind = "exact"
+
+    def __init__(
+        self,
+        ids: Optional[np.ndarray] = None,
+        matrix: Optional[np.ndarray] = None,
+        prices: Optional[np.ndarray] = None,
+    ):
+        """Initialize exact index.
+
+        Args:
+            ids: Product id array
+            matrix: Unit-length float32 embeddings, one row per id
+            prices: Float32 price per id (NaN if unknown)
+        """
+        if ids is None:
+            ids = np.empty(0, dtype=object)
+        if prices is None:
+            prices = np.full(len(ids), np.nan, dtype=np.float32)
+        self._data: Tuple[np.ndarray, Optional[np.ndarray], np.ndarray] = (ids, matrix, prices)
+
+    def product_ids(self) -> List[str]:
+        """List the indexed product ids."""
+        return list(self._data[0])
+
+    def __len__(self) -> int:
+        """Number of indexed products."""
+        return len(self._data[0])
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray, prices: Optional[Sequence[float]] = None) -> None:
+        """Insert (or replace) vectors.
+
+        Args:
+            ids: Product ids
+            vectors: Unit-length float32 vectors (len(ids), dim)
+            prices: Product prices (NaN if omitted)
+        """
+        if len(ids) == 0:
+            return
+        self.remove(ids)
+        current_ids, matrix, current_prices = self._data
+        new_ids = np.asarray(ids, dtype=object)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if prices is None:
+            new_prices = np.full(len(ids), np.nan, dtype=np.float32)
+        else:
+            new_prices = np.asarray(prices, dtype=np.float32)
+        self._data = (
+            np.concatenate([current_ids, new_ids]),
+            np.ascontiguousarray(vectors if matrix is None else np.vstack([matrix, vectors])),
+            np.concatenate([current_prices, new_prices]),
+        )
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Remove vectors by id (unknown ids are ignored).
+
+        Args:
+            ids: Product ids
+        """
+        current_ids, matrix, prices = self._data
+        if not len(current_ids):
+            return
+        drop = set(ids)
+        keep = np.fromiter(
+            (pid not in drop for pid in current_ids), dtype=bool, count=len(current_ids)
+        )
+        if not keep.all():
+            self._data = (current_ids[keep], np.ascontiguousarray(matrix[keep]), prices[keep])
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Return the top-k (product_id, similarity) pairs for a unit query.
+
+        Args:
+            query: Unit-length float32 query vector
+            k: Number of results to return
+
+        Returns:
+            List of (product_id, similarity) sorted by similarity descending
+        """
+        return self.search_batch(query[np.newaxis, :], k)[0]
+
+    def search_batch(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        """Top-k search for several queries with one matrix-matrix product.
+
+        Args:
+            queries: Unit-length float32 query matrix (m, dim)
+            k: Number of results per query
+
+        Returns:
+            One (product_id, similarity) list per query
+        """
+        ids, matrix, _ = self._data
+        if not len(ids):
+            return [[] for _ in range(len(queries))]
+        scores = matrix @ queries.T
+        return [
+            [(ids[i], float(column[i])) for i in top_k(column, k)]
+            for column in scores.T
+        ]
+
+    def candidates_batch(self, queries: np.ndarray) -> List[MatchCandidates]:
+        """Score every indexed product against several queries.
+
+        Args:
+            queries: Unit-length float32 query matrix (m, dim)
+
+        Returns:
+            One MatchCandidates covering the whole index per query
+        """
+        ids, matrix, prices = self._data
+        if not len(ids):
+            return [EMPTY_CANDIDATES for _ in range(len(queries))]
+        scores = matrix @ queries.T
+        return [MatchCandidates(ids, column, prices) for column in scores.T]
+
+    def save(self, path: Path) -> None:
+        """Persist the index to a directory.
+
+        Args:
+            path: Target directory (created if missing)
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        ids, matrix, prices = self._data
+        np.save(path / "ids.npy", ids.astype(str))
+        np.save(path / "matrix.npy", matrix if matrix is not None else np.empty((0, 0), np.float32))
+        np.save(path / "prices.npy", prices)
+        (path / "meta.json").write_text(json.dumps({"kind": self.kind}))
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: Optional[str] = None) -> "ExactIndex":
+        """Load an index saved with ``save``.
+
+        Args:
+            path: Index directory
+            mmap_mode: ``np.load`` mode for the matrix and prices ("r" maps
+                the files read-only; updates replace them with copies)
+
+        Returns:
+            Loaded ExactIndex
+        """
+        path = Path(path)
+        ids = np.load(path / "ids.npy").astype(object)
+        if not len(ids):
+            return cls()
+        matrix = np.load(path / "matrix.npy", mmap_mode=mmap_mode)
+        prices = np.load(path / "prices.npy", mmap_mode=mmap_mode) if (path / "prices.npy").exists() else None
+        return cls(ids, matrix, prices)
+
+
+BACKENDS = {
+    ExactIndex.kind: ExactIndex,
+    IVFIndex.kind: IVFIndex,
+    HNSWIndex.kind: HNSWIndex,
+}
+
+
+class VectorIndex:
+    """Process-wide index of in-stock product embeddings, grouped by category.
+
+    Each category gets its own backend. Categories smaller than
+    ``vector_index_ann_threshold`` use exact search over a contiguous
+    pre-normalized float32 matrix (one matrix-vector product plus
+    ``argpartition`` top-k); larger ones use the configured approximate
+    backend (``ivf`` or ``hnsw``) so lookups stay sub-linear.
+
+    The index remembers the catalog version and the change log position
+    (see ``app.models.catalog``) it reflects. ``ensure_built`` re-reads the
+    version at most once per ``version_check_interval`` and, when it moved,
+    replays the products logged since, so product writes of other
+    processes (API workers, scan workers, catalog imports) are picked up
+    like the ones committed in this process.
+    """
+
+    def __init__(
+        self,
+        backend: str = settings.vector_index_backend,
+        ann_threshold: int = settings.vector_index_ann_threshold,
+        version_check_interval: float = settings.vector_index_version_check_seconds,
+    ):
+        """Initialize an empty, unbuilt index.
+
+        Args:
+            backend: Backend for large categories ("exact", "ivf" or "hnsw")
+            ann_threshold: Minimum category size for the approximate backend
+            version_check_interval: Seconds between catalog version reads
+        """
+        self.backend = backend
+        self.ann_threshold = ann_threshold
+        self.version_check_interval = version_check_interval
+        self._categories: Dict[str, object] = {}
+        self._product_categories: Dict[str, str] = {}
+        self._prices: Dict[str, float] = {}  # product id -> price, for approximate candidate pools
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # One refresh at a time
+        self._built = False
+        self._version: Optional[int] = None  # Catalog version the index reflects
+        self._change_seq = 0  # Last change log entry the index reflects
+        self._version_checked_at = float("-inf")
+
+    @property
+    def is_built(self) -> bool:
+        """Whether the index reflects the current catalog."""
+        return self._built
+
+    def _create_backend(self, ids: Sequence[str], vectors: np.ndarray, prices: Sequence[float]):
+        """Create and fill the backend for one category.
+
+        Args:
+            ids: Product ids
+            vectors: Unit-length float32 vectors
+            prices: Product prices
+
+        Returns:
+            Backend instance holding the given vectors
+        """
+        if self.backend == "ivf" and len(ids) >= self.ann_threshold:
+            index = IVFIndex.train(vectors, nlist=settings.ivf_nlist, nprobe=settings.ivf_nprobe)
+        elif self.backend == "hnsw" and len(ids) >= self.ann_threshold:
+            index = HNSWIndex(
+                vectors.shape[1],
+                capacity=len(ids),
+                m=settings.hnsw_m,
+                ef_construction=settings.hnsw_ef_construction,
+                ef_search=settings.hnsw_ef_search,
+            )
+        else:
+            index = ExactIndex()
+            index.add(ids, vectors, prices)
+            return index
+        index.add(ids, vectors)
+        return index
+
+    def build(self, db: Session) -> None:
+        """(Re)build the whole index from the products table.
+
+        Args:
+            db: Database session
+        """
+        # Read the log position and version first: products committed
+        # meanwhile are replayed again on the next refresh, which is harmless
+        change_seq = get_latest_change_seq(db)
+        version = get_catalog_version(db)
+        rows = db.query(
+            Product.id, Product.category, Product.embedding, Product.price
+        ).filter(Product.in_stock == True).all()  # noqa: E712
+
+        grouped: Dict[str, Tuple[List[str], List[np.ndarray], List[float]]] = {}
+        prices: Dict[str, float] = {}
+        for product_id, category, embedding, price in rows:
+            vector = _embedding_to_array(embedding)
+            if vector is None:
+                continue
+            ids, vectors, category_prices = grouped.setdefault(category, ([], [], []))
+            ids.append(product_id)
+            vectors.append(vector)
+            category_prices.append(price)
+            prices[product_id] = price
+
+        categories = {
+            category: self._create_backend(ids, _normalize_rows(np.vstack(vectors)), category_prices)
+            for category, (ids, vectors, category_prices) in grouped.items()
+        }
+        product_categories = {
+            product_id: category
+            for category, (ids, _, _) in grouped.items()
+            for product_id in ids
+        }
+
+        with self._lock:
+            self._categories = categories
+            self._product_categories = product_categories
+            self._prices = prices
+            self._built = True
+            self._version = version
+            self._change_seq = change_seq
+
+    def _is_stale(self, db: Session, min_version: Optional[int]) -> bool:
+        """Whether the index needs a refresh (reads the version when due)."""
+        if not self._built:
+            return True
+        if min_version is not None:
+            return self._version is None or self._version < min_version
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return False
+        self._version_checked_at = now
+        return get_catalog_version(db) != self._version
+
+    def ensure_built(self, db: Session, min_version: Optional[int] = None) -> None:
+        """Build the index, or catch up if the catalog changed since.
+
+        Args:
+            db: Database session
+            min_version: Catalog version the caller needs the index to
+                reflect (e.g. the one stamped on a scan); checked without a
+                query. Otherwise the version is read at most once per
+                ``version_check_interval``.
+        """
+        if not self._is_stale(db, min_version):
+            return
+        with self._sync_lock:
+            # Another thread may have refreshed the index while this one waited
+            if self._built and self._version == get_catalog_version(db):
+                return
+            self.refresh(db)
+
+    def refresh(self, db: Session) -> None:
+        """Bring the index up to date with the catalog.
+
+        Replays the change log from the last entry the index applied. If
+        the log cannot be replayed (entries pruned, bulk query updates, most
+        of the index changed) or the index was never built, the published
+        snapshot is restored, or the index is rebuilt from the products table.
+
+        Args:
+            db: Database session
+        """
+        if self._built:
+            changes = self._read_changes(db, self._change_seq, len(self))
+            if changes is not None:
+                version, change_seq, upserts, removals = changes
+                self.apply(upserts, removals)
+                with self._lock:
+                    self._version = version
+                    self._change_seq = change_seq
+                return
+        if self.restore_snapshot(db) is None:
+            self.build(db)
+
+    def _read_changes(self, db: Session, after_seq: int, indexed: int):
+        """Read products changed after a change log position.
+
+        Args:
+            db: Database session
+            after_seq: Last change log entry already applied
+            indexed: Products in the index being caught up
+
+        Returns:
+            (catalog version, last change log seq, upserts, removals) for
+            ``apply``, or None if the log cannot be replayed from ``after_seq``
+        """
+        version = get_catalog_version(db)  # Read before the log; see ``build``
+        entries = db.execute(
+            select(CatalogChange.seq, CatalogChange.product_id).where(CatalogChange.seq > after_seq)
+        ).all()
+        if get_change_log_pruned_seq(db) > after_seq:
+            return None  # Entries after ``after_seq`` were deleted
+        if any(product_id is None for _, product_id in entries):
+            return None  # Bulk query updates are not attributed to products
+
+        changed = sorted({product_id for _, product_id in entries})
+        if len(changed) > max(indexed * REPLAY_MAX_CHANGED_RATIO, REPLAY_CHUNK_SIZE):
+            return None
+        rows = []
+        for start in range(0, len(changed), REPLAY_CHUNK_SIZE):
+            rows.extend(db.query(
+                Product.id, Product.category, Product.embedding, Product.price, Product.in_stock
+            ).filter(Product.id.in_(changed[start:start + REPLAY_CHUNK_SIZE])).all())
+
+        upserts = []
+        for product_id, category, embedding, price, in_stock in rows:
+            vector = _embedding_to_array(embedding) if in_stock else None
+            if vector is not None:
+                upserts.append((product_id, category, vector, price))
+        upserted = {product_id for product_id, _, _, _ in upserts}
+        removals = [product_id for product_id in changed if product_id not in upserted]
+        change_seq = max((seq for seq, _ in entries), default=after_seq)
+        return version, change_seq, upserts, removals
+
+    def restore_snapshot(self, db: Session, root: Optional[Path] = None) -> Optional[SnapshotManifest]:
+        """Load the published snapshot and replay products changed since.
+
+        Embedding matrices are memory-mapped read-only, so processes on the
+        same host share them; only categories touched by the replay (or by
+        later updates) get private copies.
+
+        Args:
+            db: Database session
+            root: Snapshot root directory (default: ``vector_index_snapshot_path``)
+
+        Returns:
+            Manifest of the restored snapshot, or None if there is no usable
+            snapshot or a full ``build`` is needed (change log pruned past the
+            snapshot, bulk query updates, or most of the snapshot changed)
+        """
+        root = root or settings.vector_index_snapshot_path
+        if root is None:
+            return None
+        manifest = current_snapshot(root)
+        if manifest is None:
+            return None
+
+        changes = self._read_changes(db, manifest.change_seq, manifest.products)
+        if changes is None:
+            return None
+        version, change_seq, upserts, removals = changes
+
+        self.load(manifest.path, mmap_mode="r")
+        self.apply(upserts, removals)
+        with self._lock:
+            self._version = version
+            self._change_seq = change_seq
+        return manifest
+
+    def write_snapshot(
+        self,
+        db: Session,
+        root: Optional[Path] = None,
+        keep: int = settings.vector_index_snapshot_keep,
+        rebuild: bool = True,
+    ) -> SnapshotManifest:
+        """Publish the index as a snapshot.
+
+        Older snapshots beyond ``keep`` and change log entries every kept
+        snapshot already includes are deleted.
+
+        Args:
+            db: Database session
+            root: Snapshot root directory (default: ``vector_index_snapshot_path``)
+            keep: Snapshots to keep on disk
+            rebuild: Rebuild from the products table first; otherwise a
+                built index is only caught up on the change log (see
+                ``refresh``) and published as it is
+
+        Returns:
+            Manifest of the published snapshot
+        """
+        root = root or settings.vector_index_snapshot_path
+        if root is None:
+            raise ValueError("VECTOR_INDEX_SNAPSHOT_PATH is not set")
+
+        if rebuild or not self._built:
+            self.build(db)
+        else:
+            with self._sync_lock:
+                self.refresh(db)
+        manifest = publish_snapshot(
+            root,
+            self.save,
+            catalog_version=self._version,
+            change_seq=self._change_seq,
+            products=len(self),
+            backend=self.backend,
+        )
+        kept = prune_snapshots(root, keep)
+        prune_change_log(db.connection(), min(snapshot.change_seq for snapshot in kept))
+        db.commit()
+        return manifest
+
+    def apply_logged(
+        self,
+        upserts: Iterable[Tuple[str, str, np.ndarray, float]],
+        removals: Iterable[str],
+        first_seq: int,
+        last_seq: int,
+        catalog_version: int,
+    ) -> None:
+        """Apply product changes the caller committed and logged itself.
+
+        Like ``apply``; if the index had applied every change log entry
+        before ``first_seq``, it also moves its log position past
+        ``last_seq``, so ``refresh`` does not read these products back.
+        Otherwise ``refresh`` replays the gap (and these entries) later.
+
+        Args:
+            upserts: (product_id, category, embedding, price) for in-stock products
+            removals: Product ids to drop
+            first_seq: First change log entry of the changes
+            last_seq: Last change log entry of the changes
+            catalog_version: Catalog version after the changes committed
+        """
+        self.apply(upserts, removals)
+        with self._lock:
+            if self._built and self._change_seq == first_seq - 1:
+                self._change_seq = last_seq
+                self._version = catalog_version
+
+    def invalidate(self) -> None:
+        """Mark the index stale so the next ``ensure_built`` refreshes it."""
+        self._built = False
+
+    def apply(
+        self,
+        upserts: Iterable[Tuple[str, str, np.ndarray, float]] = (),
+        removals: Iterable[str] = (),
+    ) -> None:
+        """Apply incremental product changes.
+
+        Args:
+            upserts: (product_id, category, embedding, price) for in-stock products
+            removals: Product ids to drop (deleted, out of stock, no embedding)
+        """
+        upserts = list(upserts)
+        removals = list(removals)
+        if not upserts and not removals:
+            return
+
+        with self._lock:
+            # Drop every touched id from its previous category first
+            dropped: Dict[str, List[str]] = {}
+            for product_id in removals + [product_id for product_id, _, _, _ in upserts]:
+                self._prices.pop(product_id, None)
+                previous = self._product_categories.pop(product_id, None)
+                if previous is not None:
+                    dropped.setdefault(previous, []).append(product_id)
+            for category, ids in dropped.items():
+                self._categories[category].remove(ids)
+
+            added: Dict[str, Tuple[List[str], List[np.ndarray], List[float]]] = {}
+            for product_id, category, vector, price in upserts:
+                ids, vectors, prices = added.setdefault(category, ([], [], []))
+                ids.append(product_id)
+                vectors.append(np.asarray(vector, dtype=np.float32))
+                prices.append(price)
+                self._product_categories[product_id] = category
+                self._prices[product_id] = price
+
+            for category, (ids, vectors, prices) in added.items():
+                matrix = _normalize_rows(np.vstack(vectors))
+                index = self._categories.get(category)
+                if index is None:
+                    self._categories[category] = self._create_backend(ids, matrix, prices)
+                elif index.kind == ExactIndex.kind:
+                    index.add(ids, matrix, prices)
+                else:
+                    index.add(ids, matrix)
+
+    def search(
+        self,
+        category: str,
+        embedding,
+        k: int = 20
+    ) -> List[Tuple[str, float]]:
+        """Find the most similar in-stock products in a category.
+
+        Args:
+            category: Product category to search
+            embedding: Query embedding vector
+            k: Maximum number of results
+
+        Returns:
+            List of (product_id, cosine_similarity) sorted descending
+        """
+        index = self._categories.get(category)
+        if index is None:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+
+        return index.search(query / norm, k)
+
+    def search_batch(
+        self,
+        queries: Sequence[Tuple[str, object]],
+        k: int = 20
+    ) -> List[List[Tuple[str, float]]]:
+        """Search several (category, embedding) queries at once.
+
+        Queries are grouped by category and each category is searched with
+        a single matrix-matrix product.
+
+        Args:
+            queries: (category, embedding) pairs
+            k: Maximum number of results per query
+
+        Returns:
+            One list of (product_id, cosine_similarity) per query, in input order
+        """
+        results: List[List[Tuple[str, float]]] = [[] for _ in queries]
+
+        grouped: Dict[str, List[int]] = {}
+        for position, (category, _) in enumerate(queries):
+            grouped.setdefault(category, []).append(position)
+
+        for category, positions in grouped.items():
+            index = self._categories.get(category)
+            if index is None:
+                continue
+            matrix = np.vstack([
+                np.asarray(queries[position][1], dtype=np.float32) for position in positions
+            ])
+            norms = np.linalg.norm(matrix, axis=1)
+            valid = norms > 0
+            if not valid.any():
+                continue
+            hits = index.search_batch(matrix[valid] / norms[valid, np.newaxis], k)
+            for position, category_hits in zip(np.asarray(positions)[valid], hits):
+                results[position] = category_hits
+
+        return results
+
+    def candidates_batch(
+        self,
+        queries: Sequence[Tuple[str, object]],
+        pool_size: int = settings.matching_candidate_pool_size,
+    ) -> List[MatchCandidates]:
+        """Candidate products with similarities and prices for ranking.
+
+        Exact categories return every product in the category, scored with
+        one matrix-matrix product per category. Approximate categories
+        return their ``pool_size`` nearest products.
+
+        Args:
+            queries: (category, embedding) pairs
+            pool_size: Candidates per query in approximate categories
+
+        Returns:
+            One MatchCandidates per query, in input order
+        """
+        results: List[MatchCandidates] = [EMPTY_CANDIDATES for _ in queries]
+
+        grouped: Dict[str, List[int]] = {}
+        for position, (category, _) in enumerate(queries):
+            grouped.setdefault(category, []).append(position)
+
+        for category, positions in grouped.items():
+            index = self._categories.get(category)
+            if index is None:
+                continue
+            matrix = np.vstack([
+                np.asarray(queries[position][1], dtype=np.float32) for position in positions
+            ])
+            norms = np.linalg.norm(matrix, axis=1)
+            valid = norms > 0
+            if not valid.any():
+                continue
+            normalized = matrix[valid] / norms[valid, np.newaxis]
+            if index.kind == ExactIndex.kind:
+                candidates = index.candidates_batch(normalized)
+            else:
+                candidates = [
+                    MatchCandidates(
+                        np.array([product_id for product_id, _ in hits], dtype=object),
+                        np.array([similarity for _, similarity in hits], dtype=np.float32),
+                        np.array([self._prices.get(product_id, np.nan) for product_id, _ in hits], dtype=np.float32),
+                    )
+                    for hits in index.search_batch(normalized, pool_size)
+                ]
+            for position, category_candidates in zip(np.asarray(positions)[valid], candidates):
+                results[position] = category_candidates
+
+        return results
+
+    def save(self, directory: Path) -> None:
+        """Persist every category backend under ``directory/<category>``.
+
+        Prices of products in approximate categories (exact backends store
+        their own) go to ``price_ids.npy`` / ``prices.npy`` in ``directory``.
+
+        Args:
+            directory: Target directory
+        """
+        directory = Path(directory)
+        price_ids = []
+        for category, index in list(self._categories.items()):
+            index.save(directory / category)
+            if index.kind != ExactIndex.kind:
+                price_ids.extend(index.product_ids())
+        np.save(directory / "price_ids.npy", np.asarray(price_ids, dtype=str))
+        np.save(directory / "prices.npy", np.array(
+            [self._prices.get(product_id, np.nan) for product_id in price_ids], dtype=np.float32
+        ))
+
+    def load(self, directory: Path, mmap_mode: Optional[str] = None) -> None:
+        """Replace the index contents with backends saved by ``save``.
+
+        The catalog version of the loaded index is unknown (it is refreshed
+        on the next version check) until the caller sets it, as
+        ``restore_snapshot`` does.
+
+        Args:
+            directory: Directory written by ``save``
+            mmap_mode: ``np.load`` mode for embedding matrices ("r" to share
+                them read-only between processes)
+        """
+        directory = Path(directory)
+        categories = {}
+        for path in sorted(directory.iterdir()):
+            meta_path = path / "meta.json"
+            if not meta_path.exists():
+                continue
+            kind = json.loads(meta_path.read_text())["kind"]
+            categories[path.name] = BACKENDS[kind].load(path, mmap_mode=mmap_mode)
+
+        product_categories = {}
+        for category, index in categories.items():
+            for product_id in index.product_ids():
+                product_categories[product_id] = category
+
+        prices = {}
+        if (directory / "price_ids.npy").exists():
+            price_ids = np.load(directory / "price_ids.npy")
+            prices = dict(zip(price_ids.tolist(), np.load(directory / "prices.npy").tolist()))
+
+        with self._lock:
+            self._categories = categories
+            self._product_categories = product_categories
+            self._prices = prices
+            self._built = True
+            self._version = None
+            self._change_seq = 0
+
+    def __len__(self) -> int:
+        """Total number of indexed products."""
+        return len(self._product_categories)
+
+
+# Global vector index instance
+vector_index = VectorIndex()
+
+
+# --- Keep the index in sync with committed product changes ---
+
+_PENDING_KEY = "vector_index_pending"
+_STALE_KEY = "vector_index_stale"
+
+
+def _track_product_changes(session: Session, flush_context) -> None:
+    """Record products written by a flush until the transaction commits."""
+    pending = None
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Product):
+            if pending is None:
+                pending = session.info.setdefault(_PENDING_KEY, {})
+            vector = _embedding_to_array(obj.embedding) if obj.in_stock else None
+            pending[obj.id] = (obj.category, vector, obj.price)
+    for obj in session.deleted:
+        if isinstance(obj, Product):
+            if pending is None:
+                pending = session.info.setdefault(_PENDING_KEY, {})
+            pending[obj.id] = (obj.category, None, None)
+
+
+def _track_bulk_change(update_context) -> None:
+    """Bulk query updates/deletes bypass the unit of work; rebuild instead."""
+    mapper = update_context.mapper
+    if mapper is not None and mapper.class_ is Product:
+        update_context.session.info[_STALE_KEY] = True
+
+
+def _apply_committed_changes(session: Session) -> None:
+    """Publish tracked product changes to the index after commit."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if session.info.pop(_STALE_KEY, False):
+        vector_index.invalidate()
+        return
+    if not pending or not vector_index.is_built:
+        return
+
+    upserts = []
+    removals = []
+    for product_id, (category, vector, price) in pending.items():
+        if vector is None:
+            removals.append(product_id)
+        else:
+            upserts.append((product_id, category, vector, price))
+    vector_index.apply(upserts, removals)
+
+
+def _discard_pending_changes(session: Session) -> None:
+    """Drop tracked product changes when the transaction rolls back."""
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_STALE_KEY, None)
+
+
+event.listen(Session, "after_flush", _track_product_changes)
+event.listen(Session, "after_bulk_update", _track_bulk_change)
+event.listen(Session, "after_bulk_delete", _track_bulk_change)
+event.listen(Session, "after_commit", _apply_committed_changes)
+event.listen(Session, "after_rollback", _discard_pending_changes)
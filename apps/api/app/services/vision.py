@@ -1,5 +1,5 @@
 """Vision service for furniture detection."""
-from typing import List, Dict
+from typing import List, Dict, Protocol, Sequence
 from dataclasses import dataclass
 import hashlib
 
@@ -12,9 +12,43 @@ class Detection:
     confidence: float
 
 
+class VisionProvider(Protocol):
+    """Interface of furniture detection backends.
+
+    Workers call ``detect_furniture_batch`` with the images of several
+    scans at once (see ``ScanWorker``), so model backends can run one
+    batched inference call instead of one per image.
+    """
+
+    version: str  # Keys cached scan results; see StubVisionProvider.version
+
+    def detect_furniture(self, image_path: str) -> List[Detection]:
+        """Detect furniture in one image."""
+        ...
+
+    def detect_furniture_batch(self, image_paths: Sequence[str]) -> List[List[Detection]]:
+        """Detect furniture in several images.
+
+        Args:
+            image_paths: Paths to image files
+
+        Returns:
+            Detections for each image, in the order of ``image_paths``
+        """
+        ...
+
+    def get_supported_categories(self) -> List[str]:
+        """Get list of supported furniture categories."""
+        ...
+
+
 class StubVisionProvider:
     """Stub vision provider for MVP - returns deterministic detections."""
 
+    # Change whenever detections for the same image may change (model,
+    # prompt, thresholds); cached scan results are keyed by it.
+    version = "stub-1"
+
     def __init__(self):
         """Initialize stub provider."""
         self.categories = [
@@ -72,6 +106,17 @@ class StubVisionProvider:
 
         return detections
 
+    def detect_furniture_batch(self, image_paths: Sequence[str]) -> List[List[Detection]]:
+        """Detect furniture in several images (stubbed per image).
+
+        Args:
+            image_paths: Paths to image files
+
+        Returns:
+            Detections for each image, in the order of ``image_paths``
+        """
+        return [self.detect_furniture(image_path) for image_path in image_paths]
+
     def get_supported_categories(self) -> List[str]:
         """Get list of supported furniture categories.
 
@@ -94,4 +139,4 @@ class OpenAIVisionProvider:
 
 
 # Global vision provider instance
-vision_provider = StubVisionProvider()
+vision_provider: VisionProvider = StubVisionProvider()
@@ -0,0 +1,202 @@
+"""Background workers that process queued scans."""
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.services.pipeline import finish_scan, mark_scan_failed, scan_image_path, start_scan
+from app.services.queue import Job, job_queue
+from app.services.vision import vision_provider
+from app.settings import settings
+
+BATCH_POLL_INTERVAL_SECONDS = 0.005  # Queue polling while a batch is filling
+
+
+def job_claim(job: Job) -> str:
+    """Claim of a job's current attempt on its scan (see ``pipeline.start_scan``)."""
+    return f"{job.id}:{job.attempts}"
+
+
+class ScanWorker:
+    """Claims scan jobs from the queue and runs the processing pipeline.
+
+    Jobs are processed in micro-batches: after claiming a job the worker
+    keeps claiming for up to ``batch_max_wait_ms``, or until it holds
+    ``batch_max_size`` jobs, then runs a single ``detect_furniture_batch``
+    call for all of their images. Cropping, matching and storing results
+    still happen per scan, each in its own transaction.
+    """
+
+    def __init__(
+        self,
+        queue=None,
+        worker_id: Optional[str] = None,
+        poll_interval: float = settings.scan_worker_poll_interval_seconds,
+        batch_max_size: int = settings.vision_batch_max_size,
+        batch_max_wait_ms: int = settings.vision_batch_max_wait_ms,
+    ):
+        """Initialize scan worker.
+
+        Args:
+            queue: Job queue (defaults to the global queue)
+            worker_id: Identifier recorded on claimed jobs
+            poll_interval: Seconds to sleep when the queue is empty
+            batch_max_size: Most jobs sent to the vision provider at once
+            batch_max_wait_ms: Milliseconds to wait for more jobs after the first
+        """
+        self.queue = queue or job_queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.batch_max_size = max(batch_max_size, 1)
+        self.batch_max_wait = batch_max_wait_ms / 1000
+
+    def claim_batch(self) -> List[Job]:
+        """Claim up to ``batch_max_size`` jobs.
+
+        Returns immediately if the queue is empty. Otherwise waits at most
+        ``batch_max_wait_ms`` after the first job for the batch to fill.
+
+        Returns:
+            Claimed jobs (empty if the queue was empty)
+        """
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return []
+
+        jobs = [job]
+        deadline = time.monotonic() + self.batch_max_wait
+        while len(jobs) < self.batch_max_size:
+            job = self.queue.claim(self.worker_id)
+            if job is not None:
+                jobs.append(job)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, BATCH_POLL_INTERVAL_SECONDS))
+        return jobs
+
+    def run_once(self) -> bool:
+        """Process at most one batch of jobs.
+
+        Returns:
+            True if any job was claimed, False if the queue was empty
+        """
+        jobs = self.claim_batch()
+        if not jobs:
+            return False
+
+        pending = []  # (job, session, scan, started) of scans that need detection
+        try:
+            for job in jobs:
+                db = SessionLocal()
+                started = time.perf_counter()
+                try:
+                    if job.attempts > self.queue.max_attempts:
+                        # Claimed again after the last attempt timed out
+                        raise TimeoutError("Scan processing timed out")
+                    scan = start_scan(db, job.scan_id, job_claim(job))
+                except Exception as e:
+                    self._record_failure(db, job, e, started)
+                    db.close()
+                    continue
+                if scan is None:
+                    # Missing, already completed or served from the result cache
+                    self.queue.complete(job)
+                    db.close()
+                    continue
+                pending.append((job, db, scan, started))
+
+            if not pending:
+                return True
+
+            detections, detection_error = [], None
+            try:
+                detections = vision_provider.detect_furniture_batch(
+                    [scan_image_path(scan) for _, _, scan, _ in pending]
+                )
+                if len(detections) != len(pending):
+                    raise ValueError(
+                        f"Vision provider returned {len(detections)} results for {len(pending)} images"
+                    )
+            except Exception as e:
+                detection_error = e
+
+            for index, (job, db, scan, started) in enumerate(pending):
+                if detection_error is not None:
+                    # The whole batch failed; every scan retries on its own schedule
+                    self._record_failure(db, job, detection_error, started)
+                    continue
+                try:
+                    if finish_scan(db, scan, job_claim(job), detections[index], started) is None:
+                        print(f"Scan {job.scan_id}: claimed by a newer attempt, discarding attempt {job.attempts}")
+                        continue
+                    self.queue.complete(job)
+                except Exception as e:
+                    self._record_failure(db, job, e, started)
+        finally:
+            for _, db, _, _ in pending:
+                db.close()
+
+        return True
+
+    def _record_failure(self, db: Session, job: Job, error: Exception, started: float) -> None:
+        """Fail a job and record the error on its scan."""
+        message = f"{type(error).__name__}: {error}"
+        print(f"Error processing scan {job.scan_id} (attempt {job.attempts}): {message}")
+        retrying = self.queue.fail(job, message)
+        if retrying is None:
+            # The claim expired and another worker owns the scan now
+            print(f"Scan {job.scan_id}: claim lost, leaving the failure to the new owner")
+            return
+        try:
+            mark_scan_failed(
+                db,
+                job.scan_id,
+                message,
+                processing_time_ms=int((time.perf_counter() - started) * 1000),
+                retrying=retrying,
+            )
+        except Exception as e:
+            db.rollback()
+            print(f"Error recording scan failure: {e}")
+
+    def run(self, stop_event: threading.Event) -> None:
+        """Process jobs until ``stop_event`` is set.
+
+        Args:
+            stop_event: Event signalling shutdown
+        """
+        while not stop_event.is_set():
+            try:
+                if not self.run_once():
+                    stop_event.wait(self.poll_interval)
+            except Exception as e:
+                # Queue unavailable etc. - back off and keep the worker alive
+                print(f"Scan worker error: {e}")
+                stop_event.wait(self.poll_interval)
+
+
+def start_embedded_workers(count: int = settings.scan_worker_threads) -> threading.Event:
+    """Start scan workers as daemon threads inside the current process.
+
+    Args:
+        count: Number of worker threads
+
+    Returns:
+        Event that stops the workers when set
+    """
+    stop_event = threading.Event()
+    for index in range(count):
+        threading.Thread(
+            target=ScanWorker().run,
+            args=(stop_event,),
+            name=f"scan-worker-{index}",
+            daemon=True,
+        ).start()
+    return stop_event
@@ -11,6 +11,21 @@ class Settings(BaseSettings):
 
     # Database (SQLite - no Docker needed)
     database_url: str = "sqlite:///./splay.db"
+    database_read_url: str | None = None  # Read replica for GET endpoints (defaults to database_url)
+    database_echo: bool = False  # Log every SQL statement
+    database_pool_size: int = 10
+    database_read_pool_size: int = 20
+    database_max_overflow: int = 10
+    database_pool_timeout_seconds: int = 30
+
+    # SQLite connection profile ("performance" = WAL + the pragmas below)
+    sqlite_profile: Literal["performance", "default"] = "performance"
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64000  # Negative = KiB (64 MB per connection)
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout_ms: int = 5000
 
     # JWT
     jwt_secret: str = "your-secret-key-change-in-production-splay-2024"
@@ -18,12 +33,84 @@ class Settings(BaseSettings):
     jwt_access_token_expire_minutes: int = 15
     jwt_refresh_token_expire_days: int = 7
 
+    # Password hashing (outdated hashes are upgraded on login)
+    password_hash_scheme: Literal["bcrypt", "argon2"] = "bcrypt"  # argon2 needs argon2-cffi
+    password_bcrypt_rounds: int = 12
+    password_argon2_time_cost: int = 3
+    password_argon2_memory_cost: int = 65536  # KiB
+    password_argon2_parallelism: int = 1  # Requests already run in parallel across workers
+    password_hash_workers: int = 2  # Concurrent hashes (each occupies a core)
+    password_hash_max_queue: int = 32  # Further logins get 503
+    password_hash_executor_kind: Literal["thread", "process"] = "thread"  # bcrypt and argon2 release the GIL
+
+    # Authentication caches (see services/principals.py)
+    auth_cache_backend: Literal["memory", "redis"] = "memory"  # Use redis to share invalidations across processes
+    auth_principal_cache_ttl_seconds: int = 60
+    auth_principal_cache_max_entries: int = 10000
+    auth_token_cache_ttl_seconds: int = 900
+    auth_token_cache_max_entries: int = 10000
+
     # Storage
     storage_type: Literal["local", "s3"] = "local"
     storage_path: str = "./storage"
     s3_bucket: str | None = None
     s3_region: str | None = None
 
+    # Scan image processing
+    scan_image_max_side: int = 1600  # JPEGs are draft-decoded down to about this size
+    image_encode_threads: int = 4
+    scan_result_cache_enabled: bool = True  # Reuse results of identical earlier uploads
+    scan_response_cache_max_entries: int = 2000  # Serialized completed scan responses per process
+    scan_response_cache_ttl_seconds: int = 300
+    catalog_cache_max_entries: int = 10000  # Product display records per process
+    catalog_cache_version_check_seconds: float = 1.0  # Staleness bound for changes made by other processes
+    catalog_import_chunk_size: int = 1000  # Feed rows per transaction / embedding batch (import_catalog.py)
+    catalog_change_log_retention_hours: float = 24.0  # Product change log kept for index catch-up (pruned by imports)
+
+    # Embedding storage ("float32", "float16" or int8-quantized blobs)
+    embedding_storage_format: Literal["float32", "float16", "int8"] = "float16"
+    embedding_dimension: int = 512  # pgvector column size (PostgreSQL)
+    embedding_cache_max_entries: int = 4096  # Memoized text / crop embeddings per process
+
+    # Vector index (product matching)
+    vector_index_backend: Literal["exact", "ivf", "hnsw"] = "exact"
+    vector_index_ann_threshold: int = 50000  # Smaller categories always use exact search
+    ivf_nlist: int | None = None  # Defaults to ~sqrt(category size)
+    ivf_nprobe: int = 8
+    matching_candidate_pool_size: int = 200  # Ranked candidates per item from approximate backends / pgvector
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    vector_index_snapshot_path: str | None = None  # Snapshot directory shared by the processes of a host (None disables)
+    vector_index_snapshot_keep: int = 3  # Published snapshots kept on disk
+    vector_index_version_check_seconds: float = 1.0  # Staleness bound for product changes made by other processes
+
+    # pgvector search (PostgreSQL; replaces the in-memory index)
+    pgvector_ef_search: int = 100  # hnsw.ef_search for matching queries
+    pgvector_iterative_scan: Literal["off", "strict_order", "relaxed_order"] = "off"  # Skipped below pgvector 0.8
+
+    # Scan processing (background job queue + workers)
+    scan_queue_backend: Literal["database", "redis", "memory"] = "database"
+    scan_worker_mode: Literal["embedded", "external"] = "embedded"
+    scan_worker_processes: int = 2  # Worker pool size for app/scripts/run_worker.py
+    scan_worker_threads: int = 1  # Worker threads started inside the API (embedded mode)
+    scan_worker_poll_interval_seconds: float = 0.5
+    scan_job_visibility_timeout_seconds: int = 300
+    scan_job_max_attempts: int = 3
+    scan_job_retry_delay_seconds: int = 10
+    vision_batch_max_size: int = 8  # Scans per detect_furniture_batch call (1 disables batching)
+    vision_batch_max_wait_ms: int = 20  # How long a worker waits to fill a batch after its first job
+    redis_url: str = "redis://localhost:6379/0"
+
+    # Scan progress events (SSE / long-poll)
+    scan_events_backend: Literal["memory", "redis"] = "memory"  # Use redis with external workers
+    scan_events_long_poll_timeout_seconds: int = 25
+    scan_events_keepalive_seconds: int = 15
+
+    # Executor for blocking work (PIL, file I/O, sync DB) in async routes
+    blocking_executor_workers: int = 8
+    blocking_executor_max_queue: int = 64  # Further requests get 503
+
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
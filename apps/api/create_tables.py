@@ -6,7 +6,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from app.database import Base, engine
-from app.models import User, Subscription, Scan, DetectedItem, ItemMatch, Product
+from app.models import (
+    User, Subscription, Scan, DetectedItem, ItemMatch, Product, ScanJob, ImageBlob, CatalogState,
+    CatalogChange,
+)
 
 def create_tables():
     """Create all database tables."""